@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:20
+
+import apps.core.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from apps.core.search import SearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchEntry',
+            fields=[
+                ('user', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('document', apps.core.search.FullTextField(db_column='accounts_user_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'accounts_user_search',
+                'managed': False,
+            },
+        ),
+        SearchIndex(
+            table='accounts_user_search', source='accounts_user', key='user_id',
+            fields=('username', 'full_name', 'email', 'phone_number'), weights=(10, 5, 2, 1),
+            relation='search_entry',
+        ).migration(),
+    ]
@@ -1,6 +1,15 @@
 from django.db import models
 import uuid
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
+
+from apps.core.search import FullTextField, SearchIndex
+
+
+class LiveUserManager(UserManager):
+    """Users that have not been soft-deleted (see apps.core.deletion)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class User(AbstractUser):
@@ -19,6 +28,38 @@ class User(AbstractUser):
         default='Student'  # <-- Add a default value
     )
     profile_picture = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    # Set when an admin deletes the user; a DeletionJob removes the row later
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveUserManager()
+    # Soft-deleted users too: uniqueness checks, the purge
+    all_objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pages of the admin user list, newest first (see admin_panel.pagination)
+            models.Index(fields=['date_joined', 'id'], name='user_joined_idx'),
+        ]
 
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.username
+
+
+# FTS5 table over the admin-searchable user columns; see apps.core.search
+USER_SEARCH = SearchIndex(
+    table='accounts_user_search', source='accounts_user', key='user_id',
+    fields=('username', 'full_name', 'email', 'phone_number'), weights=(10, 5, 2, 1),
+    relation='search_entry',
+)
+
+
+class UserSearchEntry(models.Model):
+    user = models.OneToOneField(
+        User, primary_key=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='search_entry'
+    )
+    document = FullTextField(db_column='accounts_user_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'accounts_user_search'
@@ -35,6 +35,12 @@ class RegisterFormSerializer(serializers.ModelSerializer):
         ]
         extra_kwargs = {"password": {"write_only": True}}
 
+    def validate_username(self, value):
+        # Soft-deleted users hold on to their username until they are purged
+        if User.all_objects.filter(username=value).exists():
+            raise serializers.ValidationError("A user with that username already exists.")
+        return value
+
     def create(self, validated_data):
         user = User.objects.create_user(**validated_data)
         user.save()
@@ -0,0 +1,194 @@
+"""
+Where log_activity() sends entries. Chosen with ACTIVITY_LOG_BACKEND.
+
+DatabaseBackend (default)
+    One INSERT inside the request, as before. The entry is durable when the
+    request returns.
+
+BufferedBackend
+    Entries are queued in process memory and written with one bulk_create once
+    ACTIVITY_LOG_BATCH_SIZE entries are pending or ACTIVITY_LOG_FLUSH_INTERVAL
+    seconds after the first one, whichever comes first, and at interpreter exit.
+    With ACTIVITY_LOG_USE_CELERY the batch is handed to the
+    write_activity_logs task instead of being written by the web process.
+
+    Delivery guarantees:
+    - Entries keep the id and timestamp assigned when log_activity() was called.
+    - A crash or hard kill (SIGKILL, OOM) loses whatever is still queued, at most
+      one batch or one flush interval's worth per process.
+    - A batch the database rejects (IntegrityError: its user was deleted while
+      the entry was queued) is written again one entry at a time. An entry that
+      still fails is stored without its user, as on_delete=SET_NULL would have
+      left it (the username snapshot stays), and dropped with an error log if
+      even that fails. The other entries are written either way.
+    - Any other failed write (database unreachable) puts the batch back for the
+      next flush, up to max_attempts writes per entry, then drops it with an
+      error log.
+    - Celery delivery is at-least-once; the task ignores ids that already
+      exist, so a redelivered batch is not duplicated.
+    - Entries from different processes are not ordered relative to each other
+      until they land; readers order by timestamp.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import IntegrityError, connections, transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import ActivityLog
+
+
+logger = logging.getLogger(__name__)
+
+
+def store_entries(entries, batch_size=None):
+    """
+    bulk_create unsaved entries, ignoring ids already stored. A rejected batch
+    is retried entry by entry (see the module docstring). Returns the entries
+    that could not be stored at all.
+    """
+    try:
+        ActivityLog.objects.bulk_create(entries, batch_size=batch_size, ignore_conflicts=True)
+        return []
+    except IntegrityError:
+        pass
+    rejected = []
+    for entry in entries:
+        try:
+            with transaction.atomic():
+                ActivityLog.objects.bulk_create([entry], ignore_conflicts=True)
+            continue
+        except IntegrityError:
+            pass
+        try:
+            # The user is gone: keep the entry the way SET_NULL would have
+            entry.user = None
+            with transaction.atomic():
+                ActivityLog.objects.bulk_create([entry], ignore_conflicts=True)
+        except IntegrityError:
+            rejected.append(entry)
+    if rejected:
+        logger.error(
+            "Dropped %d activity log entries the database rejected: %s",
+            len(rejected), ', '.join(str(entry.id) for entry in rejected),
+        )
+    return rejected
+
+
+class DatabaseBackend:
+    def write(self, entry):
+        entry.save(force_insert=True)
+
+    def flush(self):
+        pass
+
+
+class BufferedBackend:
+    max_attempts = 5
+
+    def __init__(self, batch_size=None, flush_interval=None, use_celery=None):
+        self.batch_size = batch_size or getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 100)
+        self.flush_interval = flush_interval or getattr(settings, 'ACTIVITY_LOG_FLUSH_INTERVAL', 2.0)
+        self.use_celery = getattr(settings, 'ACTIVITY_LOG_USE_CELERY', False) if use_celery is None else use_celery
+        self._pending = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def write(self, entry):
+        with self._lock:
+            self._pending.append(entry)
+            full = len(self._pending) >= self.batch_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection; don't leak it
+            connections.close_all()
+
+    def _write(self, batch):
+        try:
+            if self.use_celery:
+                from .tasks import write_activity_logs
+                write_activity_logs.delay([serialize_entry(entry) for entry in batch])
+            else:
+                store_entries(batch, batch_size=self.batch_size)
+        except Exception:
+            retry, dropped = [], []
+            for entry in batch:
+                entry._write_attempts = getattr(entry, '_write_attempts', 0) + 1
+                (retry if entry._write_attempts < self.max_attempts else dropped).append(entry)
+            logger.exception("Failed to write %d activity log entries, will retry on next flush", len(retry))
+            if dropped:
+                logger.error(
+                    "Dropped %d activity log entries after %d failed writes: %s",
+                    len(dropped), self.max_attempts, ', '.join(str(entry.id) for entry in dropped),
+                )
+            with self._lock:
+                self._pending[:0] = retry
+
+
+def serialize_entry(entry):
+    """JSON-safe form of an unsaved ActivityLog, for the Celery task."""
+    return {
+        'id': str(entry.id),
+        'user_id': str(entry.user_id) if entry.user_id else None,
+        'username': entry.username,
+        'action_type': entry.action_type,
+        'message': entry.message,
+        'content_type_id': entry.content_type_id,
+        'object_id': str(entry.object_id) if entry.object_id else None,
+        'object_repr': entry.object_repr,
+        'timestamp': entry.timestamp.isoformat(),
+    }
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, 'ACTIVITY_LOG_BACKEND', 'apps.activity_log.backends.DatabaseBackend')
+                _backend = import_string(path)()
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+    if setting.startswith('ACTIVITY_LOG_'):
+        if _backend is not None:
+            _backend.flush()
+        _backend = None
+
+
+@atexit.register
+def flush_on_exit():
+    if _backend is not None:
+        _backend.flush()
@@ -0,0 +1,61 @@
+import uuid
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def _parse_uuid(name, value):
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise ValidationError({name: 'Must be a valid UUID.'})
+
+
+def _parse_moment(name, value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError({name: 'Must be an ISO 8601 date or datetime.'})
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_activity_filters(params):
+    """
+    Validate the `user`, `action_type`, `since` and `until` query parameters.
+    Returns a dict with just the ones that were given, parsed.
+    """
+    filters = {}
+    if params.get('user'):
+        filters['user'] = _parse_uuid('user', params['user'])
+    if params.get('action_type'):
+        filters['action_type'] = params['action_type']
+    if params.get('since'):
+        filters['since'] = _parse_moment('since', params['since'])
+    if params.get('until'):
+        filters['until'] = _parse_moment('until', params['until'])
+    return filters
+
+
+def filter_activity_logs(queryset, params):
+    """
+    Narrow an ActivityLog queryset by the `user`, `action_type`, `since` and
+    `until` query parameters. `since` is inclusive, `until` exclusive. Every
+    combination is served by one of the (…, timestamp, id) indexes on
+    ActivityLog.
+    """
+    filters = parse_activity_filters(params)
+    if 'user' in filters:
+        queryset = queryset.filter(user_id=filters['user'])
+    if 'action_type' in filters:
+        queryset = queryset.filter(action_type=filters['action_type'])
+    if 'since' in filters:
+        queryset = queryset.filter(timestamp__gte=filters['since'])
+    if 'until' in filters:
+        queryset = queryset.filter(timestamp__lt=filters['until'])
+    return queryset
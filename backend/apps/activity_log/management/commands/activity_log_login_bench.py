@@ -0,0 +1,72 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from apps.accounts.models import User
+from apps.activity_log.backends import get_backend
+from apps.activity_log.models import ActivityLog
+
+
+BACKENDS = {
+    'database': 'apps.activity_log.backends.DatabaseBackend',
+    'buffered': 'apps.activity_log.backends.BufferedBackend',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure POST /api/account/login/ latency with the synchronous activity "
+        "log write versus the buffered backend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help='Logins per backend.')
+        parser.add_argument(
+            '--real-hasher', action='store_true',
+            help='Keep the configured password hasher. By default a fast hasher is used '
+                 'so PBKDF2 does not drown out the cost of the log write.',
+        )
+
+    def handle(self, *args, **options):
+        overrides = {} if options['real_hasher'] else {
+            'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+        }
+        username = f"bench-{uuid.uuid4().hex[:8]}"
+
+        with override_settings(**overrides):
+            user = User.objects.create_user(username=username, password='bench-password', role='Student')
+            try:
+                for name, path in BACKENDS.items():
+                    with override_settings(ACTIVITY_LOG_BACKEND=path):
+                        timings = self.run(options['requests'], username)
+                        get_backend().flush()
+                    self.report(name, timings)
+            finally:
+                ActivityLog.objects.filter(user=user).delete()
+                user.delete()
+
+    def run(self, requests, username):
+        client = Client(SERVER_NAME='localhost')
+        payload = {'username': username, 'password': 'bench-password'}
+        # Warm up URL resolution, serializers and the connection
+        client.post('/api/account/login/', payload)
+
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.post('/api/account/login/', payload)
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"Login failed with {response.status_code}")
+        return timings
+
+    def report(self, name, timings):
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f"{name:<10} mean {statistics.mean(timings):7.2f} ms  "
+            f"p50 {statistics.median(timings):7.2f} ms  p95 {p95:7.2f} ms"
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.activity_log.rollup import run_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll old activity log rows up into hourly and daily counts, then delete "
+        "raw rows past the retention window in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days', type=int,
+            help='Keep raw rows this many days. Defaults to ACTIVITY_LOG_RETENTION_DAYS.',
+        )
+        parser.add_argument('--no-delete', action='store_true', help='Only build rollups.')
+
+    def handle(self, *args, **options):
+        report = run_retention(retention_days=options['retention_days'], delete=not options['no_delete'])
+        for key, value in report.items():
+            self.stdout.write(f"{key:>16}: {value}")
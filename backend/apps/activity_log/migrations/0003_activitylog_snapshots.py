@@ -0,0 +1,77 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:45
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+# Log rows read, and targets looked up, per round trip; well under SQLite's parameter limit
+CHUNK_SIZE = 500
+
+# (app_label, model) of log targets -> column holding their display name
+SNAPSHOT_FIELDS = {
+    ('accounts', 'user'): 'username',
+    ('core', 'subject'): 'name',
+    ('core', 'class'): 'name',
+    ('core', 'assignment'): 'title',
+}
+
+
+def backfill_snapshots(apps, schema_editor):
+    ActivityLog = apps.get_model('activity_log', 'ActivityLog')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    User = apps.get_model('accounts', 'User')
+
+    ActivityLog.objects.filter(user__isnull=False).update(
+        username=Subquery(User.objects.filter(pk=OuterRef('user_id')).values('username')[:1])
+    )
+
+    for content_type in ContentType.objects.filter(pk__in=ActivityLog.objects.values('content_type_id')):
+        # Historical models have no __str__; snapshot the column it shows, as it is at this point
+        field = SNAPSHOT_FIELDS.get((content_type.app_label, content_type.model))
+        if field is None:
+            continue
+        try:
+            model = apps.get_model(content_type.app_label, content_type.model)
+        except LookupError:
+            continue
+        # Keyset chunks rather than one open cursor: SQLite doesn't isolate a
+        # read from the writes to the same table on its connection
+        logs = ActivityLog.objects.filter(content_type=content_type).only('id', 'object_id').order_by('pk')
+        chunk = list(logs[:CHUNK_SIZE])
+        while chunk:
+            snapshot_chunk(ActivityLog, model, field, chunk)
+            chunk = list(logs.filter(pk__gt=chunk[-1].pk)[:CHUNK_SIZE])
+
+
+def snapshot_chunk(ActivityLog, model, field, logs):
+    targets = dict(model._base_manager.filter(pk__in={log.object_id for log in logs}).values_list('pk', field))
+    changed = []
+    for log in logs:
+        value = targets.get(log.object_id)
+        if value is not None:
+            log.object_repr = str(value)[:255]
+            changed.append(log)
+    ActivityLog.objects.bulk_update(changed, ['object_repr'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity_log', '0002_alter_activitylog_timestamp'),
+        # Log targets read by the backfill
+        ('core', '0005_assignmentsubmission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitylog',
+            name='object_repr',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='activitylog',
+            name='username',
+            field=models.CharField(blank=True, max_length=150),
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicates(apps, schema_editor):
+    """Collapse rows that would break the new unique constraints."""
+    ActivityRollup = apps.get_model('activity_log', 'ActivityRollup')
+    keys = list(
+        ActivityRollup.objects.values('period', 'period_start', 'action_type', 'user')
+        .annotate(rows=Count('id')).filter(rows__gt=1).order_by()
+    )
+    for key in keys:
+        del key['rows']
+        rows = list(ActivityRollup.objects.filter(**key).order_by('pk'))
+        keep = rows[0]
+        if key['user'] is None:
+            # Rows of users deleted since (their user was nulled) are separate
+            # counts; copies from overlapping runs repeat the same username
+            keep.count = sum({row.username: row.count for row in reversed(rows)}.values())
+            keep.save(update_fields=['count'])
+        ActivityRollup.objects.filter(pk__in=[row.pk for row in rows[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity_log', '0005_activityrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activityrollup',
+            name='user',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='activity_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='activityrollup',
+            constraint=models.UniqueConstraint(fields=('period', 'period_start', 'action_type', 'user'), name='activity_rollup_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='activityrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('period', 'period_start', 'action_type'), name='activity_rollup_unique_no_user'),
+        ),
+    ]
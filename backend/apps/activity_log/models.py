@@ -1,21 +1,94 @@
 from django.db import models
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 from apps.accounts.models import User
 import uuid
 
+class ActivityLogQuerySet(models.QuerySet):
+    def for_listing(self):
+        """
+        Only the columns ActivityLogSerializer reads. The actor's username and
+        the target's display string are stored on the row, so listing never
+        touches the user or target tables.
+        """
+        return self.only('id', 'username', 'action_type', 'timestamp', 'message', 'object_repr')
+
+
 class ActivityLog(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='activity_logs')
+    # Snapshot of user.username when logged; survives renames and deletes
+    username = models.CharField(max_length=150, blank=True)
     action_type = models.CharField(max_length=50)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Assigned when the activity happens, not when a buffered batch is written
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     message = models.TextField(blank=True, null=True)
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.UUIDField()
     content_object = GenericForeignKey('content_type', 'object_id')
+    # Snapshot of str(content_object) when logged; survives the object's deletion
+    object_repr = models.CharField(max_length=255, blank=True)
+
+    objects = ActivityLogQuerySet.as_manager()
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Listing seeks on (timestamp, id), optionally behind a user / action_type filter
+            models.Index(fields=['timestamp', 'id'], name='activity_ts_idx'),
+            models.Index(fields=['user', 'timestamp', 'id'], name='activity_user_ts_idx'),
+            models.Index(fields=['action_type', 'timestamp', 'id'], name='activity_action_ts_idx'),
+            models.Index(fields=['user', 'action_type', 'timestamp', 'id'], name='activity_user_action_ts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username if self.user else 'Anonymous'} {self.action_type} {self.content_type.model}"
+
+
+class ActivityRollup(models.Model):
+    """
+    Count of ActivityLog rows per action type and user over one hour or one
+    day. Built by apps.activity_log.rollup; raw rows past the retention window
+    are deleted once they have been rolled up, so history older than that
+    lives only here.
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    PERIOD_CHOICES = [
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    period_start = models.DateTimeField()
+    action_type = models.CharField(max_length=50)
+    # Null only for entries logged without a user. A deleted user's id is kept
+    # (no FK constraint): nulling it could collide with the unique key below.
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='activity_rollups',
+    )
+    username = models.CharField(max_length=150, blank=True)
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['-period_start']
+        indexes = [
+            models.Index(fields=['period', 'period_start'], name='activity_rollup_period_idx'),
+            models.Index(fields=['user', 'period', 'period_start'], name='activity_rollup_user_idx'),
+        ]
+        constraints = [
+            # One row per bucket, so overlapping rollup runs can't count a period twice.
+            # NULLs are distinct in a unique index, hence the second constraint.
+            models.UniqueConstraint(
+                fields=['period', 'period_start', 'action_type', 'user'], name='activity_rollup_unique',
+            ),
+            models.UniqueConstraint(
+                fields=['period', 'period_start', 'action_type'], condition=models.Q(user__isnull=True),
+                name='activity_rollup_unique_no_user',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.action_type} x{self.count} ({self.period} of {self.period_start:%Y-%m-%d %H:%M})"
@@ -0,0 +1,79 @@
+from itertools import islice
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class ActivityLogCursorPagination(CursorPagination):
+    """
+    Keyset pagination, newest first. Each page seeks on (timestamp, id) from
+    the previous one instead of counting the table and skipping OFFSET rows,
+    so deep pages cost the same as the first.
+    """
+    ordering = ('-timestamp', '-id')
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class SegmentCursorPagination(ActivityLogCursorPagination):
+    """
+    The same cursor links and page shape as ActivityLogCursorPagination, for
+    entries read from segment files (see apps.activity_log.segments) rather
+    than a queryset.
+    """
+
+    def paginate_segments(self, reader, filters, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        # An empty page links back to where it started
+        self.start_position = cursor.position if cursor else None
+        position = self._parse_position(cursor.position) if cursor else None
+        walking_back = bool(cursor and cursor.reverse)
+
+        entries = reader.read(
+            **filters,
+            before=None if walking_back else position,
+            after=position if walking_back else None,
+            newest_first=not walking_back,
+        )
+        page = list(islice(entries, self.page_size + 1))
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+
+        if walking_back:
+            page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = page
+        return page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._position(self.page[-1]) if self.page else self.start_position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._position(self.page[0]) if self.page else self.start_position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    @staticmethod
+    def _position(entry):
+        return f"{entry.timestamp.isoformat()}|{entry.id}"
+
+    def _parse_position(self, position):
+        try:
+            timestamp, entry_id = position.split('|')
+            timestamp = parse_datetime(timestamp)
+        except (AttributeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+        return timestamp, entry_id
@@ -0,0 +1,154 @@
+"""
+Rollup and retention for ActivityLog.
+
+run_retention() is meant to run periodically (the rollup_activity_logs Celery
+task, or the activity_log_retention command). Each run:
+
+1. Counts raw rows into hourly ActivityRollup rows, up to the start of the
+   last complete hour that is at least ACTIVITY_LOG_ROLLUP_LAG seconds old.
+   The lag leaves time for buffered writes, which keep the timestamp from
+   when they were logged, to land before their hour is counted.
+2. Counts raw rows into daily rollups, up to the start of that day.
+3. Deletes raw rows older than ACTIVITY_LOG_RETENTION_DAYS in batches of
+   ACTIVITY_LOG_PURGE_BATCH_SIZE. Each batch is its own short transaction.
+   If ACTIVITY_LOG_ARCHIVE_DIR is set, each batch is first appended to a
+   gzipped NDJSON file there.
+
+A period is rolled up once and never revisited. The next period to roll up is
+the one after the newest existing rollup, so runs resume where the last one
+stopped. Overlapping runs (a slow beat task and a manual command, say) may
+count the same period, but ActivityRollup's unique constraints keep only the
+first row per bucket.
+"""
+import gzip
+import json
+import os
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import ActivityLog, ActivityRollup
+
+
+ONE_DAY = timedelta(days=1)
+
+
+def floor_hour(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(moment):
+    return floor_hour(moment).replace(hour=0)
+
+
+def _next_start(period):
+    last = ActivityRollup.objects.filter(period=period).aggregate(last=Max('period_start'))['last']
+    if last is not None:
+        return last + (timedelta(hours=1) if period == ActivityRollup.HOUR else ONE_DAY)
+    first = ActivityLog.objects.aggregate(first=Min('timestamp'))['first']
+    if first is None:
+        return None
+    return floor_hour(first) if period == ActivityRollup.HOUR else floor_day(first)
+
+
+def _rollup_window(period, start, end):
+    counts = (
+        ActivityLog.objects
+        .filter(timestamp__gte=start, timestamp__lt=end)
+        .annotate(bucket=Trunc('timestamp', period, tzinfo=dt_timezone.utc))
+        .values('bucket', 'action_type', 'user_id')
+        .annotate(total=Count('id'), last_username=Max('username'))
+        .order_by()
+    )
+    rollups = [
+        ActivityRollup(
+            period=period,
+            period_start=row['bucket'],
+            action_type=row['action_type'],
+            user_id=row['user_id'],
+            username=row['last_username'] or '',
+            count=row['total'],
+        )
+        for row in counts
+    ]
+    # Buckets another run has already written are skipped, not counted again
+    ActivityRollup.objects.bulk_create(rollups, batch_size=500, ignore_conflicts=True)
+    return len(rollups)
+
+
+def rollup(period, until):
+    """Roll up every complete `period` before `until`, one day per transaction."""
+    start = _next_start(period)
+    written = 0
+    while start is not None and start < until:
+        end = min(floor_day(start) + ONE_DAY, until)
+        with transaction.atomic():
+            written += _rollup_window(period, start, end)
+        start = end
+    return written
+
+
+def _archive(rows, archive_dir, before):
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"activity-log-before-{before:%Y%m%dT%H%M}.ndjson.gz")
+    with gzip.open(path, 'at', encoding='utf-8') as archive:
+        for row in rows:
+            archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+
+
+def purge(before, batch_size=None, archive_dir=None):
+    """Delete raw rows older than `before` in bounded batches, archiving them first if asked."""
+    batch_size = batch_size or getattr(settings, 'ACTIVITY_LOG_PURGE_BATCH_SIZE', 1000)
+    deleted = 0
+    while True:
+        rows = list(
+            ActivityLog.objects.filter(timestamp__lt=before)
+            .order_by('timestamp', 'id')
+            .values()[:batch_size]
+        )
+        if not rows:
+            return deleted
+        if archive_dir:
+            _archive(rows, archive_dir, before)
+        ActivityLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        deleted += len(rows)
+
+
+def run_retention(now=None, retention_days=None, delete=True):
+    now = now or timezone.now()
+    lag = timedelta(seconds=getattr(settings, 'ACTIVITY_LOG_ROLLUP_LAG', 900))
+    retention_days = retention_days or getattr(settings, 'ACTIVITY_LOG_RETENTION_DAYS', 90)
+
+    hour_cutoff = floor_hour(now - lag)
+    day_cutoff = floor_day(hour_cutoff)
+    report = {
+        'hourly rollups': rollup(ActivityRollup.HOUR, hour_cutoff),
+        'daily rollups': rollup(ActivityRollup.DAY, day_cutoff),
+        'deleted': 0,
+    }
+    if delete:
+        # Never delete rows that the daily rollup hasn't counted yet
+        before = min(now - timedelta(days=retention_days), day_cutoff)
+        report['deleted'] = purge(before, archive_dir=getattr(settings, 'ACTIVITY_LOG_ARCHIVE_DIR', None))
+    return report
+
+
+def activity_history(days=14, now=None):
+    """Per-day, per-action counts for the last `days` complete days, read from the daily rollups."""
+    today = floor_day(now or timezone.now())
+    rows = (
+        ActivityRollup.objects
+        .filter(period=ActivityRollup.DAY, period_start__gte=today - days * ONE_DAY)
+        .values('period_start', 'action_type')
+        .annotate(total=Sum('count'))
+        .order_by('period_start', 'action_type')
+    )
+    return [
+        {'date': row['period_start'].date(), 'action_type': row['action_type'], 'count': row['total']}
+        for row in rows
+    ]
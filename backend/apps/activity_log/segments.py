@@ -0,0 +1,274 @@
+"""
+Append-only segment files for the activity log, for deployments where the
+audit trail is written far more than it is read. Select with
+
+    ACTIVITY_LOG_BACKEND = 'apps.activity_log.segments.SegmentBackend'
+
+Each process appends JSON lines (the serialize_entry() form) to its own
+segment file in ACTIVITY_LOG_SEGMENT_DIR, named after the timestamp of its
+first entry and the pid. A segment is closed and a new one started once it
+reaches ACTIVITY_LOG_SEGMENT_MAX_BYTES. Next to every `.seg` file is a sparse
+`.idx` file with one "<timestamp in microseconds> <byte offset>" line per
+ACTIVITY_LOG_SEGMENT_INDEX_BYTES of segment data. Readers use it to seek
+close to a time bound instead of scanning the whole segment.
+
+Timestamps never go backwards within a segment. An entry stamped earlier than
+the one before it, because another thread won the lock, is moved forward to
+match it. That keeps each segment sorted, so the index can be binary searched.
+
+Durability is set by ACTIVITY_LOG_SEGMENT_FSYNC:
+- 'always': fsync after every entry.
+- 'interval' (default): fsync at most every ACTIVITY_LOG_SEGMENT_FSYNC_INTERVAL
+  seconds, and on flush and at exit.
+- 'never': leave it to the OS.
+Every entry is written through to the OS as soon as it is appended, so other
+processes can read it straight away. A crash can leave a partial last line;
+readers skip it.
+
+Entries written here never reach the database. UserActivitiesR reads them
+back through SegmentReader. Rollups, exports and the dashboard only see the
+database.
+"""
+import bisect
+import heapq
+import json
+import mmap
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from .backends import serialize_entry
+from .models import ActivityLog
+
+
+SEGMENT_SUFFIX = '.seg'
+INDEX_SUFFIX = '.idx'
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(moment):
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def default_directory():
+    return getattr(settings, 'ACTIVITY_LOG_SEGMENT_DIR', os.path.join(settings.BASE_DIR, 'var', 'activity-log'))
+
+
+class SegmentWriter:
+    def __init__(self, directory, max_bytes=None, index_bytes=None, fsync=None, fsync_interval=None):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes or getattr(settings, 'ACTIVITY_LOG_SEGMENT_MAX_BYTES', 64 * 1024 * 1024)
+        self.index_bytes = index_bytes or getattr(settings, 'ACTIVITY_LOG_SEGMENT_INDEX_BYTES', 64 * 1024)
+        self.fsync = fsync or getattr(settings, 'ACTIVITY_LOG_SEGMENT_FSYNC', 'interval')
+        self.fsync_interval = fsync_interval or getattr(settings, 'ACTIVITY_LOG_SEGMENT_FSYNC_INTERVAL', 1.0)
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"ACTIVITY_LOG_SEGMENT_FSYNC must be one of {FSYNC_POLICIES}, not {self.fsync!r}")
+        self._lock = threading.Lock()
+        self._segment = None
+        self._index = None
+        self._pid = None
+        self._size = 0
+        self._indexed_at = None
+        self._last_timestamp = None
+        self._synced_at = 0.0
+
+    def append(self, entry):
+        with self._lock:
+            if self._last_timestamp is not None and entry.timestamp < self._last_timestamp:
+                entry.timestamp = self._last_timestamp
+            self._last_timestamp = entry.timestamp
+            micros = to_micros(entry.timestamp)
+
+            # A forked worker must not share its parent's segment
+            if self._segment is None or self._pid != os.getpid() or self._size >= self.max_bytes:
+                self._open(micros)
+
+            line = (json.dumps(serialize_entry(entry), separators=(',', ':')) + '\n').encode('utf-8')
+            offset = self._size
+            self._segment.write(line)
+            self._segment.flush()
+            self._size += len(line)
+
+            if self._indexed_at is None or offset - self._indexed_at >= self.index_bytes:
+                self._index.write(f"{micros} {offset}\n".encode('ascii'))
+                self._index.flush()
+                self._indexed_at = offset
+
+            if self.fsync == 'always' or (
+                self.fsync == 'interval' and time.monotonic() - self._synced_at >= self.fsync_interval
+            ):
+                self._sync()
+
+    def sync(self):
+        with self._lock:
+            if self._segment is not None and self._pid == os.getpid():
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _open(self, micros):
+        self._close()
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{micros:020d}-{os.getpid()}")
+        self._segment = open(base + SEGMENT_SUFFIX, 'ab')
+        self._index = open(base + INDEX_SUFFIX, 'ab')
+        self._pid = os.getpid()
+        self._size = self._segment.tell()
+        self._indexed_at = None
+
+    def _close(self):
+        if self._segment is None:
+            return
+        if self._pid == os.getpid() and self.fsync != 'never':
+            self._sync()
+        self._segment.close()
+        self._index.close()
+        self._segment = self._index = None
+
+    def _sync(self):
+        os.fsync(self._segment.fileno())
+        os.fsync(self._index.fileno())
+        self._synced_at = time.monotonic()
+
+
+class SegmentReader:
+    """Time-range reads over the segments in `directory`, merged across writers."""
+
+    def __init__(self, directory=None):
+        self.directory = str(directory or default_directory())
+
+    def segments(self):
+        """(first entry micros, path without suffix) for every segment, oldest first."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        segments = []
+        for name in names:
+            if name.endswith(SEGMENT_SUFFIX):
+                stem = name[:-len(SEGMENT_SUFFIX)]
+                segments.append((int(stem.split('-', 1)[0]), os.path.join(self.directory, stem)))
+        return sorted(segments)
+
+    def read(self, since=None, until=None, user=None, action_type=None, before=None, after=None, newest_first=True):
+        """
+        Yield unsaved ActivityLog instances in (timestamp, id) order.
+
+        `since` is inclusive and `until` exclusive, as for the database filters.
+        `before` / `after` are exclusive (timestamp, id) keyset bounds for paging.
+        """
+        lower = to_micros(since) if since else None
+        upper = to_micros(until) - 1 if until else None
+        if after is not None:
+            after = (to_micros(after[0]), str(after[1]))
+            lower = after[0] if lower is None else max(lower, after[0])
+        if before is not None:
+            before = (to_micros(before[0]), str(before[1]))
+            upper = before[0] if upper is None else min(upper, before[0])
+        user = str(user) if user else None
+
+        for key, record in self.scan(lower, upper, reverse=newest_first):
+            if before is not None and key >= before:
+                continue
+            if after is not None and key <= after:
+                continue
+            if user and record['user_id'] != user:
+                continue
+            if action_type and record['action_type'] != action_type:
+                continue
+            yield ActivityLog(**dict(record, timestamp=parse_datetime(record['timestamp'])))
+
+    def scan(self, lower=None, upper=None, reverse=False):
+        """Yield ((micros, id), record) between inclusive micros bounds, merged across segments."""
+        scans = [
+            self._scan_segment(path, lower, upper, reverse)
+            for first, path in self.segments()
+            if upper is None or first <= upper
+        ]
+        return heapq.merge(*scans, key=lambda item: item[0], reverse=reverse)
+
+    def _checkpoints(self, path):
+        try:
+            with open(path + INDEX_SUFFIX, 'rb') as index:
+                pairs = [line.split() for line in index.read().splitlines()]
+        except FileNotFoundError:
+            return [], []
+        # A crash can cut the last index line short
+        pairs = [pair for pair in pairs if len(pair) == 2]
+        return [int(micros) for micros, _ in pairs], [int(offset) for _, offset in pairs]
+
+    def _scan_segment(self, path, lower, upper, reverse):
+        with open(path + SEGMENT_SUFFIX, 'rb') as segment:
+            size = os.fstat(segment.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # Only complete lines: a crash can leave a partial last one
+                end = data.rfind(b'\n') + 1
+                stamps, offsets = self._checkpoints(path)
+                if reverse:
+                    if upper is not None:
+                        position = bisect.bisect_right(stamps, upper)
+                        if position < len(offsets):
+                            end = min(end, offsets[position])
+                    lines = self._lines_backward(data, end)
+                else:
+                    start = 0
+                    if lower is not None:
+                        position = bisect.bisect_left(stamps, lower) - 1
+                        if position >= 0:
+                            start = offsets[position]
+                    lines = self._lines_forward(data, start, end)
+
+                for line in lines:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    micros = to_micros(parse_datetime(record['timestamp']))
+                    if lower is not None and micros < lower:
+                        if reverse:
+                            return
+                        continue
+                    if upper is not None and micros > upper:
+                        if reverse:
+                            continue
+                        return
+                    yield (micros, record['id']), record
+
+    @staticmethod
+    def _lines_forward(data, start, end):
+        while start < end:
+            newline = data.find(b'\n', start, end)
+            yield data[start:newline]
+            start = newline + 1
+
+    @staticmethod
+    def _lines_backward(data, end):
+        while end > 0:
+            newline = data.rfind(b'\n', 0, end - 1)
+            yield data[newline + 1:end - 1]
+            end = newline + 1
+
+
+class SegmentBackend:
+    def __init__(self, directory=None, **options):
+        self.writer = SegmentWriter(directory or default_directory(), **options)
+
+    def write(self, entry):
+        self.writer.append(entry)
+
+    def flush(self):
+        self.writer.sync()
+
+    def reader(self):
+        return SegmentReader(self.writer.directory)
@@ -0,0 +1,17 @@
+from celery import shared_task
+
+from .models import ActivityLog
+
+
+@shared_task
+def write_activity_logs(entries):
+    """Persist a batch of serialized log entries (see BufferedBackend)."""
+    from .backends import store_entries
+    store_entries([ActivityLog(**entry) for entry in entries])
+
+
+@shared_task
+def rollup_activity_logs():
+    """Periodic rollup and retention pass (see apps.activity_log.rollup)."""
+    from .rollup import run_retention
+    return run_retention()
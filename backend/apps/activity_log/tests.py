@@ -1,3 +1,366 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.contenttypes.models import ContentType
+from django.db import OperationalError, connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.core.models import Class, Subject
+from .backends import BufferedBackend, get_backend
+from .filters import filter_activity_logs
+from . import rollup as rollup_module
+from .models import ActivityLog, ActivityRollup
+from .rollup import activity_history, purge, run_retention
+from .segments import SegmentBackend
+from .tasks import write_activity_logs
+from .utils import log_activity
+
+
+BUFFERED = 'apps.activity_log.backends.BufferedBackend'
+SEGMENTS = 'apps.activity_log.segments.SegmentBackend'
+
+
+class LogActivityBackendTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin')
+        self.subject = Subject.objects.create(name="Math", code="MATH101")
+
+    def test_default_backend_writes_immediately(self):
+        log_activity(self.admin, 'Subject Creation', 'created', content_object=self.subject)
+        self.assertEqual(ActivityLog.objects.count(), 1)
+
+    @override_settings(ACTIVITY_LOG_BACKEND=BUFFERED, ACTIVITY_LOG_BATCH_SIZE=3, ACTIVITY_LOG_FLUSH_INTERVAL=60)
+    def test_buffered_backend_flushes_on_batch_size(self):
+        log_activity(self.admin, 'Subject Update', 'one', content_object=self.subject)
+        log_activity(self.admin, 'Subject Update', 'two', content_object=self.subject)
+        self.assertEqual(ActivityLog.objects.count(), 0)
+
+        with self.assertNumQueries(1):
+            log_activity(self.admin, 'Subject Update', 'three', content_object=self.subject)
+        self.assertEqual(ActivityLog.objects.count(), 3)
+
+    @override_settings(ACTIVITY_LOG_BACKEND=BUFFERED, ACTIVITY_LOG_FLUSH_INTERVAL=60)
+    def test_buffered_entries_keep_their_timestamp(self):
+        log_activity(self.admin, 'Subject Update', 'queued', content_object=self.subject)
+        queued_at = get_backend()._pending[0].timestamp
+        get_backend().flush()
+        self.assertEqual(ActivityLog.objects.get().timestamp, queued_at)
+
+    def test_celery_batches_are_idempotent(self):
+        backend = BufferedBackend(batch_size=10, flush_interval=60, use_celery=True)
+        content_type = ContentType.objects.get_for_model(Subject)
+        with mock.patch.object(write_activity_logs, 'delay', side_effect=write_activity_logs) as delay:
+            for message in ('one', 'two'):
+                backend.write(ActivityLog(
+                    user=self.admin, action_type='Subject Update', message=message,
+                    content_type=content_type, object_id=self.subject.id,
+                ))
+            backend.flush()
+            self.assertEqual(delay.call_count, 1)
+            # A redelivered batch must not duplicate rows
+            write_activity_logs(delay.call_args.args[0])
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+    def test_snapshots_survive_rename_and_delete(self):
+        log_activity(self.admin, 'Subject Creation', 'created', content_object=self.subject)
+        self.admin.username = 'renamed'
+        self.admin.save()
+        self.subject.delete()
+
+        log = ActivityLog.objects.for_listing().get()
+        self.assertEqual(log.username, 'admin')
+        self.assertEqual(log.object_repr, "Math")
+
+    def test_class_snapshot_matches_the_backfill(self):
+        class_obj = Class.objects.create(name="Class A", academic_year="2024", schedule="Mon")
+        log_activity(self.admin, 'Class Creation', 'created', content_object=class_obj)
+        # Same column the 0003 migration copied for older rows
+        self.assertEqual(ActivityLog.objects.get().object_repr, "Class A")
+
+
+class BufferedBackendFailureTests(TransactionTestCase):
+    """Real commits, so deferred foreign key checks fire as they do in a worker."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin')
+        self.subject = Subject.objects.create(name="Math", code="MATH101")
+        self.content_type = ContentType.objects.get_for_model(Subject)
+
+    def entry(self, user, message):
+        return ActivityLog(
+            user=user, username=user.username, action_type='User Login', message=message,
+            content_type=self.content_type, object_id=self.subject.id,
+        )
+
+    def test_entry_for_a_deleted_user_does_not_block_the_buffer(self):
+        backend = BufferedBackend(batch_size=10, flush_interval=60, use_celery=False)
+        student = User.objects.create_user(username='student', password='password')
+        backend.write(self.entry(student, 'before delete'))
+        User.all_objects.filter(pk=student.pk).delete()
+        backend.write(self.entry(self.admin, 'other login'))
+        backend.flush()
+
+        self.assertEqual(len(backend), 0)
+        logs = dict(ActivityLog.objects.values_list('message', 'user_id'))
+        self.assertEqual(logs, {'before delete': None, 'other login': self.admin.pk})
+        self.assertEqual(ActivityLog.objects.get(message='before delete').username, 'student')
+
+    def test_failed_writes_are_retried_then_dropped(self):
+        backend = BufferedBackend(batch_size=10, flush_interval=60, use_celery=False)
+        backend.write(self.entry(self.admin, 'one'))
+        with mock.patch('apps.activity_log.backends.store_entries', side_effect=OperationalError('database is locked')), \
+                self.assertLogs('apps.activity_log.backends', 'ERROR'):
+            for _ in range(backend.max_attempts - 1):
+                backend.flush()
+                self.assertEqual(len(backend), 1)
+            backend.flush()
+        self.assertEqual(len(backend), 0)
+
+
+class ActivityLogListingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.student = User.objects.create_user(username='student', password='password')
+        self.client.force_authenticate(user=self.admin)
+        self.subject = Subject.objects.create(name="Math", code="MATH101")
+        for i in range(6):
+            log_activity(self.student, 'User Login', f'login {i}', content_object=self.student)
+            log_activity(self.admin, 'Subject Update', f'update {i}', content_object=self.subject)
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.order_by('-timestamp', '-id')[:11].explain()
+        self.assertIn(f"USING INDEX {index}", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_pages_walk_the_whole_log_without_counting(self):
+        url = reverse('admin_panel:activities')
+        seen = []
+        next_url = f"{url}?page_size=5"
+        while next_url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(next_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+            seen.extend(item['id'] for item in response.data['results'])
+            next_url = response.data['next']
+        expected = [str(pk) for pk in ActivityLog.objects.order_by('-timestamp', '-id').values_list('id', flat=True)]
+        self.assertEqual(seen, expected)
+
+    def test_filters(self):
+        url = reverse('admin_panel:activities')
+        response = self.client.get(url, {'user': self.student.id, 'page_size': 100})
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertTrue(all(item['user_username'] == 'student' for item in response.data['results']))
+
+        response = self.client.get(url, {'action_type': 'Subject Update', 'page_size': 100})
+        self.assertEqual({item['action_type'] for item in response.data['results']}, {'Subject Update'})
+
+        middle = ActivityLog.objects.order_by('timestamp')[5].timestamp
+        response = self.client.get(url, {'since': middle.isoformat(), 'page_size': 100})
+        self.assertEqual(len(response.data['results']), 7)
+        response = self.client.get(url, {'until': middle.isoformat(), 'page_size': 100})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_invalid_filters_are_rejected(self):
+        url = reverse('admin_panel:activities')
+        self.assertEqual(self.client.get(url, {'user': 'nope'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'since': 'yesterday'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @skipUnless(connection.vendor == 'sqlite', "reads SQLite's EXPLAIN QUERY PLAN output")
+    def test_each_filter_combination_uses_its_index(self):
+        since = timezone.now() - timedelta(days=1)
+        cases = [
+            ({}, 'activity_ts_idx'),
+            ({'since': since.isoformat()}, 'activity_ts_idx'),
+            ({'user': str(self.student.id)}, 'activity_user_ts_idx'),
+            ({'user': str(self.student.id), 'since': since.isoformat()}, 'activity_user_ts_idx'),
+            ({'action_type': 'User Login'}, 'activity_action_ts_idx'),
+            ({'action_type': 'User Login', 'until': timezone.now().isoformat()}, 'activity_action_ts_idx'),
+            ({'user': str(self.student.id), 'action_type': 'User Login'}, 'activity_user_action_ts_idx'),
+        ]
+        for params, index in cases:
+            with self.subTest(params=params):
+                self.assertUsesIndex(filter_activity_logs(ActivityLog.objects.for_listing(), params), index)
+
+    @skipUnless(connection.vendor == 'sqlite', "reads SQLite's EXPLAIN QUERY PLAN output")
+    def test_cursor_seek_uses_index(self):
+        last = ActivityLog.objects.order_by('-timestamp', '-id')[3]
+        queryset = ActivityLog.objects.for_listing().filter(user=self.student, timestamp__lt=last.timestamp)
+        self.assertUsesIndex(queryset, 'activity_user_ts_idx')
+
+
+class ActivityRollupTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user(username='student', password='password')
+        self.now = datetime(2026, 3, 10, 12, 30, tzinfo=dt_timezone.utc)
+
+    def log_at(self, moment, action_type='User Login'):
+        ActivityLog.objects.create(
+            user=self.student, username=self.student.username, action_type=action_type,
+            content_type=ContentType.objects.get_for_model(User), object_id=self.student.id,
+            timestamp=moment,
+        )
+
+    def test_rolls_up_hours_and_days_then_purges_past_retention(self):
+        old_day = self.now - timedelta(days=100)
+        self.log_at(old_day.replace(hour=9, minute=5))
+        self.log_at(old_day.replace(hour=9, minute=40))
+        self.log_at(old_day.replace(hour=15), action_type='Subject Update')
+        self.log_at(self.now - timedelta(minutes=5))
+
+        report = run_retention(now=self.now, retention_days=90)
+
+        self.assertEqual(report, {'hourly rollups': 2, 'daily rollups': 2, 'deleted': 3})
+        hourly = ActivityRollup.objects.get(period=ActivityRollup.HOUR, action_type='User Login')
+        self.assertEqual((hourly.period_start.hour, hourly.count, hourly.username), (9, 2, 'student'))
+        self.assertEqual(
+            sorted(ActivityRollup.objects.filter(period=ActivityRollup.DAY).values_list('action_type', 'count')),
+            [('Subject Update', 1), ('User Login', 2)],
+        )
+        # The recent row is inside the lag and the retention window: neither counted nor deleted
+        self.assertEqual(ActivityLog.objects.count(), 1)
+
+    def test_reruns_do_not_double_count(self):
+        self.log_at(self.now - timedelta(days=2))
+        run_retention(now=self.now, delete=False)
+        self.log_at(self.now - timedelta(hours=3))
+        report = run_retention(now=self.now, delete=False)
+
+        self.assertEqual(report['hourly rollups'], 1)
+        self.assertEqual(report['daily rollups'], 0)
+        total = ActivityRollup.objects.filter(period=ActivityRollup.HOUR).aggregate(total=Sum('count'))['total']
+        self.assertEqual(total, 2)
+
+    def test_overlapping_runs_do_not_double_count(self):
+        self.log_at(self.now - timedelta(days=2))
+        ActivityLog.objects.create(
+            action_type='User Login', content_type=ContentType.objects.get_for_model(User),
+            object_id=self.student.id, timestamp=self.now - timedelta(days=2),
+        )
+        first_start = rollup_module._next_start(ActivityRollup.HOUR), rollup_module._next_start(ActivityRollup.DAY)
+        run_retention(now=self.now, delete=False)
+        # A second run that read where to start before the first one committed
+        with mock.patch.object(rollup_module, '_next_start', side_effect=first_start):
+            run_retention(now=self.now, delete=False)
+
+        for period in (ActivityRollup.HOUR, ActivityRollup.DAY):
+            rollups = ActivityRollup.objects.filter(period=period)
+            self.assertEqual(sorted(rollups.values_list('user', 'count'), key=str), [(None, 1), (self.student.id, 1)])
+
+    def test_purge_works_in_batches_and_archives(self):
+        for day in range(5):
+            self.log_at(self.now - timedelta(days=200 + day))
+        with tempfile.TemporaryDirectory() as archive_dir:
+            with self.assertNumQueries(2 * 3 + 1):
+                deleted = purge(self.now - timedelta(days=100), batch_size=2, archive_dir=archive_dir)
+            [name] = os.listdir(archive_dir)
+            with gzip.open(os.path.join(archive_dir, name), 'rt') as archive:
+                archived = [json.loads(line) for line in archive]
+        self.assertEqual(deleted, 5)
+        self.assertEqual(len(archived), 5)
+        self.assertFalse(ActivityLog.objects.exists())
+
+    def test_history_reads_daily_rollups(self):
+        self.log_at(self.now - timedelta(days=3))
+        self.log_at(self.now - timedelta(days=3))
+        run_retention(now=self.now, delete=False)
+        ActivityLog.objects.all().delete()
+
+        self.assertEqual(activity_history(days=7, now=self.now), [
+            {'date': (self.now - timedelta(days=3)).date(), 'action_type': 'User Login', 'count': 2},
+        ])
+
+
+class SegmentBackendTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.student = User.objects.create_user(username='student', password='password')
+        self.start = datetime(2026, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+
+    def entry(self, minutes, action_type='User Login', user=None):
+        user = user or self.student
+        return ActivityLog(
+            user=user, username=user.username, action_type=action_type, message=f"at {minutes}",
+            timestamp=self.start + timedelta(minutes=minutes),
+        )
+
+    def test_rotates_indexes_and_reads_time_ranges(self):
+        backend = SegmentBackend(self.directory, max_bytes=2048, index_bytes=512, fsync='never')
+        for minute in range(60):
+            backend.write(self.entry(minute))
+        backend.writer.close()
+
+        reader = backend.reader()
+        self.assertGreater(len(reader.segments()), 3)
+        with open(reader.segments()[0][1] + '.idx') as index:
+            self.assertGreater(len(index.readlines()), 1)
+
+        since, until = self.start + timedelta(minutes=10), self.start + timedelta(minutes=20)
+        newest = [entry.message for entry in reader.read(since=since, until=until)]
+        self.assertEqual(newest, [f"at {minute}" for minute in range(19, 9, -1)])
+        oldest = [entry.message for entry in reader.read(since=since, until=until, newest_first=False)]
+        self.assertEqual(oldest, newest[::-1])
+
+    def test_merges_writers_and_skips_torn_lines(self):
+        other = User.objects.create_user(username='other', password='password')
+        first = SegmentBackend(self.directory, fsync='always')
+        second = SegmentBackend(self.directory, fsync='always')
+        for minute in range(0, 10, 2):
+            first.write(self.entry(minute))
+            second.write(self.entry(minute + 1, action_type='User Logout', user=other))
+        # Two segments in one process need distinct names; the second writer started a minute later
+        self.assertEqual(len(first.reader().segments()), 2)
+        with open(first.reader().segments()[0][1] + '.seg', 'ab') as segment:
+            segment.write(b'{"id": "torn')
+
+        reader = first.reader()
+        self.assertEqual([entry.message for entry in reader.read()], [f"at {minute}" for minute in range(9, -1, -1)])
+        self.assertEqual(len(list(reader.read(user=other.id))), 5)
+        self.assertEqual(len(list(reader.read(action_type='User Login'))), 5)
+
+    def test_timestamps_never_go_backwards_within_a_segment(self):
+        backend = SegmentBackend(self.directory)
+        backend.write(self.entry(5))
+        late = self.entry(1)
+        backend.write(late)
+        self.assertEqual(late.timestamp, self.start + timedelta(minutes=5))
+
+    def test_user_activities_reads_segments_transparently(self):
+        admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        with override_settings(ACTIVITY_LOG_BACKEND=SEGMENTS, ACTIVITY_LOG_SEGMENT_DIR=self.directory):
+            with self.assertNumQueries(0):
+                for i in range(7):
+                    log_activity(self.student, 'User Login', f'login {i}')
+            self.assertFalse(ActivityLog.objects.exists())
+
+            url = reverse('admin_panel:activities')
+            response = client.get(url, {'page_size': 3})
+            self.assertEqual([item['message'] for item in response.data['results']], ['login 6', 'login 5', 'login 4'])
+            self.assertIsNone(response.data['previous'])
+            response = client.get(response.data['next'])
+            response = client.get(response.data['next'])
+            self.assertEqual([item['message'] for item in response.data['results']], ['login 0'])
+            self.assertIsNone(response.data['next'])
+            response = client.get(response.data['previous'])
+            self.assertEqual([item['message'] for item in response.data['results']], ['login 3', 'login 2', 'login 1'])
+            self.assertEqual(response.data['results'][0]['user_username'], 'student')
+
+            response = client.get(url, {'action_type': 'User Logout'})
+            self.assertEqual(response.data['results'], [])
@@ -1,20 +1,26 @@
 from django.contrib.contenttypes.models import ContentType
+from .backends import get_backend
 from .models import ActivityLog
 
 def log_activity(user, action_type, message, content_object=None):
     """Logs an activity for a given user and content object."""
     if content_object:
         content_type = ContentType.objects.get_for_model(content_object)
-        ActivityLog.objects.create(
+        entry = ActivityLog(
             user=user,
+            username=user.username if user else '',
             action_type=action_type,
             message=message,
             content_type=content_type,
-            object_id=content_object.id
+            object_id=content_object.id,
+            object_repr=str(content_object)[:255]
         )
     else:
-        ActivityLog.objects.create(
+        entry = ActivityLog(
             user=user,
+            username=user.username if user else '',
             action_type=action_type,
             message=message,
-        )
\ No newline at end of file
+        )
+    # Written now, or queued, depending on ACTIVITY_LOG_BACKEND
+    get_backend().write(entry)
@@ -1,12 +1,15 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
+from .filters import filter_activity_logs
 from .models import ActivityLog
+from .pagination import ActivityLogCursorPagination
 from .serializers import ActivityLogSerializer
 
 class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = ActivityLog.objects.all()
     serializer_class = ActivityLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ActivityLogCursorPagination
 
     def get_queryset(self):
-        return ActivityLog.objects.all().order_by('-timestamp')
+        return filter_activity_logs(ActivityLog.objects.for_listing(), self.request.query_params)
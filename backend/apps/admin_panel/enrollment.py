@@ -0,0 +1,168 @@
+"""
+Diff-based class enrollment: add and remove students, teachers and subjects
+across many classes in one request instead of resending every roster.
+
+    {"changes": [
+        {"class": "<uuid>",
+         "add": {"students": [...], "teachers": [...], "subjects": [...]},
+         "remove": {"students": [...]}},
+        ...
+    ]}
+
+Ids are checked with one query per type: classes, users (students and
+teachers together, with their role) and subjects. The change is then applied
+in one transaction: per relation, one DELETE for the removals, one query for
+the pairs already enrolled and a bulk INSERT of the rest into the through
+table (each split further only past the database's parameter limit). Adding a member who is already enrolled, or removing one
+who isn't, is a no-op.
+
+Through-table writes skip m2m_changed, so the changed classes are touched
+(updated_at, for their ETags) directly.
+"""
+from django.db import connection, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from apps.accounts.models import User
+from apps.core.models import Class, Subject
+from apps.core.signals import touch_classes
+
+
+# relation name -> (through table column, role the member must have, or None for subjects)
+RELATIONS = {
+    'students': ('user_id', 'Student'),
+    'teachers': ('user_id', 'Teacher'),
+    'subjects': ('subject_id', None),
+}
+
+
+class MembersSerializer(serializers.Serializer):
+    students = serializers.ListField(child=serializers.UUIDField(), required=False, default=list)
+    teachers = serializers.ListField(child=serializers.UUIDField(), required=False, default=list)
+    subjects = serializers.ListField(child=serializers.UUIDField(), required=False, default=list)
+
+
+class EnrollmentChangeSerializer(serializers.Serializer):
+    add = MembersSerializer(required=False, default=dict)
+    remove = MembersSerializer(required=False, default=dict)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # "class" is a keyword, so it can't be declared in the class body
+        fields['class'] = serializers.UUIDField()
+        return fields
+
+    def validate(self, attrs):
+        for relation in RELATIONS:
+            both = set(attrs['add'].get(relation, [])) & set(attrs['remove'].get(relation, []))
+            if both:
+                raise serializers.ValidationError({relation: [f"Both added and removed: {', '.join(sorted(map(str, both)))}."]})
+        return attrs
+
+
+class EnrollmentSerializer(serializers.Serializer):
+    changes = EnrollmentChangeSerializer(many=True, allow_empty=False)
+
+
+def _chunks(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _max_params():
+    return connection.features.max_query_params or 10000
+
+
+def _known(queryset, ids, *fields):
+    """Rows of `fields` for the given primary keys, chunked to the parameter limit."""
+    rows = []
+    for chunk in _chunks(ids, _max_params()):
+        rows.extend(queryset.filter(pk__in=chunk).values_list('pk', *fields))
+    return rows
+
+
+def validate_changes(changes):
+    """Per-change errors for unknown classes and unknown or wrong-role members."""
+    class_ids = {change['class'] for change in changes}
+    user_ids, subject_ids = set(), set()
+    for change in changes:
+        for members in (change['add'], change['remove']):
+            user_ids.update(members.get('students', []), members.get('teachers', []))
+            subject_ids.update(members.get('subjects', []))
+
+    known_classes = {pk for pk, in _known(Class.objects, class_ids)}
+    roles = dict(_known(User.objects, user_ids, 'role'))
+    known_subjects = {pk for pk, in _known(Subject.objects, subject_ids)}
+
+    errors = []
+    for number, change in enumerate(changes):
+        change_errors = {}
+        if change['class'] not in known_classes:
+            change_errors['class'] = ['Class not found.']
+        for direction in ('add', 'remove'):
+            direction_errors = {}
+            for relation, (_, role) in RELATIONS.items():
+                ids = change[direction].get(relation, [])
+                if role is None:
+                    bad = [pk for pk in ids if pk not in known_subjects]
+                else:
+                    bad = [pk for pk in ids if roles.get(pk) != role]
+                if bad:
+                    noun = 'subject' if role is None else role.lower()
+                    direction_errors[relation] = [f"Not a {noun}: {', '.join(map(str, bad))}."]
+            if direction_errors:
+                change_errors[direction] = direction_errors
+        if change_errors:
+            errors.append({'change': number, 'errors': change_errors})
+    return errors
+
+
+def _pairs(changes, direction, relation):
+    pairs = set()
+    for change in changes:
+        for member in change[direction].get(relation, []):
+            pairs.add((change['class'], member))
+    return pairs
+
+
+def _pair_filter(column, pairs):
+    """Q matching the (class, member) pairs, as one OR term per class."""
+    by_class = {}
+    for class_id, member in pairs:
+        by_class.setdefault(class_id, []).append(member)
+    condition = Q()
+    for class_id, members in by_class.items():
+        condition |= Q(class_id=class_id, **{f'{column}__in': members})
+    return condition
+
+
+def _pair_batches(pairs):
+    # Each pair costs at most two parameters
+    return _chunks(sorted(pairs), max(1, _max_params() // 2))
+
+
+def apply_changes(changes, batch_size=None):
+    """
+    Apply validated changes. Returns {'added': {relation: n}, 'removed': {relation: n}}.
+    Changes that touch the same class are applied together; within a request,
+    removals happen before additions.
+    """
+    added, removed = {}, {}
+    with transaction.atomic():
+        for relation, (column, _) in RELATIONS.items():
+            through = getattr(Class, relation).through
+
+            removed[relation] = 0
+            for batch in _pair_batches(_pairs(changes, 'remove', relation)):
+                removed[relation] += through.objects.filter(_pair_filter(column, batch)).delete()[0]
+
+            wanted = _pairs(changes, 'add', relation)
+            existing = set()
+            for batch in _pair_batches(wanted):
+                existing.update(through.objects.filter(_pair_filter(column, batch)).values_list('class_id', column))
+            rows = [through(class_id=class_id, **{column: member}) for class_id, member in sorted(wanted - existing)]
+            through.objects.bulk_create(rows, batch_size=batch_size)
+            added[relation] = len(rows)
+        touch_classes(pk__in={change['class'] for change in changes})
+    return {'added': added, 'removed': removed}
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.admin_panel.user_import import default_workers, import_users, read_rows
+from apps.core.models import Class
+
+
+class Command(BaseCommand):
+    help = "Create users in bulk from a CSV or JSON file, optionally enrolling them in a class."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='A .csv with a header row, or a .json list of objects.')
+        parser.add_argument('--class', dest='class_id', help='Enroll imported students / teachers in this class.')
+        parser.add_argument('--skip-invalid', action='store_true', help='Import the valid rows even if some are invalid.')
+        parser.add_argument('--workers', type=int, help='Password hashing processes. Defaults to ADMIN_USER_IMPORT_WORKERS, or one per CPU.')
+
+    def handle(self, *args, **options):
+        class_obj = None
+        if options['class_id']:
+            class_obj = Class.objects.filter(pk=options['class_id']).first()
+            if class_obj is None:
+                raise CommandError(f"No class with id {options['class_id']}")
+
+        with open(options['path'], 'rb') as upload:
+            rows = read_rows(upload)
+        result = import_users(rows, class_obj=class_obj, skip_invalid=options['skip_invalid'], workers=options['workers'] or default_workers())
+
+        for error in result['errors']:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(f"created {len(result['users'])} users, enrolled {result['enrolled']}, {len(result['errors'])} invalid rows")
+        if result['errors'] and not result['users']:
+            raise CommandError('Nothing imported; fix the rows above or pass --skip-invalid.')
@@ -0,0 +1,66 @@
+import os
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from apps.admin_panel.serializers.user_serializers import UserCreateSerializer
+from apps.admin_panel.user_import import import_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Time creating users one UserCreateSerializer at a time against the bulk "
+        "importer, serial and with a hashing pool. Nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument(
+            '--baseline', type=int, default=50,
+            help='Rows to time through UserCreateSerializer; the total is extrapolated from these.',
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            '--fast-hasher', action='store_true',
+            help='Use MD5 instead of the configured hasher, to time everything but hashing.',
+        )
+
+    def handle(self, *args, **options):
+        overrides = {'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher']} if options['fast_hasher'] else {}
+        prefix = f"bench-{uuid.uuid4().hex[:6]}"
+        rows = [
+            {'username': f"{prefix}-{i}", 'email': f"{prefix}-{i}@example.com", 'password': f"pw-{i}-secret", 'full_name': f"Student {i}"}
+            for i in range(options['users'])
+        ]
+
+        with override_settings(**overrides):
+            seconds = self.timed(self.one_at_a_time, rows[:options['baseline']])
+            total = len(rows)
+            self.report('one POST per user', total, seconds * total / options['baseline'], extrapolated=True)
+            self.report('bulk, 1 worker', total, self.timed(import_users, rows, workers=1))
+            if options['workers'] > 1:
+                self.report(f"bulk, {options['workers']} workers", total, self.timed(import_users, rows, workers=options['workers']))
+
+    def one_at_a_time(self, rows):
+        for row in rows:
+            serializer = UserCreateSerializer(data=dict(row, cpassword=row['password']))
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+    def timed(self, function, *args, **kwargs):
+        # Roll back so every run inserts the same usernames
+        with transaction.atomic():
+            started = time.perf_counter()
+            result = function(*args, **kwargs)
+            elapsed = time.perf_counter() - started
+            if isinstance(result, dict) and result['errors']:
+                raise RuntimeError(f"Import reported errors: {result['errors'][:3]}")
+            transaction.set_rollback(True)
+        return elapsed
+
+    def report(self, name, users, seconds, extrapolated=False):
+        note = '  (extrapolated)' if extrapolated else ''
+        self.stdout.write(f"{name:<20} {seconds:9.2f} s  {users / seconds:9.0f} users/s{note}")
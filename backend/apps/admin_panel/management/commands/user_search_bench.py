@@ -0,0 +1,79 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from apps.accounts.models import User, USER_SEARCH
+
+
+# What an admin types into the search box, keystroke by keystroke, then a
+# phone number, a term matching every email and one matching nothing
+TERMS = ('k', 'ka', 'kar', 'karo', 'karo m', '0312', '0312555', 'example.c', 'zzz')
+
+SYLLABLES = (
+    'ka', 'ro', 'mi', 'na', 'li', 'sa', 'ta', 'jo', 'ha', 'ne', 'ma', 'ri', 'da', 'ze', 'fa',
+    'lu', 'bo', 'ki', 'ya', 'so', 'an', 'el', 'ar', 'om', 'us', 'ib', 'ra', 'vi', 'pe', 'do',
+)
+
+
+class Command(BaseCommand):
+    help = "Time the admin user search with the old icontains filter and the search index. Nothing is kept."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per term and method.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['users'])
+            self.stdout.write(f"{'term':<12} {'icontains ms':>13} {'index ms':>9} {'matches':>8}")
+            for term in TERMS:
+                old = self.timed(self.icontains_page, term, options['repeat'])
+                new = self.timed(self.search_page, term, options['repeat'])
+                matches = USER_SEARCH.search(User.objects.all(), term).count()
+                self.stdout.write(f"{term!r:<12} {old:13.2f} {new:9.2f} {matches:8d}")
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        started = time.perf_counter()
+        prefix = uuid.uuid4().hex[:6]
+        generator = random.Random(42)
+
+        def name():
+            return ''.join(generator.choice(SYLLABLES) for _ in range(generator.randint(2, 3)))
+
+        users = []
+        for i in range(count):
+            first, last = name(), name()
+            users.append(User(
+                username=f'{first}{last}{prefix}{i}', email=f'{first}.{last}{i}@example.com',
+                full_name=f'{first.title()} {last.title()}', phone_number=f'03{generator.randint(0, 10 ** 9 - 1):09d}',
+                password='!', role='Student',
+            ))
+        User.objects.bulk_create(users, batch_size=2000)
+        self.stdout.write(f"Seeded {count} users in {time.perf_counter() - started:.1f} s (search index filled by triggers)")
+
+    # One admin list page: the COUNT and the first 10 rows, as UserCR paginates
+
+    def icontains_page(self, term):
+        queryset = User.objects.filter(
+            Q(username__icontains=term) | Q(email__icontains=term) |
+            Q(full_name__icontains=term) | Q(phone_number__icontains=term)
+        ).order_by('-date_joined')
+        return queryset.count(), list(queryset[:10])
+
+    def search_page(self, term):
+        queryset = USER_SEARCH.search(User.objects.order_by('-date_joined'), term)
+        return queryset.count(), list(queryset[:10])
+
+    def timed(self, function, term, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function(term)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
@@ -1,6 +1,240 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    Row count of `model`'s table from planner statistics, or None if the
+    database keeps none. Cheap and approximate: stale until the next ANALYZE
+    (or autovacuum), and on SQLite without statistics it is max(rowid), which
+    also counts deleted rows.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table])
+            row = cursor.fetchone()
+            # -1 until the table is first analyzed
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND idx IS NULL", [table])
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            cursor.execute(f'SELECT MAX(rowid) FROM "{table}"')
+            return cursor.fetchone()[0] or 0
+    return None
+
 
-class UserPagination(PageNumberPagination):
+class AdminListPagination(PageNumberPagination):
+    """
+    Page-number pagination for the admin lists without the COUNT(*) on every
+    page, and with keyset seeks instead of OFFSET when paging forward or back.
+
+    count_mode picks what the response says about the total:
+    - 'exact': a COUNT(*) every page (what PageNumberPagination does).
+    - 'estimate': planner statistics for an unfiltered list (these include
+      soft-deleted rows not purged yet). A filtered list is
+      counted up to ADMIN_PAGINATION_COUNT_LIMIT rows; past that the count is
+      the limit and `count_is_estimate` is true.
+    - 'none': no count, only `has_next`.
+
+    The next / previous links carry a `cursor` holding the ordering values of
+    the last / first row, so following them seeks on an index however deep the
+    page. A bare ?page=N (a jump) still uses OFFSET. Keyset seeks need every
+    ordering field to be a non-null column of the model; the primary key is
+    added as a tie-breaker. Any other ordering, such as search rank, pages by
+    OFFSET throughout.
+    """
     page_size = 10  # Default items per page
     page_size_query_param = 'page_size'  # Allow frontend to override (optional)
     max_page_size = 100  # Limit maximum per page
+    cursor_query_param = 'cursor'
+    count_mode = 'exact'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except (TypeError, ValueError):
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=request.query_params.get(self.page_query_param), message=''))
+
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+        if self.ordering:
+            queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request) if self.ordering else None
+        backwards = bool(cursor and cursor['reverse'])
+
+        if cursor:
+            page = queryset.filter(self.seek(cursor['values'], backwards))
+            if backwards:
+                page = page.reverse()
+            rows = list(page[:self.page_size + 1])
+        else:
+            offset = (self.page_number - 1) * self.page_size
+            rows = list(queryset[offset:offset + self.page_size + 1])
+            if not rows and self.page_number > 1:
+                raise NotFound(self.invalid_page_message.format(page_number=self.page_number, message=''))
+
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+            # A page reached by going back always has one after it
+            self.has_next, self.has_previous = True, more or self.page_number > 1
+        else:
+            self.has_next, self.has_previous = more, self.page_number > 1
+        self.page = rows
+        self.count, self.count_is_estimate = self.get_count(queryset)
+        return rows
+
+    # Counting
+
+    def get_count(self, queryset):
+        """(count, is_estimate), or (None, False) for count_mode 'none'."""
+        if self.count_mode == 'none':
+            return None, False
+        if self.count_mode == 'estimate':
+            # The default manager's own filter (soft-deleted rows) doesn't count as filtering
+            if queryset.query.where == queryset.model._default_manager.all().query.where:
+                estimate = estimate_table_rows(queryset.model, queryset.db)
+                if estimate is not None:
+                    return estimate, True
+            else:
+                limit = getattr(settings, 'ADMIN_PAGINATION_COUNT_LIMIT', 1000)
+                count = queryset.order_by()[:limit].count()
+                if count >= limit:
+                    return count, True
+                return count, False
+        return queryset.count(), False
+
+    # Keyset
+
+    def get_ordering(self, queryset):
+        """The ordering, ending in the pk, if it can be seeked on; otherwise None."""
+        meta = queryset.model._meta
+        columns = {field.name: field for field in meta.concrete_fields if not field.null and not field.is_relation}
+        ordering = []
+        for item in queryset.query.order_by or meta.ordering:
+            if not isinstance(item, str):
+                return None
+            descending, name = item.startswith('-'), item.lstrip('-')
+            name = meta.pk.name if name == 'pk' else name
+            if name not in columns:
+                return None
+            ordering.append(('-' if descending else '') + name)
+        if not ordering:
+            return None
+        if meta.pk.name not in (item.lstrip('-') for item in ordering):
+            ordering.append(('-' if ordering[-1].startswith('-') else '') + meta.pk.name)
+        return ordering
+
+    def seek(self, values, backwards):
+        """Rows strictly after `values` in the ordering, or strictly before when going back."""
+        condition, equal = Q(), {}
+        for item, value in zip(self.ordering, values):
+            name = item.lstrip('-')
+            descending = item.startswith('-') != backwards
+            condition |= Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal[name] = value
+        # The same rows again, but a bound on the first column alone lets the
+        # database start its index scan at the cursor instead of filtering to it
+        first = self.ordering[0]
+        descending = first.startswith('-') != backwards
+        return Q(**{f"{first.lstrip('-')}__{'lte' if descending else 'gte'}": values[0]}) & condition
+
+    def encode_cursor(self, row, reverse):
+        payload = {'v': [getattr(row, item.lstrip('-')) for item in self.ordering]}
+        if reverse:
+            payload['r'] = 1
+        # default=str: datetimes and UUIDs round-trip through their fields' to_python()
+        encoded = json.dumps(payload, separators=(',', ':'), default=str)
+        return base64.urlsafe_b64encode(encoded.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = payload['v']
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.model._meta.get_field(item.lstrip('-')).to_python(value)
+                for item, value in zip(self.ordering, values)
+            ]
+        except (binascii.Error, KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return {'values': values, 'reverse': bool(payload.get('r'))}
+
+    # Links and response
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1)
+        if not self.ordering or not self.page:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1], reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number - 1 <= 1:
+            return remove_query_param(remove_query_param(url, self.page_query_param), self.cursor_query_param)
+        url = replace_query_param(url, self.page_query_param, self.page_number - 1)
+        if not self.ordering or not self.page:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[0], reverse=True))
+
+    def get_paginated_response(self, data):
+        body = {}
+        if self.count is not None:
+            body['count'] = self.count
+            body['count_is_estimate'] = self.count_is_estimate
+        body.update({
+            'has_next': self.has_next,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response['properties']['count_is_estimate'] = {'type': 'boolean'}
+        response['properties']['has_next'] = {'type': 'boolean'}
+        response['required'] = ['has_next', 'results']
+        return response
+
+
+class UserPagination(AdminListPagination):
+    # The users page shows "page X of Y", so it gets an estimated total
+    count_mode = 'estimate'
+
+
+class ClassPagination(AdminListPagination):
+    # The classes page never shows a total
+    count_mode = 'none'
@@ -1,3 +1,4 @@
+from apps.core.fieldsets import SparseFieldsMixin
 from apps.core.models import Class, Subject
 from apps.accounts.models import User
 from rest_framework.serializers import ModelSerializer, PrimaryKeyRelatedField
@@ -18,7 +19,7 @@ class UserNestedSerializer(ModelSerializer):
         fields = ['id', 'username', 'full_name', 'email', 'phone_number', 'address', 'bio', 'role']
         
 
-class ClassListSerializer(ModelSerializer):
+class ClassListSerializer(SparseFieldsMixin, ModelSerializer):
     subjects = SubjectNestedSerializer(many=True, read_only=True)
     teachers = UserNestedSerializer(many=True, read_only=True)
     students = UserNestedSerializer(many=True, read_only=True)
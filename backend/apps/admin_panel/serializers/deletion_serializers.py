@@ -0,0 +1,17 @@
+from rest_framework.serializers import ModelSerializer, SerializerMethodField
+from apps.core.models import DeletionJob
+
+
+
+# Serializer for DeletionJob: progress of a class / user purge
+class DeletionJobSerializer(ModelSerializer):
+    object_type = SerializerMethodField()
+
+    class Meta:
+        model = DeletionJob
+        fields = ('id', 'object_type', 'object_id', 'object_repr', 'status', 'progress', 'error',
+                  'requested_by', 'created_at', 'started_at', 'finished_at')
+        read_only_fields = fields
+
+    def get_object_type(self, obj):
+        return obj.content_type.model
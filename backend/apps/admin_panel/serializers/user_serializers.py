@@ -49,10 +49,11 @@ class UserCreateSerializer(ModelSerializer):
                 'detail': 'username, email and password are required.'
             })
 
-        if User.objects.filter(username=username).exists():
+        # all_objects: soft-deleted users hold on to their username and email until they are purged
+        if User.all_objects.filter(username=username).exists():
             raise drf_serializers.ValidationError({'username': 'A user with that username already exists.'})
 
-        if User.objects.filter(email=email).exists():
+        if User.all_objects.filter(email=email).exists():
             raise drf_serializers.ValidationError({'email': 'A user with that email already exists.'})
         
         validated_data.pop('cpassword', None)
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.accounts.models import User
+from apps.admin_panel.stats import invalidate_dashboard_stats
+from apps.core.models import Class, Subject
+
+
+# Any change to the counted tables drops the cached dashboard stats
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Class)
+@receiver(post_delete, sender=Class)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def invalidate_stats(sender, **kwargs):
+    invalidate_dashboard_stats()
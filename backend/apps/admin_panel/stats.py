@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from apps.accounts.models import User
+from apps.core.models import Class, Subject
+
+
+DASHBOARD_STATS_KEY = 'admin_panel:dashboard_stats'
+
+
+def _count_stats():
+    users = User.objects.aggregate(
+        total_users=Count('id', filter=~Q(role='Admin')),
+        total_teachers=Count('id', filter=Q(role='Teacher')),
+        total_students=Count('id', filter=Q(role='Student')),
+    )
+    return {
+        **users,
+        'total_subjects': Subject.objects.count(),
+        'total_classes': Class.objects.count(),
+    }
+
+
+def get_dashboard_stats():
+    """
+    The dashboard's headline counts. Cached until a User, Class or Subject is
+    saved or deleted (see apps.admin_panel.signals). ADMIN_DASHBOARD_CACHE_TTL
+    caps staleness from writes that skip signals (bulk_create, update()) or
+    that happen in another process when the cache isn't shared.
+    """
+    stats = cache.get(DASHBOARD_STATS_KEY)
+    if stats is None:
+        stats = _count_stats()
+        cache.set(DASHBOARD_STATS_KEY, stats, getattr(settings, 'ADMIN_DASHBOARD_CACHE_TTL', 60))
+    return stats
+
+
+def invalidate_dashboard_stats():
+    cache.delete(DASHBOARD_STATS_KEY)
+    # Again once the write commits, in case a read refilled the cache in between
+    transaction.on_commit(lambda: cache.delete(DASHBOARD_STATS_KEY))
@@ -0,0 +1,575 @@
+import csv
+import datetime
+import io
+import json
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import User
+from apps.activity_log import export
+from apps.activity_log.models import ActivityLog
+from apps.activity_log.utils import log_activity
+from apps.admin_panel.user_import import import_users
+from apps.chat.models import Chat, Group, GroupReadCursor
+from apps.core import deletion
+from apps.core.deletion import run_job, soft_delete
+from apps.core.models import Assignment, AssignmentSubmission, Class, DeletionJob, Subject
+
+
+class ActivityListQueryCountTests(TestCase):
+    """Activity lists read only the log table: usernames and target names are snapshotted on the row."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+        for i in range(4):
+            user = User.objects.create_user(username=f'student{i}', password='password')
+            subject = Subject.objects.create(name=f"Subject {i}", code=f"SUB{i}")
+            class_obj = Class.objects.create(name=f"Class {i}", academic_year="2024", schedule="Mon")
+            log_activity(user, 'User Login', f'User {user.username} logged in.', content_object=user)
+            log_activity(self.admin, 'Subject Creation', f'Subject {subject.name} created.', content_object=subject)
+            log_activity(self.admin, 'Class Creation', f'Class {class_obj.name} created.', content_object=class_obj)
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response
+
+    def test_admin_activities_query_count_is_independent_of_page_size(self):
+        url = reverse('admin_panel:activities')
+        small, response = self.count_queries(url, {'page_size': 3})
+        self.assertEqual(len(response.data['results']), 3)
+        large, response = self.count_queries(url, {'page_size': 12})
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(small, large)
+        # Just the page of logs: cursor pagination doesn't COUNT
+        self.assertEqual(large, 1)
+        self.assertTrue(all(item['content_object_str'] for item in response.data['results']))
+
+    def test_activity_log_viewset_query_count(self):
+        queries, response = self.count_queries('/api/activity-log/activity-logs/', {'page_size': 12})
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(queries, 1)
+
+    def test_dashboard_recent_activity_query_count(self):
+        queries, response = self.count_queries(reverse('admin_panel:dashboard_stats'))
+        self.assertEqual(len(response.data['recent_activities']), 10)
+        # user / subject / class counts, the recent logs and the daily rollups for the history chart
+        self.assertEqual(queries, 5)
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+        User.objects.create_user(username='teacher', password='password', role='Teacher')
+        for i in range(2):
+            User.objects.create_user(username=f'student{i}', password='password', role='Student')
+        Subject.objects.create(name="Math", code="MATH101")
+        self.url = reverse('admin_panel:dashboard_stats')
+
+    def test_counts_are_cached_until_a_counted_model_changes(self):
+        # Cold: one conditional aggregate over users, subject and class counts, recent logs, history
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(
+            {key: response.data[key] for key in ('total_users', 'total_teachers', 'total_students', 'total_subjects', 'total_classes')},
+            {'total_users': 3, 'total_teachers': 1, 'total_students': 2, 'total_subjects': 1, 'total_classes': 0},
+        )
+        # Warm: only the live activity queries
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+        class_obj = Class.objects.create(name="Class A", academic_year="2024", schedule="Mon")
+        with self.assertNumQueries(5):
+            self.assertEqual(self.client.get(self.url).data['total_classes'], 1)
+
+        class_obj.delete()
+        User.objects.get(username='teacher').delete()
+        response = self.client.get(self.url)
+        self.assertEqual((response.data['total_classes'], response.data['total_teachers']), (0, 0))
+
+
+class ActivityExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.student = User.objects.create_user(username='student', password='password')
+        self.client.force_authenticate(user=self.admin)
+        self.subject = Subject.objects.create(name="Math", code="MATH101")
+        for i in range(3):
+            log_activity(self.student, 'User Login', f'User student logged in, "take {i}"', content_object=self.student)
+        log_activity(self.admin, 'Subject Creation', 'Subject Math created.', content_object=self.subject)
+        self.url = reverse('admin_panel:activities_export')
+
+    def test_csv_export_streams_filtered_rows_oldest_first(self):
+        response = self.client.get(self.url, {'user': self.student.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment;', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['message'] for row in rows], [f'User student logged in, "take {i}"' for i in range(3)])
+        self.assertEqual({row['username'] for row in rows}, {'student'})
+        self.assertEqual(rows[0]['model'], 'user')
+
+    def test_ndjson_export(self):
+        response = self.client.get(self.url, {'output': 'ndjson', 'action_type': 'Subject Creation'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        [row] = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual((row['object_repr'], row['object_id']), ('Math', str(self.subject.id)))
+
+    def test_csv_header_is_sent_before_the_query_runs(self):
+        response = self.client.get(self.url)
+        content = iter(response.streaming_content)
+        with self.assertNumQueries(0):
+            header = next(content)
+        self.assertTrue(header.startswith(b'id,timestamp,'))
+        self.assertEqual(len(b''.join(content).splitlines()), 4)
+
+    async def test_csv_streams_under_asgi(self):
+        token = AccessToken.for_user(self.admin)
+        with mock.patch('apps.activity_log.export._rows', wraps=export._rows) as rows:
+            response = await AsyncClient().get(self.url, headers={'Authorization': f'Bearer {token}'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # An async iterator: ASGI sends each chunk as it is made instead of draining the generator first
+            self.assertTrue(response.is_async)
+            content = response.__aiter__()
+            header = await anext(content)
+            self.assertFalse(rows.called)
+            self.assertTrue(header.startswith(b'id,timestamp,'))
+            body = b''.join([chunk async for chunk in content])
+        self.assertEqual(len(body.splitlines()), 4)
+
+    def test_rejects_unknown_output_and_non_admins(self):
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.student)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ClassListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+        self.counter = 0
+
+    def add_classes(self, count):
+        for _ in range(count):
+            self.counter += 1
+            n = self.counter
+            class_obj = Class.objects.create(name=f"Class {n}", academic_year="2024", schedule="Mon")
+            class_obj.subjects.add(*[Subject.objects.create(name=f"Subject {n}.{i}", code=f"S{n}-{i}") for i in range(2)])
+            class_obj.teachers.add(User.objects.create_user(username=f'teacher{n}', password='password', role='Teacher'))
+            class_obj.students.add(*[
+                User.objects.create_user(username=f'student{n}.{i}', password='password', role='Student') for i in range(3)
+            ])
+        return class_obj
+
+    def test_class_list_query_count_does_not_grow_with_classes(self):
+        url = reverse('admin_panel:classes')
+        self.add_classes(2)
+        with self.assertNumQueries(5):  # ETag validator, page, subjects, teachers, students; no count
+            response = self.client.get(url)
+        self.add_classes(6)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 8)
+        self.assertEqual(len(response.data['results'][0]['students']), 3)
+
+    def test_class_detail_query_count(self):
+        class_obj = self.add_classes(1)
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('admin_panel:class', args=[class_obj.pk]))
+        self.assertEqual(len(response.data['subjects']), 2)
+        self.assertEqual(response.data['teachers'][0]['username'], 'teacher1')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UserImportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+        self.class_obj = Class.objects.create(name="Class A", academic_year="2024", schedule="Mon")
+        self.url = reverse('admin_panel:users_import')
+
+    def csv_file(self, rows):
+        content = io.StringIO()
+        writer = csv.DictWriter(content, fieldnames=['username', 'email', 'password', 'full_name', 'role', 'birth_date'])
+        writer.writeheader()
+        writer.writerows(rows)
+        return SimpleUploadedFile('users.csv', content.getvalue().encode(), content_type='text/csv')
+
+    def test_csv_import_creates_and_enrolls(self):
+        rows = [{'username': f's{i}', 'email': f's{i}@example.com', 'password': f'pw{i}', 'full_name': f'S {i}'} for i in range(4)]
+        rows.append({'username': 't0', 'email': 't0@example.com', 'password': 'pw', 'role': 'Teacher', 'birth_date': '1980-02-03'})
+        response = self.client.post(self.url, {'file': self.csv_file(rows), 'class_id': self.class_obj.id}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual((response.data['created'], response.data['enrolled']), (5, 5))
+        self.assertTrue(User.objects.get(username='s2').check_password('pw2'))
+        self.assertEqual(self.class_obj.students.count(), 4)
+        self.assertEqual(list(self.class_obj.teachers.values_list('username', flat=True)), ['t0'])
+        self.assertEqual(str(User.objects.get(username='t0').birth_date), '1980-02-03')
+        self.assertTrue(ActivityLog.objects.filter(action_type='User Import').exists())
+
+    def test_invalid_rows_are_reported_and_nothing_is_created(self):
+        User.objects.create_user(username='taken', email='taken@example.com', password='password')
+        rows = [
+            {'username': 'ok', 'email': 'ok@example.com', 'password': 'pw'},
+            {'username': 'taken', 'email': 'new@example.com', 'password': 'pw'},
+            {'username': 'dup', 'email': 'taken@example.com', 'password': 'pw'},
+            {'username': 'ok', 'email': 'ok2@example.com', 'password': 'pw'},
+            {'username': 'boss', 'email': 'not-an-email', 'password': 'pw', 'role': 'Admin'},
+        ]
+        # One set-based uniqueness query, whatever the number of rows
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, {'users': rows}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5])
+        self.assertIn('username', errors[2])
+        self.assertIn('email', errors[3])
+        self.assertEqual(errors[4]['username'], ['Duplicate username in this file.'])
+        self.assertEqual(set(errors[5]), {'email', 'role'})
+        self.assertFalse(User.objects.filter(username='ok').exists())
+
+        response = self.client.post(self.url, {'users': rows, 'skip_invalid': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+
+    def test_passwords_hash_across_a_process_pool(self):
+        rows = [{'username': f's{i}', 'email': f's{i}@example.com', 'password': f'pw{i}'} for i in range(8)]
+        result = import_users(rows, workers=2, batch_size=3)
+        self.assertEqual(len(result['users']), 8)
+        self.assertTrue(all(User.objects.get(username=f's{i}').check_password(f'pw{i}') for i in range(8)))
+
+    def test_api_hashes_in_process(self):
+        rows = [{'username': f's{i}', 'email': f's{i}@example.com', 'password': f'pw{i}'} for i in range(8)]
+        with mock.patch('apps.admin_panel.user_import.ProcessPoolExecutor') as pool:
+            response = self.client.post(self.url, {'users': rows}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        pool.assert_not_called()
+        self.assertTrue(User.objects.get(username='s7').check_password('pw7'))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ClassEnrollmentTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+        self.teacher = User.objects.create_user(username='teacher', password='password', role='Teacher')
+        self.subject = Subject.objects.create(name="Math", code="MATH101")
+        self.old = Class.objects.create(name="Year 1", academic_year="2024", schedule="Mon")
+        self.new = Class.objects.create(name="Year 2", academic_year="2025", schedule="Mon")
+        self.url = reverse('admin_panel:classes_enrollment')
+
+    def make_students(self, count, prefix='s'):
+        return [User.objects.create_user(username=f'{prefix}{i}', password='password', role='Student') for i in range(count)]
+
+    def rollover(self, students):
+        ids = [str(student.id) for student in students]
+        return self.client.post(self.url, {'changes': [
+            {'class': str(self.old.id), 'remove': {'students': ids, 'teachers': [str(self.teacher.id)]}},
+            {'class': str(self.new.id), 'add': {'students': ids, 'teachers': [str(self.teacher.id)], 'subjects': [str(self.subject.id)]}},
+        ]}, format='json')
+
+    def test_rollover_moves_members_in_one_request(self):
+        students = self.make_students(3)
+        self.old.students.add(*students)
+        self.old.teachers.add(self.teacher)
+        self.new.students.add(students[0])
+
+        response = self.rollover(students)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['removed'], {'students': 3, 'teachers': 1, 'subjects': 0})
+        # students[0] was already enrolled in the new class
+        self.assertEqual(response.data['added'], {'students': 2, 'teachers': 1, 'subjects': 1})
+        self.assertFalse(self.old.students.exists())
+        self.assertEqual(set(self.new.students.all()), set(students))
+        self.assertEqual(list(self.new.subjects.all()), [self.subject])
+        self.assertTrue(ActivityLog.objects.filter(action_type='Class Enrollment').exists())
+
+    def test_query_count_does_not_grow_with_the_roster(self):
+        def count(students):
+            self.old, self.new = (Class.objects.create(name=name, academic_year="2025", schedule="Mon") for name in "AB")
+            self.old.students.add(*students)
+            self.old.teachers.add(self.teacher)
+            ContentType.objects.clear_cache()
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.rollover(students).status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        # 3 id checks; a DELETE, SELECT and INSERT for students and teachers, a SELECT and
+        # INSERT for subjects; touching the classes; the savepoint pair; the content type
+        # and the activity log
+        self.assertEqual(count(self.make_students(2, 'a')), 16)
+        self.assertEqual(count(self.make_students(40, 'b')), 16)
+
+    def test_unknown_ids_and_wrong_roles_reject_the_whole_request(self):
+        student = self.make_students(1)[0]
+        response = self.client.post(self.url, {'changes': [
+            {'class': str(self.new.id), 'add': {'students': [str(student.id)]}},
+            {'class': str(self.old.id), 'add': {'students': [str(self.teacher.id)], 'teachers': [str(student.id)]}},
+            {'class': str(self.teacher.id), 'remove': {'subjects': [str(self.teacher.id)]}},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {error['change']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [1, 2])
+        self.assertEqual(set(errors[1]['add']), {'students', 'teachers'})
+        self.assertEqual(set(errors[2]), {'class', 'remove'})
+        self.assertFalse(self.new.students.exists())
+
+    def test_adding_and_removing_the_same_member_is_rejected(self):
+        student = self.make_students(1)[0]
+        response = self.client.post(self.url, {'changes': [
+            {'class': str(self.new.id), 'add': {'students': [str(student.id)]}, 'remove': {'students': [str(student.id)]}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=student)
+        self.assertEqual(self.client.post(self.url, {'changes': []}, format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AdminListPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+        # Shared join times, so the pk tie-breaker decides the order within them
+        joined = timezone.now()
+        for i in range(24):
+            User.objects.create_user(
+                username=f'student{i:02d}', password='password', role='Student',
+                date_joined=joined - datetime.timedelta(minutes=i // 3),
+            )
+        self.url = reverse('admin_panel:users')
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data, [query['sql'] for query in queries]
+
+    def test_next_and_previous_links_seek_instead_of_offset(self):
+        expected = list(User.objects.order_by('-date_joined', '-id').values_list('username', flat=True))
+        seen, url, pages = [], self.url, []
+        while url:
+            data, queries = self.get(url)
+            seen += [user['username'] for user in data['results']]
+            pages.append(data)
+            if url != self.url:
+                self.assertFalse(any('OFFSET' in sql for sql in queries))
+            url = data['next']
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertFalse(pages[-1]['has_next'])
+
+        data, queries = self.get(pages[-1]['previous'])
+        self.assertEqual(data['results'], pages[1]['results'])
+        self.assertFalse(any('OFFSET' in sql for sql in queries))
+        self.assertTrue(data['has_next'])
+
+        # A jump still works, by offset
+        data, _ = self.get(self.url, {'page': 2})
+        self.assertEqual(data['results'], pages[1]['results'])
+
+    def test_unfiltered_count_is_estimated_without_counting(self):
+        data, queries = self.get(self.url)
+        self.assertFalse(any('__count' in sql for sql in queries))
+        self.assertTrue(data['count_is_estimate'])
+        self.assertGreaterEqual(data['count'], 25)
+
+    @override_settings(ADMIN_PAGINATION_COUNT_LIMIT=20)
+    def test_filtered_count_stops_at_the_limit(self):
+        data, _ = self.get(self.url, {'role': 'Admin'})
+        self.assertEqual((data['count'], data['count_is_estimate']), (1, False))
+        data, _ = self.get(self.url, {'role': 'Student'})
+        self.assertEqual((data['count'], data['count_is_estimate']), (20, True))
+
+    def test_class_list_has_no_count(self):
+        for i in range(12):
+            Class.objects.create(name=f"Class {i}", academic_year="2024", schedule="Mon")
+        data, queries = self.get(reverse('admin_panel:classes'))
+        self.assertNotIn('count', data)
+        self.assertTrue(data['has_next'])
+        self.assertFalse(any('__count' in sql for sql in queries))
+        data, _ = self.get(data['next'])
+        self.assertEqual(len(data['results']), 2)
+        self.assertFalse(data['has_next'])
+
+    def test_bad_cursor_or_page_is_not_found(self):
+        for params in ({'cursor': 'garbage'}, {'cursor': 'eyJ2IjpbMV19'}, {'page': 0}, {'page': 99}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class SoftDeleteTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.client.force_authenticate(user=self.admin)
+        self.teacher = User.objects.create_user(username='teacher', password='password', role='Teacher')
+        self.students = [User.objects.create_user(username=f'student{i}', password='password') for i in range(3)]
+        self.subject = Subject.objects.create(name="Math", code="MATH")
+        self.class_obj = Class.objects.create(name="Class A", academic_year="2024", schedule="Mon")
+        self.class_obj.subjects.add(self.subject)
+        self.class_obj.teachers.add(self.teacher)
+        self.class_obj.students.add(*self.students)
+        self.group = Group.objects.create(name="Group A", group_class=self.class_obj, group_creator=self.teacher)
+        self.group.members.add(*self.students)
+        Chat.objects.bulk_create([
+            Chat(group=self.group, sender=sender, message=f"m{i}")
+            for i, sender in enumerate([self.teacher, *self.students] * 2)
+        ])
+        assignment = Assignment.objects.create(
+            title="Homework", description="...", teacher=self.teacher, class_assigned=self.class_obj,
+            subject=self.subject, due_date=timezone.now(),
+        )
+        for student in self.students:
+            AssignmentSubmission.objects.create(assignment=assignment, student=student, content="done")
+
+    def delete(self, url, purge=True):
+        # The background thread would use its own connection, outside the test transaction
+        with mock.patch('apps.core.deletion.threading.Thread'), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED, response.data)
+        if purge:
+            run_job(response.data['id'])
+        return response
+
+    def test_deleted_class_is_hidden_then_purged(self):
+        class_url = reverse('admin_panel:class', args=[self.class_obj.pk])
+        with self.captureOnCommitCallbacks(execute=False):
+            response = self.client.delete(class_url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertTrue(response['Location'].endswith(reverse('admin_panel:deletion', args=[response.data['id']])))
+
+        # Hidden before the purge has run
+        self.assertEqual(self.client.get(class_url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('admin_panel:classes')).data['results'], [])
+        self.assertFalse(self.students[0].classes_as_student.exists())
+        self.assertEqual(Chat.objects.count(), 8)
+
+        run_job(response.data['id'])
+        job = self.client.get(response['Location']).data
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['object_type'], 'class')
+        self.assertEqual(job['progress'], {
+            'chat messages': 8, 'chat read cursors': 4, 'chat group members': 3, 'chat groups': 1,
+            'assignment submissions': 3, 'assignments': 1, 'subjects': 1, 'teachers': 1, 'students': 3,
+        })
+        self.assertFalse(Class.all_objects.exists())
+        self.assertEqual((Chat.objects.count(), Group.objects.count(), Assignment.objects.count()), (0, 0, 0))
+        self.assertEqual(User.objects.count(), 5)
+        self.assertTrue(Subject.objects.exists())
+
+    def test_deleted_user_is_logged_out_hidden_and_purged(self):
+        student = self.students[0]
+        ActivityLog.objects.all().delete()
+        log_activity(student, 'User Login', 'User student0 logged in.', content_object=student)
+        self.delete(reverse('admin_panel:user', args=[student.pk]))
+
+        self.assertFalse(User.all_objects.filter(pk=student.pk).exists())
+        self.assertEqual(ActivityLog.objects.get(action_type='User Login').user, None)
+        self.assertEqual(Chat.objects.count(), 6)
+        self.assertEqual(AssignmentSubmission.objects.count(), 2)
+        self.assertEqual(self.class_obj.students.count(), 2)
+        self.assertEqual(
+            DeletionJob.objects.get().progress,
+            {'chat messages': 2, 'chat read cursors': 1, 'chat group members': 1, 'assignment submissions': 1,
+             'classes as student': 1, 'activity logs': 1},
+        )
+
+    def test_delete_returns_before_the_purge_runs(self):
+        with mock.patch('apps.core.deletion.threading.Thread') as thread, \
+                mock.patch('apps.core.deletion.run_job') as purge, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('admin_panel:class', args=[self.class_obj.pk]))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        purge.assert_not_called()
+        self.assertEqual((Chat.objects.count(), Assignment.objects.count()), (8, 1))
+        thread.assert_called_once()
+        self.assertEqual(thread.call_args.kwargs['args'], (DeletionJob.objects.get().pk,))
+        self.assertTrue(thread.call_args.kwargs['daemon'])
+        thread.return_value.start.assert_called_once_with()
+
+        # What the thread runs
+        with mock.patch('apps.core.deletion.run_job') as purge:
+            thread.call_args.kwargs['target'](*thread.call_args.kwargs['args'])
+        purge.assert_called_once_with(DeletionJob.objects.get().pk)
+
+    def test_user_is_hidden_until_purged_and_keeps_their_username(self):
+        student = self.students[0]
+        class_url = reverse('admin_panel:class', args=[self.class_obj.pk])
+        etag = self.client.get(class_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=False):
+            soft_delete(student, requested_by=self.admin)
+
+        student = User.all_objects.get(pk=student.pk)
+        self.assertFalse(student.is_active)
+        self.assertEqual(self.client.get(reverse('admin_panel:user', args=[student.pk])).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(class_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['students']), 2)
+        login = APIClient().post(reverse('token_obtain_pair'), {'username': 'student0', 'password': 'password'})
+        self.assertEqual(login.status_code, status.HTTP_401_UNAUTHORIZED)
+        taken = self.client.post(reverse('admin_panel:users'), {
+            'username': 'student0', 'email': 'new@example.com', 'password': 'password', 'cpassword': 'password',
+        })
+        self.assertEqual(taken.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_job_resumes_where_it_stopped(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            job = soft_delete(self.class_obj, requested_by=self.admin)
+        real_step = deletion._run_step
+
+        def fail_on_assignments(job, key, queryset, *args):
+            if queryset.model is Assignment:
+                raise RuntimeError('boom')
+            return real_step(job, key, queryset, *args)
+
+        with mock.patch('apps.core.deletion._run_step', side_effect=fail_on_assignments), \
+                self.assertLogs('apps.core.deletion', 'ERROR'):
+            with self.assertRaises(RuntimeError):
+                run_job(job.pk, batch_size=2)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('boom', job.error)
+        self.assertEqual((job.progress['chat messages'], job.progress['assignment submissions']), (8, 3))
+        self.assertNotIn('assignments', job.progress)
+
+        job = run_job(job.pk, batch_size=2)
+        self.assertEqual(job.status, 'done')
+        self.assertEqual((job.progress['chat messages'], job.progress['assignments']), (8, 1))
+        self.assertFalse(Class.all_objects.exists())
+
+    @override_settings(DELETION_USE_CELERY=True)
+    def test_celery_gets_the_job_after_commit(self):
+        with mock.patch('apps.core.tasks.purge_deletion.delay') as delay:
+            response = self.delete(reverse('admin_panel:class', args=[self.class_obj.pk]), purge=False)
+        delay.assert_called_once_with(response.data['id'])
+        self.assertEqual(DeletionJob.objects.get().status, 'pending')
+        self.assertEqual(self.client.get(reverse('admin_panel:deletions'), {'status': 'pending'}).data['results'][0]['id'], response.data['id'])
@@ -1,10 +1,11 @@
 from django.urls import path
 
 from .views.dashboard_views import Dashboard
-from .views.user_views import UserCR, UserRUD
+from .views.user_views import UserCR, UserRUD, UserImport
 from .views.subject_views import SubjectCR, SubjectRUD
-from .views.class_views import ClassCR, ClassRUD
-from .views.user_activities_view import UserActivitiesR
+from .views.class_views import ClassCR, ClassRUD, ClassEnrollment
+from .views.deletion_views import DeletionJobsR, DeletionJobR
+from .views.user_activities_view import UserActivitiesR, UserActivitiesExport
 
 
 
@@ -14,6 +15,7 @@ urlpatterns = [
     # start from users and dashboard is complated...
     # User
     path('users/', UserCR.as_view(), name='users'),  # Read all, Create | filter: Role, Username
+    path('users/import/', UserImport.as_view(), name='users_import'),  # Bulk create from CSV / JSON
     path('user/<str:pk>/', UserRUD.as_view(), name='user'),  # Read one, Update, Delete
 
     # Subject
@@ -22,9 +24,15 @@ urlpatterns = [
     
     # Class
     path('classes/', ClassCR.as_view(), name='classes'),  # Read all, Create | filter: Name
+    path('classes/enrollment/', ClassEnrollment.as_view(), name='classes_enrollment'),  # Add / remove members in bulk
     path('class/<str:pk>/', ClassRUD.as_view(), name='class'),  # Read one, Update, Delete
 
-    path('activities/', UserActivitiesR.as_view(), name='classes'),  # Read all, Create | filter: Name
+    # Deletion jobs (DELETE on a class / user answers 202 with one)
+    path('deletions/', DeletionJobsR.as_view(), name='deletions'),  # Read all | filter: status
+    path('deletion/<str:pk>/', DeletionJobR.as_view(), name='deletion'),  # Read one: status and progress
+
+    path('activities/', UserActivitiesR.as_view(), name='activities'),  # Read all
+    path('activities/export/', UserActivitiesExport.as_view(), name='activities_export'),  # Stream CSV / NDJSON | filter: user, action_type, since, until
     # path('activities/<str:pk>/', UserActivitiesView.as_view(), name='class'),  # Read one, Update, Delete
 
 ]
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Bulk user import for onboarding: thousands of students from one CSV or JSON
+file instead of one POST /users/ each.
+
+Per import:
+- every row is validated by UserImportRowSerializer;
+- usernames and emails are checked against the file and the database in one
+  set-based query (per max_query_params chunk on SQLite);
+- passwords are hashed in-process for the API, and across a process pool
+  for the import_users command (--workers / ADMIN_USER_IMPORT_WORKERS);
+- users are inserted with bulk_create in ADMIN_USER_IMPORT_BATCH_SIZE batches
+  and optionally enrolled in a Class as students or teachers by role.
+
+By default a file with any invalid row imports nothing; with skip_invalid the
+valid rows are imported and the rest reported.
+"""
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db import connection, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from apps.accounts.models import User
+from apps.admin_panel.stats import invalidate_dashboard_stats
+from apps.core.models import Class
+from apps.core.signals import touch_classes
+
+
+class UserImportRowSerializer(serializers.Serializer):
+    username = serializers.CharField(max_length=100)
+    email = serializers.EmailField()
+    password = serializers.CharField(write_only=True)
+    full_name = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    phone_number = serializers.CharField(max_length=15, required=False, allow_blank=True)
+    address = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    bio = serializers.CharField(required=False, allow_blank=True)
+    birth_date = serializers.DateField(required=False, allow_null=True)
+    # Admins are never created in bulk
+    role = serializers.ChoiceField(choices=['Teacher', 'Student'], default='Student')
+
+
+def read_rows(upload):
+    """Rows from an uploaded .csv or .json file (a JSON list of objects)."""
+    name = getattr(upload, 'name', '') or ''
+    try:
+        text = upload.read().decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise serializers.ValidationError({'file': 'File must be UTF-8 encoded.'})
+    if name.lower().endswith('.json'):
+        try:
+            rows = json.loads(text)
+        except ValueError:
+            raise serializers.ValidationError({'file': 'File is not valid JSON.'})
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+    return normalize_rows(rows)
+
+
+def normalize_rows(rows):
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise serializers.ValidationError({'users': 'Expected a list of user objects.'})
+    # Blank CSV cells mean "not given", not an empty date or role
+    return [{key: value for key, value in row.items() if key and value not in ('', None)} for row in rows]
+
+
+def _existing(usernames, emails):
+    """(taken usernames, taken emails) among the given ones."""
+    taken_usernames, taken_emails = set(), set()
+    # Half of the backend's parameter limit for each list; None means no limit
+    chunk = (connection.features.max_query_params or 2 * len(usernames) + 2 * len(emails) + 2) // 2
+    usernames, emails = sorted(usernames), sorted(emails)
+    for start in range(0, max(len(usernames), len(emails)), chunk):
+        # Soft-deleted users included: they keep their username until purged
+        matches = User.all_objects.filter(
+            Q(username__in=usernames[start:start + chunk]) | Q(email__in=emails[start:start + chunk])
+        ).values_list('username', 'email')
+        for username, email in matches:
+            taken_usernames.add(username)
+            taken_emails.add(email)
+    return taken_usernames & set(usernames), taken_emails & set(emails)
+
+
+def default_workers():
+    return getattr(settings, 'ADMIN_USER_IMPORT_WORKERS', None) or os.cpu_count() or 1
+
+
+def hash_passwords(passwords, workers=1):
+    """
+    make_password() for each password, spread over `workers` processes.
+
+    Only the import_users command asks for more than one: a request is served
+    from a threaded ASGI worker, where forking is unsafe and a fresh pool per
+    import costs more than it saves. The pool spawns its processes for the
+    same reason.
+    """
+    # The hasher itself, not its name: spawned processes don't see settings overrides
+    hash_one = partial(make_password, hasher=get_hasher())
+    if workers <= 1 or len(passwords) < 2 * workers:
+        return [hash_one(password) for password in passwords]
+    # django.setup by reference: a fresh process can't import this module before the app registry is ready
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=django.setup) as pool:
+        return list(pool.map(hash_one, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def validate_rows(rows):
+    """Return (valid [(row number, data)], errors [{'row', 'errors'}]). Rows are numbered from 1."""
+    valid, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        serializer = UserImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            errors.append({'row': number, 'errors': serializer.errors})
+
+    taken_usernames, taken_emails = _existing(
+        {data['username'] for _, data in valid}, {data['email'] for _, data in valid}
+    )
+    seen_usernames, seen_emails = set(), set()
+    unique = []
+    for number, data in valid:
+        row_errors = {}
+        if data['username'] in taken_usernames:
+            row_errors['username'] = ['A user with that username already exists.']
+        elif data['username'] in seen_usernames:
+            row_errors['username'] = ['Duplicate username in this file.']
+        if data['email'] in taken_emails:
+            row_errors['email'] = ['A user with that email already exists.']
+        elif data['email'] in seen_emails:
+            row_errors['email'] = ['Duplicate email in this file.']
+        seen_usernames.add(data['username'])
+        seen_emails.add(data['email'])
+        if row_errors:
+            errors.append({'row': number, 'errors': row_errors})
+        else:
+            unique.append((number, data))
+
+    errors.sort(key=lambda error: error['row'])
+    return unique, errors
+
+
+def import_users(rows, class_obj=None, skip_invalid=False, workers=1, batch_size=None):
+    """
+    Validate and create users from `rows` (dicts). Returns a dict with the
+    created `users`, per-row `errors` and the number `enrolled` in class_obj.
+    Passwords are hashed over `workers` processes (see hash_passwords).
+    """
+    valid, errors = validate_rows(rows)
+    if errors and not skip_invalid:
+        return {'users': [], 'errors': errors, 'enrolled': 0}
+
+    hashes = hash_passwords([data['password'] for _, data in valid], workers=workers)
+    users = [
+        User(**{key: value for key, value in data.items() if key != 'password'}, password=hashed)
+        for (_, data), hashed in zip(valid, hashes)
+    ]
+    batch_size = batch_size or getattr(settings, 'ADMIN_USER_IMPORT_BATCH_SIZE', 1000)
+
+    enrolled = 0
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+        if class_obj is not None:
+            students = [Class.students.through(class_id=class_obj.pk, user_id=user.pk) for user in users if user.role == 'Student']
+            teachers = [Class.teachers.through(class_id=class_obj.pk, user_id=user.pk) for user in users if user.role == 'Teacher']
+            Class.students.through.objects.bulk_create(students, batch_size=batch_size)
+            Class.teachers.through.objects.bulk_create(teachers, batch_size=batch_size)
+            enrolled = len(students) + len(teachers)
+            touch_classes(pk=class_obj.pk)
+
+    # bulk_create skips post_save, which normally drops the cached counts
+    invalidate_dashboard_stats()
+    return {'users': users, 'errors': errors, 'enrolled': enrolled}
@@ -4,28 +4,35 @@ from rest_framework.permissions import IsAdminUser
 from rest_framework.generics import get_object_or_404
 from rest_framework import status
 
+from apps.core.conditional import ConditionalGetMixin, queryset_validator
+from apps.core.deletion import soft_delete
 from apps.core.models import Class
 from apps.activity_log.utils import log_activity
 from apps.admin_panel.permissions import IsAdmin
 from apps.admin_panel.serializers.class_serializers import ClassListSerializer, ClassCreateSerializer
-from apps.admin_panel.pagination import UserPagination
+from apps.admin_panel.pagination import ClassPagination
+from apps.admin_panel.enrollment import EnrollmentSerializer, apply_changes, validate_changes
+from apps.admin_panel.views.deletion_views import deletion_accepted
 
 
 
 # Class: Read all, Create
-class ClassCR(APIView):
+class ClassCR(ConditionalGetMixin, APIView):
     permission_classes = [IsAdmin]
-    pagination_class = UserPagination
+    pagination_class = ClassPagination
     queryset = Class.objects.all()
 
     def get_queryset(self):
-        return Class.objects.all()
+        return Class.objects.with_members()
+
+    def get_validators(self, request, *args, **kwargs):
+        return [queryset_validator(Class.objects.all())]
 
     def get(self, request, *args, **kwargs):
-        classes = self.get_queryset().order_by('-timestamp')
+        classes = ClassListSerializer.project(self.get_queryset().order_by('-timestamp'), request)
         pagination = self.pagination_class()
         paginated_classes = pagination.paginate_queryset(classes, request)
-        serializer = ClassListSerializer(paginated_classes, many=True)
+        serializer = ClassListSerializer(paginated_classes, many=True, context={'request': request})
         return pagination.get_paginated_response(serializer.data)
 
     def post(self, request, *args, **kwargs):
@@ -37,12 +44,15 @@ class ClassCR(APIView):
 
 
 # Class: Read one, Update, Delete
-class ClassRUD(APIView):
+class ClassRUD(ConditionalGetMixin, APIView):
     permission_classes = [IsAdmin]
-    
+
+    def get_validators(self, request, pk, *args, **kwargs):
+        return [queryset_validator(Class.objects.filter(pk=pk))]
+
     def get(self, request, pk, *args, **kwargs):
-        class_instance = get_object_or_404(Class, pk=pk)
-        serializer = ClassListSerializer(class_instance)
+        class_instance = get_object_or_404(ClassListSerializer.project(Class.objects.with_members(), request), pk=pk)
+        serializer = ClassListSerializer(class_instance, context={'request': request})
         return Response(serializer.data)
 
     def put(self, request, pk, *args, **kwargs):
@@ -56,5 +66,28 @@ class ClassRUD(APIView):
     def delete(self, request, pk, *args, **kwargs):
         class_instance = get_object_or_404(Class, pk=pk)
         log_activity(self.request.user, 'Class Deletion', f'Class {class_instance.name} was deleted by Admin.', content_object=class_instance)
-        class_instance.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        # Hidden now; assignments, chat history and members are purged in the background
+        job = soft_delete(class_instance, requested_by=request.user)
+        return deletion_accepted(request, job)
+
+
+# Class: add / remove members across many classes at once
+class ClassEnrollment(APIView):
+    permission_classes = [IsAdmin]
+
+    def post(self, request, *args, **kwargs):
+        serializer = EnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = serializer.validated_data['changes']
+
+        errors = validate_changes(changes)
+        if errors:
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = apply_changes(changes)
+        log_activity(
+            request.user, 'Class Enrollment',
+            f"Enrollment of {len({change['class'] for change in changes})} classes was changed by Admin.",
+            content_object=request.user,
+        )
+        return Response(result)
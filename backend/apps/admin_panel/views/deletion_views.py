@@ -0,0 +1,40 @@
+from django.urls import reverse
+from rest_framework import generics, status
+from rest_framework.response import Response
+
+from apps.admin_panel.pagination import AdminListPagination
+from apps.admin_panel.permissions import IsAdmin
+from apps.admin_panel.serializers.deletion_serializers import DeletionJobSerializer
+from apps.core.models import DeletionJob
+
+
+
+def deletion_accepted(request, job):
+    """202 response for a soft delete, pointing at the job to poll."""
+    return Response(
+        DeletionJobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': request.build_absolute_uri(reverse('admin_panel:deletion', args=[job.pk]))},
+    )
+
+
+# Deletion jobs: Read all | filter: status
+class DeletionJobsR(generics.ListAPIView):
+    permission_classes = [IsAdmin]
+    pagination_class = AdminListPagination
+    queryset = DeletionJob.objects.select_related('content_type')
+    serializer_class = DeletionJobSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        job_status = self.request.query_params.get('status')
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset
+
+
+# Deletion job: Read one (poll until status is done)
+class DeletionJobR(generics.RetrieveAPIView):
+    permission_classes = [IsAdmin]
+    queryset = DeletionJob.objects.select_related('content_type')
+    serializer_class = DeletionJobSerializer
@@ -1,13 +1,13 @@
 from rest_framework import generics
 from apps.admin_panel.permissions import IsAdmin
-from apps.core.models import Subject
+from apps.core.conditional import ConditionalGetMixin, queryset_validator
+from apps.core.models import Subject, SUBJECT_SEARCH
 from apps.admin_panel.serializers.subject_serializers import SubjectSerializer
 from apps.activity_log.utils import log_activity
-from django.db.models import Q
 
 
 # Subject: Read all, Create
-class SubjectCR(generics.ListAPIView, generics.CreateAPIView):
+class SubjectCR(ConditionalGetMixin, generics.ListAPIView, generics.CreateAPIView):
     """
     View to list all subjects and create new subjects.
     Only accessible by admins.
@@ -17,25 +17,26 @@ class SubjectCR(generics.ListAPIView, generics.CreateAPIView):
     queryset = Subject.objects.all()
     serializer_class = SubjectSerializer
 
+    def get_validators(self, request, *args, **kwargs):
+        """The list is answered with 304 until a subject is added, changed or deleted."""
+        return [queryset_validator(Subject.objects.all())]
+
     def get_queryset(self):
         """
         Returns queryset of subjects, optionally filtered by search query.
-        Orders results by name for consistency.
+        Orders results by name for consistency, after relevance when searching.
         """
-        queryset = self.queryset
+        # Order by name for consistent results
+        queryset = self.queryset.order_by('name')
 
         # Get search query from URL parameters
         search_query = self.request.query_params.get("s")
-        
+
         if search_query:
-            # Strip whitespace and search in name or code (case-insensitive)
-            search_query = search_query.strip()
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) | Q(code__icontains=search_query)
-            )
-        
-        # Order by name for consistent results
-        return queryset.order_by('name')
+            # Ranked prefix match on name and code
+            queryset = SUBJECT_SEARCH.search(queryset, search_query)
+
+        return queryset
 
     def perform_create(self, serializer):
         """
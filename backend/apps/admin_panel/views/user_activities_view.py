@@ -1,9 +1,17 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from apps.activity_log.backends import get_backend
+from apps.activity_log.export import EXPORT_FORMATS, aiterate
+from apps.activity_log.filters import filter_activity_logs, parse_activity_filters
 from apps.activity_log.models import ActivityLog
+from apps.activity_log.pagination import ActivityLogCursorPagination, SegmentCursorPagination
 from apps.activity_log.serializers import ActivityLogSerializer
-from apps.admin_panel.pagination import UserPagination
 from apps.admin_panel.permissions import IsAdmin
 
 
@@ -12,5 +20,42 @@ class UserActivitiesR(generics.ListAPIView):
     permission_classes = [IsAdmin]
     queryset = ActivityLog.objects.all()
     serializer_class = ActivityLogSerializer
-    pagination_class = UserPagination
-    
\ No newline at end of file
+    pagination_class = ActivityLogCursorPagination
+
+    def get_queryset(self):
+        return filter_activity_logs(ActivityLog.objects.for_listing(), self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        # Backends that keep entries out of the database (SegmentBackend) read them back themselves
+        reader = getattr(get_backend(), 'reader', None)
+        if reader is None:
+            return super().list(request, *args, **kwargs)
+
+        paginator = SegmentCursorPagination()
+        page = paginator.paginate_segments(reader(), parse_activity_filters(request.query_params), request)
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+    
+
+
+class UserActivitiesExport(APIView):
+    """
+    Stream the filtered activity log, oldest first, as ?output=csv (default)
+    or ?output=ndjson. Takes the same filters as UserActivitiesR.
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Must be one of: {', '.join(EXPORT_FORMATS)}."})
+        stream, content_type = EXPORT_FORMATS[output]
+
+        queryset = filter_activity_logs(ActivityLog.objects.all(), request.query_params)
+        chunks = stream(queryset)
+        if isinstance(request._request, ASGIRequest):
+            # A sync iterator would be read to the end before the first byte is sent
+            chunks = aiterate(chunks)
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        filename = f"activity-log-{timezone.now():%Y%m%dT%H%M%S}.{output}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
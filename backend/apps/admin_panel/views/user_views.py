@@ -1,13 +1,19 @@
-from django.db.models import Q
-
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 from apps.activity_log.utils import log_activity
 from apps.admin_panel.pagination import UserPagination
 from apps.admin_panel.permissions import IsAdmin
-from apps.accounts.models import User
+from apps.accounts.models import User, USER_SEARCH
 from apps.admin_panel.serializers.user_serializers import UserListSerializer, UserCreateSerializer, UserUpdateSerializer
+from apps.admin_panel.user_import import import_users, normalize_rows, read_rows
+from apps.admin_panel.views.deletion_views import deletion_accepted
+from apps.core.deletion import soft_delete
+from apps.core.models import Class
 
 
 
@@ -31,7 +37,8 @@ class UserCR(generics.ListAPIView,generics.CreateAPIView):
         if role:
             queryset = queryset.filter(role=role)
         if search:
-            queryset = queryset.filter(Q(username__icontains=search) | Q(email__icontains=search))
+            # Ranked prefix match on username, full name, email and phone number
+            queryset = USER_SEARCH.search(queryset, search)
         
         return queryset 
 
@@ -63,6 +70,44 @@ class UserRUD(generics.RetrieveAPIView, generics.UpdateAPIView, generics.Destroy
         user = serializer.save()
         log_activity(user, 'User Update', f'User {user.username} was updated by Admin.', content_object=user)
 
-    def perform_destroy(self, instance):
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
         log_activity(self.request.user, 'User Deletion', f'User {instance.username} was deleted by Admin.', content_object=instance)
-        instance.delete()
+        # Logged out and hidden now; chat history, assignments and memberships are purged in the background
+        job = soft_delete(instance, requested_by=request.user)
+        return deletion_accepted(request, job)
+
+
+
+# USER: Bulk import from a CSV / JSON file or a JSON list
+class UserImport(APIView):
+    permission_classes = [IsAdmin]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def post(self, request, *args, **kwargs):
+        if 'file' in request.FILES:
+            rows = read_rows(request.FILES['file'])
+        elif 'users' in request.data:
+            rows = normalize_rows(request.data['users'])
+        else:
+            raise ValidationError({'detail': 'Upload a CSV or JSON `file`, or send a `users` list.'})
+
+        class_obj = None
+        if request.data.get('class_id'):
+            class_obj = get_object_or_404(Class, pk=request.data['class_id'])
+        skip_invalid = str(request.data.get('skip_invalid', '')).lower() in ('1', 'true', 'yes')
+
+        result = import_users(rows, class_obj=class_obj, skip_invalid=skip_invalid)
+        if result['errors'] and not result['users']:
+            return Response({'created': 0, 'errors': result['errors']}, status=status.HTTP_400_BAD_REQUEST)
+
+        log_activity(
+            request.user, 'User Import',
+            f"{len(result['users'])} users were imported by Admin.",
+            content_object=class_obj or request.user,
+        )
+        return Response({
+            'created': len(result['users']),
+            'enrolled': result['enrolled'],
+            'errors': result['errors'],
+        }, status=status.HTTP_201_CREATED)
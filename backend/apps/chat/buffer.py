@@ -0,0 +1,133 @@
+import asyncio
+import atexit
+import logging
+import threading
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from apps.chat.models import Chat
+from apps.chat.utils import bump_unread_counts
+
+
+logger = logging.getLogger(__name__)
+
+
+def write_behind_enabled():
+    return getattr(settings, 'CHAT_WRITE_BEHIND', False)
+
+
+class ChatWriteBuffer:
+    """
+    Write-behind buffer for chat messages.
+
+    Messages arrive fully formed (id and created_at are assigned by the model
+    defaults in the app) and are broadcast before they are stored. The buffer
+    persists them with one bulk_create once `batch_size` messages are pending or
+    `flush_interval` seconds after the first pending message, whichever is first.
+    It is also flushed when a socket disconnects and at interpreter exit.
+
+    Delivery: a message is durable only after its batch is written. If the
+    process is killed hard (SIGKILL, OOM) up to one batch of broadcast messages
+    is lost. A batch rejected by the database (IntegrityError, e.g. a message
+    for a group or sender deleted since) is written again one message at a
+    time, and the messages that still fail are logged and dropped, so one bad
+    row can't hold up the rest. Any other failure (database unreachable) puts
+    the batch back for the next flush, up to `max_attempts` writes per message.
+    """
+    max_attempts = 5
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._pending = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def batch_size(self):
+        return self._batch_size or getattr(settings, 'CHAT_WRITE_BEHIND_BATCH_SIZE', 100)
+
+    @property
+    def flush_interval(self):
+        return self._flush_interval or getattr(settings, 'CHAT_WRITE_BEHIND_INTERVAL', 0.5)
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def add(self, chat):
+        with self._lock:
+            self._pending.append(chat)
+            pending = len(self._pending)
+
+        if pending >= self.batch_size:
+            await self.flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.flush_interval, lambda: loop.create_task(self.flush()))
+
+    async def flush(self):
+        batch = self._take()
+        if batch:
+            await database_sync_to_async(self._write)(batch)
+
+    def flush_sync(self):
+        batch = self._take()
+        if batch:
+            self._write(batch)
+
+    def _take(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+        return batch
+
+    def _write(self, batch):
+        remaining = list(batch)
+        try:
+            try:
+                self._store(remaining)
+                return
+            except IntegrityError:
+                pass
+            # Find the bad rows: store the rest one by one
+            rejected = []
+            while remaining:
+                try:
+                    self._store(remaining[:1])
+                except IntegrityError:
+                    rejected.append(remaining[0])
+                remaining.pop(0)
+            if rejected:
+                logger.error(
+                    "Dropped %d chat messages the database rejected: %s",
+                    len(rejected), ', '.join(str(chat.id) for chat in rejected),
+                )
+        except Exception:
+            self._retry(remaining)
+
+    def _store(self, chats):
+        with transaction.atomic():
+            Chat.objects.bulk_create(chats, batch_size=self.batch_size)
+            bump_unread_counts(chats)
+
+    def _retry(self, chats):
+        retry, dropped = [], []
+        for chat in chats:
+            chat._write_attempts = getattr(chat, '_write_attempts', 0) + 1
+            (retry if chat._write_attempts < self.max_attempts else dropped).append(chat)
+        logger.exception("Failed to persist %d chat messages, will retry on next flush", len(retry))
+        if dropped:
+            logger.error(
+                "Dropped %d chat messages after %d failed writes: %s",
+                len(dropped), self.max_attempts, ', '.join(str(chat.id) for chat in dropped),
+            )
+        with self._lock:
+            self._pending[:0] = retry
+
+
+chat_write_buffer = ChatWriteBuffer()
+atexit.register(chat_write_buffer.flush_sync)
@@ -1,92 +1,121 @@
-from channels.generic.websocket import WebsocketConsumer
+from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.db import database_sync_to_async
+from django.db import transaction
 import json
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from apps.chat.models import Group, Chat
+from urllib.parse import parse_qs
+from apps.chat.buffer import chat_write_buffer, write_behind_enabled
+from apps.chat.membership import aget_group_access, can_access
+from apps.chat.models import Chat
 from apps.chat.serializers import ChatSerializer
+from apps.chat.utils import get_history_limit, get_replay_chats, parse_last_seen, bump_unread_counts
 
-class TeacherConsumer(WebsocketConsumer):
-    def connect(self):
+class TeacherConsumer(AsyncWebsocketConsumer):
+    async def connect(self):
         self.group_id = self.scope['url_route']['kwargs']['group_id']
         self.user = self.scope['user']
 
         if not self.user.is_authenticated:
-            self.close()
+            await self.close()
             return
 
-        try:
-            self.group = Group.objects.get(id=self.group_id)
-        except Group.DoesNotExist:
-            self.close()
+        # Membership comes from the in-process cache in the common case, no queries
+        access = await aget_group_access(self.group_id)
+        if access is None:
+            await self.close()
             return
 
         # Check if user is creator or member
-        is_member = self.group.members.filter(id=self.user.id).exists()
-        if self.group.group_creator != self.user and not is_member:
-            self.send(json.dumps({
+        if not can_access(access, self.user.id):
+            await self.send(json.dumps({
                 'message': 'You are not authorized to join this group'
             }))
-            self.close()
+            await self.close()
             return
 
         self.group_name = f"chat_{self.group_id}"
-        
+
         # Join room group
-        async_to_sync(self.channel_layer.group_add)(
+        await self.channel_layer.group_add(
             self.group_name,
             self.channel_name
         )
 
-        self.accept()
+        await self.accept()
 
-        # Send existing messages
-        group_chats = Chat.objects.filter(group=self.group).order_by('created_at')
-        chat_serialized = ChatSerializer(group_chats, many=True)
-        self.send(json.dumps({
+        # Send the latest messages, or only what was missed since ?last_seen=
+        query_params = parse_qs(self.scope.get('query_string', b'').decode('utf-8'))
+        last_seen = query_params.get('last_seen', [None])[0]
+        chats, has_more = await self.get_group_chats(last_seen)
+        await self.send(json.dumps({
             'type': 'connection_established',
             'message': 'connected',
-            'chats': chat_serialized.data
+            'chats': chats,
+            'has_more': has_more
         }))
 
-    def disconnect(self, close_code):
+    async def disconnect(self, close_code):
+        # Persist anything still waiting in the write-behind buffer
+        if write_behind_enabled():
+            await chat_write_buffer.flush()
+
         # Leave room group
         if hasattr(self, 'group_name'):
-            async_to_sync(self.channel_layer.group_discard)(
+            await self.channel_layer.group_discard(
                 self.group_name,
                 self.channel_name
             )
 
-    def receive(self, text_data):
+    async def receive(self, text_data):
         text_data_json = json.loads(text_data)
         message = text_data_json.get('message')
-        
+
         if not message:
             return
 
-        # Save message to database
-        chat = Chat.objects.create(
-            group=self.group,
-            sender=self.user,
-            message=message
-        )
-        
-        serialized_chat = ChatSerializer(chat).data
+        # Save message to database, or queue it and broadcast straight away
+        if write_behind_enabled():
+            chat = Chat(group_id=self.group_id, sender=self.user, message=message)
+            serialized_chat = ChatSerializer(chat).data
+            await chat_write_buffer.add(chat)
+        else:
+            serialized_chat = await self.save_chat(message)
+
+        # Render the frame once here; every member forwards the same string
+        frame = json.dumps({
+            'type': 'chat_message',
+            'chat': serialized_chat
+        })
 
         # Send message to room group
-        async_to_sync(self.channel_layer.group_send)(
+        await self.channel_layer.group_send(
             self.group_name,
             {
                 'type': 'chat_message',
-                'chat': serialized_chat
+                'text': frame
             }
         )
 
     # Receive message from room group
-    def chat_message(self, event):
-        chat = event['chat']
+    async def chat_message(self, event):
+        # Send the pre-rendered frame to WebSocket as-is
+        # (events from nodes still on the old format carry the chat dict instead)
+        text = event.get('text') or json.dumps({'type': 'chat_message', 'chat': event['chat']})
+        await self.send(text_data=text)
 
-        # Send message to WebSocket
-        self.send(text_data=json.dumps({
-            'type': 'chat_message',
-            'chat': chat
-        }))
\ No newline at end of file
+    # ORM helpers, run in the database thread so the event loop never blocks
+    @database_sync_to_async
+    def get_group_chats(self, last_seen=None):
+        position = parse_last_seen(self.group_id, last_seen)
+        group_chats, has_more = get_replay_chats(self.group_id, get_history_limit(), position)
+        return ChatSerializer(group_chats, many=True).data, has_more
+
+    @database_sync_to_async
+    def save_chat(self, message):
+        with transaction.atomic():
+            chat = Chat.objects.create(
+                group_id=self.group_id,
+                sender=self.user,
+                message=message
+            )
+            bump_unread_counts([chat])
+        return ChatSerializer(chat).data
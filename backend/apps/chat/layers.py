@@ -0,0 +1,53 @@
+import asyncio
+import random
+import string
+
+from channels.layers import InMemoryChannelLayer
+
+
+# hub name -> {'channels': {...}, 'groups': {...}} shared by every LocalChannelLayer on that hub
+_hubs = {}
+
+
+class LocalChannelLayer(InMemoryChannelLayer):
+    """
+    In-process stand-in for a shared channel layer (e.g. Redis) used to
+    simulate several chat nodes inside one process.
+
+    Every layer configured with the same `hub` shares one channel/group store,
+    so a group_send on one node reaches sockets held by the others. Each layer
+    names its channels after its `node`, and `hop_latency` (seconds) is added
+    to every send that crosses to another node, standing in for the network
+    round trip to Redis.
+
+        CHANNEL_LAYERS = {
+            'node-0': {'BACKEND': 'apps.chat.layers.LocalChannelLayer',
+                       'CONFIG': {'hub': 'loadtest', 'node': 'node-0', 'hop_latency': 0.001}},
+            ...
+        }
+    """
+
+    def __init__(self, hub='default', node='local', hop_latency=0, **kwargs):
+        super().__init__(**kwargs)
+        store = _hubs.setdefault(hub, {'channels': {}, 'groups': {}})
+        self.channels = store['channels']
+        self.groups = store['groups']
+        self.node = node
+        self.hop_latency = hop_latency
+
+    async def new_channel(self, prefix="specific."):
+        return "%s.%s!%s" % (
+            prefix,
+            self.node,
+            "".join(random.choice(string.ascii_letters) for i in range(12)),
+        )
+
+    async def send(self, channel, message):
+        if self.hop_latency and f".{self.node}!" not in channel:
+            await asyncio.sleep(self.hop_latency)
+        await super().send(channel, message)
+
+    async def flush(self):
+        # Clear in place so the other nodes on this hub see it too
+        self.channels.clear()
+        self.groups.clear()
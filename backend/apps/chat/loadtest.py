@@ -0,0 +1,124 @@
+import asyncio
+import json
+import time
+
+from channels.layers import channel_layers
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.urls import re_path
+
+from apps.chat.consumers.teacher import TeacherConsumer
+
+
+HUB = 'chat-loadtest'
+
+
+def node_alias(index):
+    return f"loadtest-node-{index}"
+
+
+def node_channel_layers(nodes, hop_latency=0.0, capacity=10000):
+    """CHANNEL_LAYERS for `nodes` simulated workers sharing one LocalChannelLayer hub."""
+    return {
+        node_alias(i): {
+            'BACKEND': 'apps.chat.layers.LocalChannelLayer',
+            'CONFIG': {
+                'hub': HUB,
+                'node': node_alias(i),
+                'hop_latency': hop_latency,
+                'capacity': capacity,
+            },
+        }
+        for i in range(nodes)
+    }
+
+
+def node_application(index):
+    """The chat websocket routes as served by one node, bound to that node's layer."""
+    # Websocket consumers ignore as_asgi() kwargs, so bind the alias on a subclass
+    consumer = type(f"TeacherConsumerNode{index}", (TeacherConsumer,), {'channel_layer_alias': node_alias(index)})
+    return URLRouter([
+        re_path(r"ws/chat/group/(?P<group_id>[0-9a-f-]+)/", consumer.as_asgi()),
+    ])
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_load_test(group, users, nodes=2, senders=1, rate=50.0, duration=5.0, timeout=30.0):
+    """
+    Connect one socket per user, spread round-robin over `nodes`, then have
+    `senders` of them post `rate` messages/sec in total for `duration` seconds.
+    Every socket (senders included) must receive every message.
+
+    Must run with node_channel_layers(nodes) installed as CHANNEL_LAYERS.
+    Returns a report dict with delivery counts, throughput and end-to-end
+    latency percentiles in milliseconds.
+    """
+    await channel_layers[node_alias(0)].flush()
+    applications = [node_application(i) for i in range(nodes)]
+
+    communicators = []
+    for i, user in enumerate(users):
+        communicator = WebsocketCommunicator(applications[i % nodes], f"/ws/chat/group/{group.id}/")
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        if not connected:
+            raise RuntimeError(f"Socket for {user.username} was rejected")
+        await communicator.receive_json_from(timeout=timeout)
+        communicators.append(communicator)
+
+    total = max(1, int(rate * duration))
+    latencies = []
+    received = [0]
+    last_delivery = [0.0]
+
+    async def read(communicator):
+        for _ in range(total):
+            try:
+                frame = await communicator.receive_json_from(timeout=timeout)
+            except asyncio.TimeoutError:
+                return
+            sent_at = float(frame['chat']['message'].split(':', 1)[1])
+            now = time.perf_counter()
+            latencies.append((now - sent_at) * 1000)
+            received[0] += 1
+            last_delivery[0] = now
+
+    async def write():
+        started = time.perf_counter()
+        for seq in range(total):
+            delay = started + seq / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sender = communicators[seq % senders]
+            await sender.send_to(text_data=json.dumps({'message': f"{seq}:{time.perf_counter()}"}))
+
+    readers = [asyncio.create_task(read(communicator)) for communicator in communicators]
+    started = time.perf_counter()
+    await write()
+    send_seconds = time.perf_counter() - started
+    await asyncio.gather(*readers)
+    elapsed = max(last_delivery[0] - started, 1e-9)
+
+    for communicator in communicators:
+        await communicator.disconnect()
+
+    expected = total * len(communicators)
+    return {
+        'nodes': nodes,
+        'sockets': len(communicators),
+        'messages sent': total,
+        'send rate (msgs/sec)': round(total / max(send_seconds, 1e-9), 1),
+        'deliveries': f"{received[0]}/{expected}",
+        'delivered (msgs/sec)': round(received[0] / elapsed, 1),
+        'latency p50 (ms)': round(percentile(latencies, 50), 2),
+        'latency p95 (ms)': round(percentile(latencies, 95), 2),
+        'latency p99 (ms)': round(percentile(latencies, 99), 2),
+        'latency max (ms)': round(max(latencies, default=0.0), 2),
+    }
@@ -0,0 +1,54 @@
+import json
+import time
+import uuid
+
+import msgpack
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark the CPU cost of fanning one chat message out to a group: "
+        "the old path (nested dict through the channel layer, json.dumps per "
+        "recipient) versus the serialize-once path (one pre-rendered frame string)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,40,100,400', help='Comma separated group sizes.')
+        parser.add_argument('--messages', type=int, default=2000, help='Messages per measurement.')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        messages = options['messages']
+        chat = {
+            'id': str(uuid.uuid4()),
+            'sender': 'teacher',
+            'message': 'Please read chapter four before Monday, we will discuss it in class.',
+            'created_at': timezone.now().isoformat(),
+        }
+
+        self.stdout.write(f"{'members':>8} {'per-recipient (us/msg)':>24} {'serialize-once (us/msg)':>24} {'saved':>7}")
+        for size in sizes:
+            old = self.measure(self.per_recipient, chat, size, messages)
+            new = self.measure(self.serialize_once, chat, size, messages)
+            self.stdout.write(f"{size:>8} {old:>24.1f} {new:>24.1f} {(1 - new / old) * 100:>6.0f}%")
+
+    def measure(self, fanout, chat, size, messages):
+        started = time.process_time()
+        for _ in range(messages):
+            fanout(chat, size)
+        return (time.process_time() - started) * 1_000_000 / messages
+
+    # The channel layer packs and unpacks the event once per recipient channel
+    def per_recipient(self, chat, size):
+        event = {'type': 'chat_message', 'chat': chat}
+        for _ in range(size):
+            received = msgpack.unpackb(msgpack.packb(event), raw=False)
+            json.dumps({'type': 'chat_message', 'chat': received['chat']})
+
+    def serialize_once(self, chat, size):
+        event = {'type': 'chat_message', 'text': json.dumps({'type': 'chat_message', 'chat': chat})}
+        for _ in range(size):
+            received = msgpack.unpackb(msgpack.packb(event), raw=False)
+            received['text']
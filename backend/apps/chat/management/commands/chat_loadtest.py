@@ -0,0 +1,54 @@
+import uuid
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from apps.accounts.models import User
+from apps.chat.loadtest import node_channel_layers, run_load_test
+from apps.chat.models import Group
+from apps.core.models import Class
+
+
+class Command(BaseCommand):
+    help = (
+        "Chat fan-out load test: N simulated TeacherConsumer nodes sharing an "
+        "in-process channel layer stand-in. Reports delivery latency "
+        "percentiles and messages/sec. No Redis required."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', type=int, default=3, help='Simulated worker nodes.')
+        parser.add_argument('--sockets', type=int, default=120, help='Sockets in the group, spread over the nodes.')
+        parser.add_argument('--senders', type=int, default=10, help='Sockets that post messages.')
+        parser.add_argument('--rate', type=float, default=20.0, help='Messages per second across all senders.')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to send for.')
+        parser.add_argument('--hop-latency-ms', type=float, default=0.5, help='Added latency for cross-node sends.')
+        parser.add_argument('--write-behind', action='store_true', help='Use write-behind chat persistence.')
+
+    def handle(self, *args, **options):
+        prefix = f"loadtest-{uuid.uuid4().hex[:8]}"
+        users = User.objects.bulk_create([
+            User(username=f"{prefix}-{i}", role='Student') for i in range(options['sockets'])
+        ])
+        class_obj = Class.objects.create(name=prefix, academic_year='loadtest', schedule='loadtest')
+        group = Group.objects.create(name=prefix, group_class=class_obj, group_creator=users[0])
+        group.members.set(users)
+
+        layers = node_channel_layers(options['nodes'], options['hop_latency_ms'] / 1000)
+        try:
+            with override_settings(CHANNEL_LAYERS=layers, CHAT_WRITE_BEHIND=options['write_behind']):
+                report = async_to_sync(run_load_test)(
+                    group,
+                    users,
+                    nodes=options['nodes'],
+                    senders=min(options['senders'], len(users)),
+                    rate=options['rate'],
+                    duration=options['duration'],
+                )
+        finally:
+            class_obj.delete()
+            User.objects.filter(username__startswith=prefix).delete()
+
+        for key, value in report.items():
+            self.stdout.write(f"{key:<24} {value}")
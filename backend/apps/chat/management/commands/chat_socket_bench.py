@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+import tracemalloc
+import uuid
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import User
+from apps.chat.membership import membership_cache
+from apps.chat.middleware import JwtAuthMiddleware, user_cache
+from apps.chat.models import Group
+from apps.chat.routing import websocket_urlpatterns
+from apps.core.models import Class
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many concurrent chat sockets against TeacherConsumer inside one "
+        "event loop (one daphne worker), authenticated by JwtAuthMiddleware as in "
+        "production, and report connect time, memory per socket, thread count, "
+        "broadcast fan-out latency and the handshake caches' hit rates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sockets', type=int, default=500, help='Number of concurrent sockets to open.')
+        parser.add_argument('--messages', type=int, default=5, help='Messages broadcast once all sockets are open.')
+        parser.add_argument('--reconnects', type=int, default=1, help='Times every socket reconnects afterwards.')
+
+    def handle(self, *args, **options):
+        sockets = options['sockets']
+        prefix = f"bench-{uuid.uuid4().hex[:8]}"
+
+        users = User.objects.bulk_create([
+            User(username=f"{prefix}-{i}", role='Student') for i in range(sockets)
+        ])
+        class_obj = Class.objects.create(name=prefix, academic_year='bench', schedule='bench')
+        group = Group.objects.create(name=prefix, group_class=class_obj, group_creator=users[0])
+        group.members.set(users)
+
+        try:
+            with override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}):
+                report = async_to_sync(self.run)(group, users, options['messages'], options['reconnects'])
+        finally:
+            class_obj.delete()
+            User.objects.filter(username__startswith=prefix).delete()
+
+        for key, value in report.items():
+            self.stdout.write(f"{key:<28} {value}")
+
+    async def connect_all(self, application, group, tokens):
+        communicators = []
+        for username, token in tokens:
+            communicator = WebsocketCommunicator(application, f"/ws/chat/group/{group.id}/?token={token}")
+            connected, _ = await communicator.connect()
+            if not connected:
+                raise RuntimeError(f"Socket for {username} was rejected")
+            await communicator.receive_json_from()
+            communicators.append(communicator)
+        return communicators
+
+    async def run(self, group, users, messages, reconnects):
+        application = JwtAuthMiddleware(URLRouter(websocket_urlpatterns))
+        tokens = [(user.username, str(AccessToken.for_user(user))) for user in users]
+        user_cache.clear()
+        membership_cache.clear()
+        threads_before = threading.active_count()
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+
+        started = time.perf_counter()
+        communicators = await self.connect_all(application, group, tokens)
+        connect_seconds = time.perf_counter() - started
+
+        memory_after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        threads_open = threading.active_count()
+
+        # Fan-out: one sender, every socket must receive each message
+        latencies = []
+        for i in range(messages):
+            sent = time.perf_counter()
+            await communicators[0].send_json_to({'message': f"bench message {i}"})
+            await asyncio.gather(*(c.receive_json_from(timeout=30) for c in communicators))
+            latencies.append((time.perf_counter() - sent) * 1000)
+
+        for communicator in communicators:
+            await communicator.disconnect()
+
+        # Reconnect storm: handshakes should now be answered by the caches
+        started = time.perf_counter()
+        for _ in range(reconnects):
+            for communicator in await self.connect_all(application, group, tokens):
+                await communicator.disconnect()
+        reconnect_seconds = time.perf_counter() - started
+
+        return {
+            'sockets': len(communicators),
+            'connect total (s)': f"{connect_seconds:.2f}",
+            'connect per socket (ms)': f"{connect_seconds * 1000 / len(communicators):.2f}",
+            'memory per socket (KiB)': f"{(memory_after - memory_before) / 1024 / len(communicators):.1f}",
+            'threads before/open': f"{threads_before}/{threads_open}",
+            'fan-out latency avg (ms)': f"{sum(latencies) / len(latencies):.1f}" if latencies else '-',
+            'fan-out latency max (ms)': f"{max(latencies):.1f}" if latencies else '-',
+            'reconnect per socket (ms)': (
+                f"{reconnect_seconds * 1000 / (reconnects * len(tokens)):.2f}" if reconnects else '-'
+            ),
+            'user cache': self.format_stats(user_cache.stats()),
+            'membership cache': self.format_stats(membership_cache.stats()),
+        }
+
+    def format_stats(self, stats):
+        lookups = stats['hits'] + stats['misses']
+        rate = f"{stats['hits'] * 100 / lookups:.0f}%" if lookups else '-'
+        return f"{stats['hits']} hits / {stats['misses']} misses ({rate}), {stats['size']} entries"
@@ -0,0 +1,55 @@
+import time
+import uuid
+
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import User
+from apps.chat.buffer import ChatWriteBuffer
+from apps.chat.models import Group, Chat
+from apps.core.models import Class
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare chat persistence throughput: one Chat.objects.create per "
+        "message versus the write-behind buffer's batched bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=2000, help='Messages written per mode.')
+        parser.add_argument('--batch-size', type=int, default=100, help='Write-behind batch size.')
+
+    def handle(self, *args, **options):
+        prefix = f"bench-{uuid.uuid4().hex[:8]}"
+        sender = User.objects.create(username=prefix, role='Teacher')
+        class_obj = Class.objects.create(name=prefix, academic_year='bench', schedule='bench')
+        group = Group.objects.create(name=prefix, group_class=class_obj, group_creator=sender)
+
+        try:
+            results = async_to_sync(self.run)(group, sender, options['messages'], options['batch_size'])
+        finally:
+            class_obj.delete()
+            sender.delete()
+
+        for mode, seconds in results.items():
+            rate = options['messages'] / seconds
+            self.stdout.write(f"{mode:<14} {seconds:8.3f}s  {rate:10.0f} msgs/sec")
+        self.stdout.write(f"speedup        {results['per-message'] / results['write-behind']:.1f}x")
+
+    async def run(self, group, sender, messages, batch_size):
+        create = database_sync_to_async(Chat.objects.create)
+        started = time.perf_counter()
+        for i in range(messages):
+            await create(group=group, sender=sender, message=f"per-message {i}")
+        per_message = time.perf_counter() - started
+
+        buffer = ChatWriteBuffer(batch_size=batch_size, flush_interval=60)
+        started = time.perf_counter()
+        for i in range(messages):
+            await buffer.add(Chat(group=group, sender=sender, message=f"write-behind {i}"))
+        await buffer.flush()
+        write_behind = time.perf_counter() - started
+
+        return {'per-message': per_message, 'write-behind': write_behind}
@@ -0,0 +1,124 @@
+import uuid
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.chat.caches import TTLCache
+from apps.chat.models import Group
+
+
+# group id -> (version, (creator id, frozenset of member ids)), ids kept as
+# strings. The m2m_changed / post_save / post_delete handlers in
+# apps.chat.signals call invalidate_group(), which only reaches this process's
+# copy and replaces the group's version token: in group_versions, so other
+# processes keep theirs for up to the TTL, or with CHAT_MEMBERSHIP_SHARED_CACHE
+# in that cache. Every lookup reads the token first and only trusts a local
+# entry cached under the same token, so a change made by any worker is seen
+# by all of them on their next lookup.
+membership_cache = TTLCache(
+    maxsize=getattr(settings, 'CHAT_MEMBERSHIP_CACHE_SIZE', 5000),
+    ttl=getattr(settings, 'CHAT_MEMBERSHIP_CACHE_TTL', 600),
+)
+# group id -> version token, when there is no shared cache to hold it
+group_versions = TTLCache(maxsize=membership_cache.maxsize, ttl=membership_cache.ttl)
+
+
+def _shared_cache():
+    """Optional cross-process cache, named by the CHAT_MEMBERSHIP_SHARED_CACHE alias."""
+    alias = getattr(settings, 'CHAT_MEMBERSHIP_SHARED_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def _version_key(group_id):
+    return f"chat:membership:version:{group_id}"
+
+
+def _cache_key(group_id, version):
+    return f"chat:membership:{group_id}:{version}"
+
+
+def _load(group_id):
+    try:
+        uuid.UUID(str(group_id))
+    except ValueError:
+        return None
+    creator_id = Group.objects.filter(id=group_id).values_list('group_creator_id', flat=True).first()
+    if creator_id is None:
+        return None
+    member_ids = Group.members.through.objects.filter(group_id=group_id).values_list('user_id', flat=True)
+    return str(creator_id), frozenset(str(member_id) for member_id in member_ids)
+
+
+def _version(key, shared):
+    return shared.get(_version_key(key)) if shared is not None else group_versions.get(key)
+
+
+def _local(key, version):
+    entry = membership_cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    return None
+
+
+def get_group_access(group_id):
+    """
+    Return (creator_id, member_ids) for a group, or None if it doesn't exist.
+    Checks the in-process LRU, then the shared cache, then the database.
+    """
+    key = str(group_id)
+    shared = _shared_cache()
+    version = _version(key, shared)
+    access = _local(key, version)
+    if access is None:
+        access = _fetch(group_id, shared, version)
+    return access
+
+
+def _fetch(group_id, shared, version):
+    key = str(group_id)
+    access = shared.get(_cache_key(key, version)) if shared is not None else None
+
+    if access is None:
+        access = _load(group_id)
+        if access is None:
+            return None
+        if shared is not None:
+            # Harmless if stale: an invalidation since `version` was read has orphaned this key
+            shared.set(_cache_key(key, version), access, membership_cache.ttl)
+
+    # Invalidated while loading: this copy may predate the change, so don't keep it
+    if _version(key, shared) == version:
+        membership_cache.set(key, (version, access))
+    return access
+
+
+def can_access(access, user_id):
+    creator_id, member_ids = access
+    user_id = str(user_id)
+    return user_id == creator_id or user_id in member_ids
+
+
+async def aget_group_access(group_id):
+    """
+    Async variant: answers from memory without leaving the event loop when
+    possible (with a shared cache, after one async read of the version).
+    """
+    key = str(group_id)
+    shared = _shared_cache()
+    version = await shared.aget(_version_key(key)) if shared is not None else group_versions.get(key)
+    access = _local(key, version)
+    if access is None:
+        access = await database_sync_to_async(_fetch)(group_id, shared, version)
+    return access
+
+
+def invalidate_group(*group_ids):
+    shared = _shared_cache()
+    for group_id in group_ids:
+        membership_cache.delete(str(group_id))
+        if shared is not None:
+            # A new token orphans every process's local copy and the old shared entry
+            shared.set(_version_key(group_id), uuid.uuid4().hex, None)
+        else:
+            group_versions.set(str(group_id), uuid.uuid4().hex)
@@ -1,29 +1,100 @@
+import time
+import uuid
+
 from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.cache import caches
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
-from django.db import close_old_connections
 from urllib.parse import parse_qs
 
+from apps.chat.caches import TTLCache
+
 User = get_user_model()
 
+# user id -> (version, User), shared by every handshake in this process.
+# invalidate_user() runs when the user is saved or deleted (see
+# apps.chat.signals). It drops this process's entry and replaces the user's
+# version token: in WS_USER_CACHE_SHARED_CACHE if set, else in user_versions.
+# Handshakes read the token first and only trust an entry cached under it, so
+# a deactivation anywhere is seen by every worker. Without a shared cache,
+# other workers may accept the user for up to WS_USER_CACHE_TTL.
+user_cache = TTLCache(
+    maxsize=getattr(settings, 'WS_USER_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'WS_USER_CACHE_TTL', 60),
+)
+# user id -> version token, when there is no shared cache to hold it
+user_versions = TTLCache(maxsize=user_cache.maxsize, ttl=user_cache.ttl)
+
+
+def _shared_cache():
+    alias = getattr(settings, 'WS_USER_CACHE_SHARED_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def _version_key(user_id):
+    return f"chat:ws-user:version:{user_id}"
+
+
+async def _version(key, shared):
+    if shared is not None:
+        return await shared.aget(_version_key(key))
+    return user_versions.get(key)
+
+
+def invalidate_user(user_id):
+    user_cache.delete(str(user_id))
+    shared = _shared_cache()
+    if shared is not None:
+        shared.set(_version_key(user_id), uuid.uuid4().hex, None)
+    else:
+        user_versions.set(str(user_id), uuid.uuid4().hex)
+
+
 @database_sync_to_async
-def get_user(token):
+def load_user(user_id):
+    return User.objects.filter(id=user_id, is_active=True).first()
+
+
+async def get_user(token):
     try:
-        # Verify the token
+        # Verify the token (signature and expiry, no I/O)
         access_token = AccessToken(token)
-        user_id = access_token.payload.get('user_id')
-        return User.objects.get(id=user_id)
-    except Exception:
+    except TokenError:
+        return AnonymousUser()
+
+    user_id = access_token.payload.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
         return AnonymousUser()
 
+    key = str(user_id)
+    shared = _shared_cache()
+    version = await _version(key, shared)
+    entry = user_cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    user = await load_user(user_id)
+    if user is None:
+        return AnonymousUser()
+    # Invalidated while loading: this copy may predate the change, so don't keep it
+    if await _version(key, shared) == version:
+        # Never cache past the token's own expiry
+        expires_in = access_token.payload.get('exp', 0) - time.time()
+        user_cache.set(key, (version, user), ttl=expires_in)
+    return user
+
+
 class JwtAuthMiddleware:
     def __init__(self, app):
         self.app = app
 
     async def __call__(self, scope, receive, send):
-        # Close old database connections to prevent usage of timed out connections
-        close_old_connections()
+        # Stale DB connections are handled by database_sync_to_async around the
+        # user lookup, so nothing here blocks the event loop.
 
         # Parse query string
         query_string = scope.get("query_string", b"").decode("utf-8")
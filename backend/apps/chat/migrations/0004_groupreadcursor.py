@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:40
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_cursors_for_members(apps, schema_editor):
+    # Existing history counts as read; badges start from the next message.
+    Group = apps.get_model('chat', 'Group')
+    GroupReadCursor = apps.get_model('chat', 'GroupReadCursor')
+    now = timezone.now()
+    cursors = []
+    for membership in Group.members.through.objects.all().iterator():
+        cursors.append(GroupReadCursor(user_id=membership.user_id, group_id=membership.group_id, last_read_at=now))
+    for group in Group.objects.all().iterator():
+        cursors.append(GroupReadCursor(user_id=group.group_creator_id, group_id=group.id, last_read_at=now))
+    GroupReadCursor.objects.bulk_create(cursors, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_alter_chat_created_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupReadCursor',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('last_read_at', models.DateTimeField(blank=True, null=True)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_cursors', to='chat.group')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_read_cursors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'group'), name='chat_read_cursor_user_group')],
+            },
+        ),
+        migrations.RunPython(create_cursors_for_members, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 import uuid
 from apps.accounts.models import User  
 from apps.core.models import Class
@@ -19,7 +20,32 @@ class Chat(models.Model):
     group = models.ForeignKey(Group, on_delete=models.CASCADE)
     sender = models.ForeignKey(User, on_delete=models.CASCADE)
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Assigned in the app (not auto_now_add) so write-behind batches keep the broadcast timestamp
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination and history replay seek on (group, created_at, id)
+            models.Index(fields=['group', 'created_at', 'id'], name='chat_group_created_idx'),
+        ]
+    
+
     
 
-    
\ No newline at end of file
+class GroupReadCursor(models.Model):
+    """
+    How far a member has read in a group. unread_count is maintained
+    incrementally on message insert and reset when the cursor advances, so
+    badges for every group come from one indexed query on user.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chat_read_cursors')
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='read_cursors')
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'group'], name='chat_read_cursor_user_group'),
+        ]
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from apps.chat.models import Group, Chat
+from apps.chat.models import Group, Chat, GroupReadCursor
 from apps.core.models import Class
 
 
@@ -46,4 +46,12 @@ class ChatSerializer(serializers.ModelSerializer):
         fields = ['id', 'sender','message', 'created_at']
 
     def create(self, validated_data): 
-        return Chat.objects.create(**validated_data) 
\ No newline at end of file
+        return Chat.objects.create(**validated_data)
+
+
+class GroupReadCursorSerializer(serializers.ModelSerializer):
+    group = serializers.UUIDField(source='group_id', read_only=True)
+
+    class Meta:
+        model = GroupReadCursor
+        fields = ['group', 'unread_count', 'last_read_at']
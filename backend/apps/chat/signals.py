@@ -0,0 +1,60 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from apps.accounts.models import User
+from apps.chat.membership import invalidate_group
+from apps.chat.middleware import invalidate_user
+from apps.chat.models import Group, GroupReadCursor
+from apps.chat.utils import ensure_read_cursors
+
+
+# Drop cached websocket users whenever the row changes (profile edit, deactivation, delete)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+# Keep the group membership cache in step with Group.members and the creator
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_membership(sender, instance, **kwargs):
+    invalidate_group(instance.pk)
+
+
+@receiver(m2m_changed, sender=Group.members.through)
+def invalidate_changed_members(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # group.members.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate_group(instance.pk)
+    elif action == 'pre_clear':
+        # user.chat_groups.clear(): remember which groups lose this member
+        instance._cleared_chat_group_ids = list(instance.chat_groups.values_list('id', flat=True))
+    elif action == 'post_clear':
+        invalidate_group(*getattr(instance, '_cleared_chat_group_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        # user.chat_groups.add/remove(...)
+        invalidate_group(*pk_set)
+
+
+# Read cursors follow membership so unread counts exist for every member
+@receiver(post_save, sender=Group)
+def create_creator_read_cursor(sender, instance, created, **kwargs):
+    if created:
+        ensure_read_cursors(instance.pk, [instance.group_creator_id])
+
+
+@receiver(m2m_changed, sender=Group.members.through)
+def sync_read_cursors(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        if reverse:
+            for group_id in pk_set:
+                ensure_read_cursors(group_id, [instance.pk])
+        else:
+            ensure_read_cursors(instance.pk, pk_set)
+    elif action == 'post_remove':
+        if reverse:
+            GroupReadCursor.objects.filter(user=instance, group_id__in=pk_set).exclude(group__group_creator=instance).delete()
+        else:
+            GroupReadCursor.objects.filter(group=instance, user_id__in=pk_set).exclude(user_id=instance.group_creator_id).delete()
@@ -1,3 +1,441 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import User
+from apps.chat.buffer import ChatWriteBuffer
+from apps.chat.loadtest import node_channel_layers, run_load_test
+from apps.chat.caches import TTLCache
+from apps.chat import membership
+from apps.chat.membership import aget_group_access, can_access, get_group_access, group_versions, membership_cache
+from apps.chat.middleware import get_user, invalidate_user, user_cache, user_versions
+from apps.chat.models import Group, Chat, GroupReadCursor
+from apps.chat.routing import websocket_urlpatterns
+from apps.chat.utils import decode_cursor, get_scrollback_page, bump_unread_counts
+from apps.core.models import Class
+
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class TeacherConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(username='teacher', password='password', role='Teacher')
+        self.student = User.objects.create_user(username='student', password='password', role='Student')
+        self.outsider = User.objects.create_user(username='outsider', password='password', role='Student')
+        self.class_obj = Class.objects.create(name="Class 1", academic_year="2024", schedule="Mon")
+        self.group = Group.objects.create(name="Group 1", group_class=self.class_obj, group_creator=self.teacher)
+        self.group.members.add(self.teacher, self.student)
+        self.application = URLRouter(websocket_urlpatterns)
+
+    def communicator(self, user, query_string=''):
+        path = f"/ws/chat/group/{self.group.id}/"
+        if query_string:
+            path = f"{path}?{query_string}"
+        communicator = WebsocketCommunicator(self.application, path)
+        communicator.scope['user'] = user
+        return communicator
+
+    async def test_anonymous_user_is_rejected(self):
+        communicator = self.communicator(AnonymousUser())
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+    async def test_non_member_is_rejected(self):
+        communicator = self.communicator(self.outsider)
+        await communicator.send_input({'type': 'websocket.connect'})
+        rejection = await communicator.receive_output()
+        self.assertIn('not authorized', rejection['text'])
+        closed = await communicator.receive_output()
+        self.assertEqual(closed['type'], 'websocket.close')
+
+    async def test_member_receives_history_and_broadcasts(self):
+        await sync_to_async(Chat.objects.create)(group=self.group, sender=self.teacher, message='welcome')
+
+        teacher = self.communicator(self.teacher)
+        student = self.communicator(self.student)
+        self.assertTrue((await teacher.connect())[0])
+        self.assertTrue((await student.connect())[0])
+
+        history = await student.receive_json_from()
+        self.assertEqual(history['type'], 'connection_established')
+        self.assertEqual([chat['message'] for chat in history['chats']], ['welcome'])
+        await teacher.receive_json_from()
+
+        await student.send_json_to({'message': 'hello'})
+        for communicator in (teacher, student):
+            event = await communicator.receive_json_from()
+            self.assertEqual(event['type'], 'chat_message')
+            self.assertEqual(event['chat']['message'], 'hello')
+            self.assertEqual(event['chat']['sender'], 'student')
+
+        count = await sync_to_async(Chat.objects.filter(group=self.group).count)()
+        self.assertEqual(count, 2)
+
+        await teacher.disconnect()
+        await student.disconnect()
+
+    @override_settings(CHAT_HISTORY_LIMIT=2)
+    async def test_history_replay_is_bounded(self):
+        for i in range(4):
+            await sync_to_async(Chat.objects.create)(group=self.group, sender=self.teacher, message=f"m{i}")
+
+        communicator = self.communicator(self.student)
+        await communicator.connect()
+        history = await communicator.receive_json_from()
+        self.assertEqual([chat['message'] for chat in history['chats']], ['m2', 'm3'])
+        self.assertFalse(history['has_more'])
+        await communicator.disconnect()
+
+    @override_settings(CHAT_HISTORY_LIMIT=2)
+    async def test_history_resumes_from_last_seen(self):
+        chats = []
+        for i in range(5):
+            chats.append(await sync_to_async(Chat.objects.create)(group=self.group, sender=self.teacher, message=f"m{i}"))
+
+        communicator = self.communicator(self.student, f"last_seen={chats[1].id}")
+        await communicator.connect()
+        history = await communicator.receive_json_from()
+        self.assertEqual([chat['message'] for chat in history['chats']], ['m2', 'm3'])
+        self.assertTrue(history['has_more'])
+        await communicator.disconnect()
+
+        communicator = self.communicator(self.student, f"last_seen={chats[3].created_at.strftime('%Y-%m-%dT%H:%M:%S.%f')}")
+        await communicator.connect()
+        history = await communicator.receive_json_from()
+        self.assertEqual([chat['message'] for chat in history['chats']], ['m4'])
+        self.assertFalse(history['has_more'])
+        await communicator.disconnect()
+
+    @override_settings(CHAT_WRITE_BEHIND=True, CHAT_WRITE_BEHIND_INTERVAL=60)
+    async def test_write_behind_broadcasts_before_persisting(self):
+        communicator = self.communicator(self.student)
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        await communicator.send_json_to({'message': 'queued'})
+        event = await communicator.receive_json_from()
+        self.assertEqual(event['chat']['message'], 'queued')
+        self.assertFalse(await Chat.objects.filter(id=event['chat']['id']).aexists())
+
+        # Flushed on disconnect, keeping the id and timestamp that were broadcast
+        await communicator.disconnect()
+        chat = await Chat.objects.aget(id=event['chat']['id'])
+        self.assertEqual(chat.created_at.isoformat().replace('+00:00', 'Z'), event['chat']['created_at'])
+
+    async def test_write_buffer_flushes_on_batch_size(self):
+        buffer = ChatWriteBuffer(batch_size=2, flush_interval=60)
+        await buffer.add(Chat(group=self.group, sender=self.teacher, message='one'))
+        self.assertEqual(len(buffer), 1)
+        await buffer.add(Chat(group=self.group, sender=self.teacher, message='two'))
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(await Chat.objects.filter(group=self.group).acount(), 2)
+
+    async def test_write_buffer_drops_only_the_rows_the_database_rejects(self):
+        gone = await Group.objects.acreate(name="Gone", group_class=self.class_obj, group_creator=self.teacher)
+        orphan = Chat(group_id=gone.id, sender=self.teacher, message='orphan')
+        await gone.adelete()
+        buffer = ChatWriteBuffer(batch_size=10, flush_interval=60)
+        await buffer.add(orphan)
+        await buffer.add(Chat(group=self.group, sender=self.teacher, message='kept'))
+        with self.assertLogs('apps.chat.buffer', 'ERROR') as logs:
+            await buffer.flush()
+        self.assertEqual(len(buffer), 0)
+        self.assertIn(str(orphan.id), logs.output[0])
+        self.assertEqual([chat.message async for chat in Chat.objects.filter(group=self.group)], ['kept'])
+
+    async def test_write_buffer_gives_up_after_max_attempts(self):
+        buffer = ChatWriteBuffer(batch_size=10, flush_interval=60)
+        await buffer.add(Chat(group=self.group, sender=self.teacher, message='one'))
+        with mock.patch.object(buffer, '_store', side_effect=OperationalError('database is locked')), \
+                self.assertLogs('apps.chat.buffer', 'ERROR'):
+            for _ in range(buffer.max_attempts - 1):
+                await buffer.flush()
+                self.assertEqual(len(buffer), 1)
+            await buffer.flush()
+        self.assertEqual(len(buffer), 0)
+
+
+class GroupChatHistoryViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='password', role='Teacher')
+        self.student = User.objects.create_user(username='student', password='password', role='Student')
+        self.outsider = User.objects.create_user(username='outsider', password='password', role='Student')
+        self.class_obj = Class.objects.create(name="Class 1", academic_year="2024", schedule="Mon")
+        self.group = Group.objects.create(name="Group 1", group_class=self.class_obj, group_creator=self.teacher)
+        self.group.members.add(self.student)
+        for i in range(5):
+            Chat.objects.create(group=self.group, sender=self.teacher, message=f"m{i}")
+        self.url = reverse('chat:group-messages', kwargs={'group_id': self.group.id})
+
+    def test_pages_backwards_with_before_cursor(self):
+        self.client.force_authenticate(user=self.student)
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([chat['message'] for chat in response.data['results']], ['m3', 'm4'])
+
+        response = self.client.get(self.url, {'page_size': 2, 'before': response.data['next']})
+        self.assertEqual([chat['message'] for chat in response.data['results']], ['m1', 'm2'])
+
+        response = self.client.get(self.url, {'page_size': 2, 'before': response.data['next']})
+        self.assertEqual([chat['message'] for chat in response.data['results']], ['m0'])
+        self.assertIsNone(response.data['next'])
+
+    def test_creator_can_read_without_membership(self):
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_non_member_is_forbidden(self):
+        self.client.force_authenticate(user=self.outsider)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(user=self.student)
+        response = self.client.get(self.url, {'before': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deep_page_costs_the_same_as_first_page(self):
+        _, cursor = get_scrollback_page(self.group, 1)
+        with self.assertNumQueries(1):
+            get_scrollback_page(self.group, 1)
+        with self.assertNumQueries(1):
+            get_scrollback_page(self.group, 1, decode_cursor(cursor))
+
+    def test_page_query_uses_group_created_index(self):
+        plan = Chat.objects.filter(group=self.group).order_by('-created_at', '-id')[:50].explain()
+        self.assertIn('chat_group_created_idx', plan)
+
+
+class JwtAuthMiddlewareTests(TransactionTestCase):
+    def setUp(self):
+        user_cache.clear()
+        user_versions.clear()
+        self.user = User.objects.create_user(username='student', password='password', role='Student')
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def test_repeat_handshakes_are_served_from_cache(self):
+        first = await get_user(self.token)
+        second = await get_user(self.token)
+        self.assertEqual(first.id, self.user.id)
+        self.assertEqual(second.id, self.user.id)
+        self.assertEqual(user_cache.stats()['misses'], 1)
+        self.assertEqual(user_cache.stats()['hits'], 1)
+
+    async def test_deactivation_invalidates_cached_user(self):
+        await get_user(self.token)
+        self.user.is_active = False
+        await self.user.asave()
+        user = await get_user(self.token)
+        self.assertFalse(user.is_authenticated)
+
+    @override_settings(WS_USER_CACHE_SHARED_CACHE='default')
+    async def test_shared_cache_invalidates_other_processes_cached_user(self):
+        await caches['default'].aclear()
+        # A second worker, with its own in-process cache
+        other_worker = TTLCache(ttl=60)
+        with mock.patch('apps.chat.middleware.user_cache', other_worker):
+            self.assertTrue((await get_user(self.token)).is_authenticated)
+            self.assertTrue((await get_user(self.token)).is_authenticated)
+            self.assertEqual(other_worker.stats()['hits'], 1)
+        await get_user(self.token)
+
+        # Deactivated in this worker; the other one must not keep accepting the user
+        self.user.is_active = False
+        await self.user.asave()
+        with mock.patch('apps.chat.middleware.user_cache', other_worker):
+            self.assertFalse((await get_user(self.token)).is_authenticated)
+
+    async def test_invalidation_during_load_is_not_cached(self):
+        def load_then_deactivate(user_id):
+            user = User.objects.filter(id=user_id, is_active=True).first()
+            # Deactivated by another request after this handshake read the row
+            User.objects.filter(pk=user_id).update(is_active=False)
+            invalidate_user(user_id)
+            return user
+
+        with mock.patch('apps.chat.middleware.load_user', database_sync_to_async(load_then_deactivate)):
+            self.assertTrue((await get_user(self.token)).is_authenticated)
+        self.assertEqual(len(user_cache), 0)
+        self.assertFalse((await get_user(self.token)).is_authenticated)
+
+    async def test_invalid_token_is_anonymous(self):
+        user = await get_user('not-a-token')
+        self.assertFalse(user.is_authenticated)
+        self.assertEqual(len(user_cache), 0)
+
+
+class GroupMembershipCacheTests(TestCase):
+    def setUp(self):
+        membership_cache.clear()
+        group_versions.clear()
+        self.teacher = User.objects.create_user(username='teacher', password='password', role='Teacher')
+        self.student = User.objects.create_user(username='student', password='password', role='Student')
+        self.class_obj = Class.objects.create(name="Class 1", academic_year="2024", schedule="Mon")
+        self.group = Group.objects.create(name="Group 1", group_class=self.class_obj, group_creator=self.teacher)
+
+    def test_warm_lookup_does_not_query(self):
+        get_group_access(self.group.id)
+        with self.assertNumQueries(0):
+            access = get_group_access(self.group.id)
+        self.assertTrue(can_access(access, self.teacher.id))
+        self.assertFalse(can_access(access, self.student.id))
+
+    def test_member_changes_invalidate(self):
+        get_group_access(self.group.id)
+        self.group.members.add(self.student)
+        self.assertTrue(can_access(get_group_access(self.group.id), self.student.id))
+
+        self.student.chat_groups.remove(self.group)
+        self.assertFalse(can_access(get_group_access(self.group.id), self.student.id))
+
+        self.group.members.add(self.student)
+        get_group_access(self.group.id)
+        self.student.chat_groups.clear()
+        self.assertFalse(can_access(get_group_access(self.group.id), self.student.id))
+
+    def test_deleted_group_is_invalidated(self):
+        group_id = self.group.id
+        get_group_access(group_id)
+        self.group.delete()
+        self.assertIsNone(get_group_access(group_id))
+
+    def test_invalidation_during_load_is_not_cached(self):
+        real_load = membership._load
+
+        def load_then_add_member(group_id):
+            access = real_load(group_id)
+            # Another request adds a member after this lookup read the rows
+            self.group.members.add(self.student)
+            return access
+
+        for lookup in (get_group_access, async_to_sync(aget_group_access)):
+            self.group.members.clear()
+            with mock.patch('apps.chat.membership._load', side_effect=load_then_add_member):
+                self.assertFalse(can_access(lookup(self.group.id), self.student.id))
+            self.assertIsNone(membership_cache.get(str(self.group.id)))
+            self.assertTrue(can_access(lookup(self.group.id), self.student.id))
+
+    @override_settings(CHAT_MEMBERSHIP_SHARED_CACHE='default')
+    def test_shared_cache_serves_other_processes(self):
+        get_group_access(self.group.id)
+        # Simulate another worker: empty in-process cache, warm shared cache
+        membership_cache.clear()
+        with self.assertNumQueries(0):
+            access = get_group_access(self.group.id)
+        self.assertTrue(can_access(access, self.teacher.id))
+
+    @override_settings(CHAT_MEMBERSHIP_SHARED_CACHE='default')
+    def test_shared_cache_invalidates_other_processes_local_copies(self):
+        caches['default'].clear()
+        self.group.members.add(self.student)
+        # A second worker, with its own in-process cache
+        other_worker = TTLCache(ttl=600)
+        with mock.patch('apps.chat.membership.membership_cache', other_worker):
+            self.assertTrue(can_access(get_group_access(self.group.id), self.student.id))
+            with self.assertNumQueries(0):
+                get_group_access(self.group.id)
+        self.assertTrue(can_access(get_group_access(self.group.id), self.student.id))
+
+        # Removed in this worker; the other one must not keep answering from its copy
+        self.group.members.remove(self.student)
+        with mock.patch('apps.chat.membership.membership_cache', other_worker):
+            self.assertFalse(can_access(get_group_access(self.group.id), self.student.id))
+            self.assertFalse(can_access(async_to_sync(aget_group_access)(self.group.id), self.student.id))
+        self.assertFalse(can_access(get_group_access(self.group.id), self.student.id))
+
+
+class ChatLoadTestHarnessTests(TransactionTestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f'student{i}', password='password', role='Student')
+            for i in range(6)
+        ]
+        self.class_obj = Class.objects.create(name="Class 1", academic_year="2024", schedule="Mon")
+        self.group = Group.objects.create(name="Group 1", group_class=self.class_obj, group_creator=self.users[0])
+        self.group.members.set(self.users)
+
+    @override_settings(CHANNEL_LAYERS=node_channel_layers(3, hop_latency=0.001))
+    async def test_every_socket_on_every_node_receives_every_message(self):
+        report = await run_load_test(self.group, self.users, nodes=3, senders=2, rate=40, duration=0.25)
+        self.assertEqual(report['messages sent'], 10)
+        self.assertEqual(report['deliveries'], '60/60')
+        self.assertGreater(report['latency p99 (ms)'], 0)
+
+
+class GroupUnreadCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='password', role='Teacher')
+        self.student = User.objects.create_user(username='student', password='password', role='Student')
+        self.class_obj = Class.objects.create(name="Class 1", academic_year="2024", schedule="Mon")
+        self.groups = []
+        for i in range(3):
+            group = Group.objects.create(name=f"Group {i}", group_class=self.class_obj, group_creator=self.teacher)
+            group.members.add(self.teacher, self.student)
+            self.groups.append(group)
+
+    def post_messages(self, group, sender, count):
+        chats = [Chat.objects.create(group=group, sender=sender, message=f"m{i}") for i in range(count)]
+        bump_unread_counts(chats)
+        return chats
+
+    def unread(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(reverse('chat:group-unread'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item['group']: item['unread_count'] for item in response.data}
+
+    def test_counts_are_maintained_on_insert(self):
+        self.post_messages(self.groups[0], self.teacher, 3)
+        self.post_messages(self.groups[1], self.teacher, 1)
+
+        counts = self.unread(self.student)
+        self.assertEqual(counts[str(self.groups[0].id)], 3)
+        self.assertEqual(counts[str(self.groups[1].id)], 1)
+        self.assertEqual(counts[str(self.groups[2].id)], 0)
+        # Own messages are never unread
+        self.assertEqual(self.unread(self.teacher)[str(self.groups[0].id)], 0)
+
+    def test_unread_list_is_one_query(self):
+        self.client.force_authenticate(user=self.student)
+        url = reverse('chat:group-unread')
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_advancing_cursor(self):
+        chats = self.post_messages(self.groups[0], self.teacher, 4)
+        self.client.force_authenticate(user=self.student)
+        url = reverse('chat:group-read', kwargs={'group_id': self.groups[0].id})
+
+        response = self.client.post(url, {'message': str(chats[1].id)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['unread_count'], 2)
+
+        response = self.client.post(url, format='json')
+        self.assertEqual(response.data['unread_count'], 0)
+
+        self.post_messages(self.groups[0], self.teacher, 1)
+        self.assertEqual(self.unread(self.student)[str(self.groups[0].id)], 1)
+
+    def test_cursors_follow_membership(self):
+        newcomer = User.objects.create_user(username='newcomer', password='password', role='Student')
+        self.groups[0].members.add(newcomer)
+        self.assertTrue(GroupReadCursor.objects.filter(user=newcomer, group=self.groups[0]).exists())
+        self.groups[0].members.remove(newcomer)
+        self.assertFalse(GroupReadCursor.objects.filter(user=newcomer, group=self.groups[0]).exists())
@@ -1,8 +1,11 @@
 from django.urls import path
-from .views import GroupListCreateView, GroupRetrieveUpdateDestroyView
+from .views import GroupListCreateView, GroupRetrieveUpdateDestroyView, GroupChatHistoryView, GroupUnreadCountsView, GroupMarkReadView
 
 app_name = 'chat'
 urlpatterns = [
     # path('groups/', GroupListCreateView.as_view(), name='group-list-create'),
     # path('groups/<int:pk>/', GroupRetrieveUpdateDestroyView.as_view(), name='group-retrieve-update-destroy'),
+    path('groups/unread/', GroupUnreadCountsView.as_view(), name='group-unread'),
+    path('groups/<uuid:group_id>/messages/', GroupChatHistoryView.as_view(), name='group-messages'),
+    path('groups/<uuid:group_id>/read/', GroupMarkReadView.as_view(), name='group-read'),
 ]
\ No newline at end of file
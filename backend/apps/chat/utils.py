@@ -0,0 +1,141 @@
+import base64
+import uuid
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.chat.models import Chat, GroupReadCursor
+
+
+def get_history_limit():
+    """Maximum number of messages replayed to a socket on connect."""
+    return getattr(settings, 'CHAT_HISTORY_LIMIT', 50)
+
+
+def parse_last_seen(group, value):
+    """
+    Resolve a `last_seen` marker (message id or ISO timestamp) to a
+    (created_at, id) position in the group. Returns None if it can't be resolved.
+    """
+    if not value:
+        return None
+    try:
+        message_id = uuid.UUID(value)
+    except ValueError:
+        timestamp = parse_datetime(value)
+        if timestamp is None:
+            return None
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+        return (timestamp, None)
+
+    return Chat.objects.filter(group=group, id=message_id).values_list('created_at', 'id').first()
+
+
+def get_replay_chats(group, limit, last_seen=None):
+    """
+    Return (chats, has_more) for a connecting socket.
+
+    Without a last_seen position this is the newest `limit` messages. With one,
+    it is the first `limit` messages after that position, oldest first, and
+    has_more tells the client there is still a gap to fill over REST.
+    """
+    chats = Chat.objects.filter(group=group).select_related('sender')
+
+    if last_seen is None:
+        newest = list(chats.order_by('-created_at', '-id')[:limit])
+        newest.reverse()
+        return newest, False
+
+    created_at, message_id = last_seen
+    if message_id is None:
+        chats = chats.filter(created_at__gt=created_at)
+    else:
+        # (created_at, id) > position, written so the index range is on created_at
+        chats = chats.filter(created_at__gte=created_at).exclude(created_at=created_at, id__lte=message_id)
+
+    page = list(chats.order_by('created_at', 'id')[:limit + 1])
+    return page[:limit], len(page) > limit
+
+
+def encode_cursor(chat):
+    """Opaque `before` cursor pointing at a message's (created_at, id) position."""
+    raw = f"{chat.created_at.isoformat()}|{chat.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor. Raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, message_id = raw.split('|')
+        timestamp = parse_datetime(created_at)
+        message_id = uuid.UUID(message_id)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid cursor.')
+    if timestamp is None:
+        raise ValueError('Invalid cursor.')
+    return timestamp, message_id
+
+
+def get_scrollback_page(group, page_size, before=None):
+    """
+    Return (chats, next_cursor) for the page of messages older than `before`.
+
+    The page is returned oldest first. Each page is a single index seek on
+    (group, created_at, id) with no OFFSET, so page 500 costs the same as page 1.
+    """
+    chats = Chat.objects.filter(group=group).select_related('sender')
+    if before is not None:
+        created_at, message_id = before
+        chats = chats.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=message_id)
+
+    page = list(chats.order_by('-created_at', '-id')[:page_size + 1])
+    has_more = len(page) > page_size
+    page = page[:page_size]
+    next_cursor = encode_cursor(page[-1]) if has_more else None
+    page.reverse()
+    return page, next_cursor
+
+
+def bump_unread_counts(chats):
+    """
+    Add newly stored messages to every other member's unread_count.
+    One UPDATE per (group, sender) pair in the batch.
+    """
+    batches = Counter((chat.group_id, chat.sender_id) for chat in chats)
+    for (group_id, sender_id), count in batches.items():
+        GroupReadCursor.objects.filter(group_id=group_id).exclude(user_id=sender_id).update(
+            unread_count=F('unread_count') + count
+        )
+
+
+def ensure_read_cursors(group_id, user_ids):
+    """Create cursors for new members, starting with nothing unread."""
+    GroupReadCursor.objects.bulk_create(
+        [GroupReadCursor(user_id=user_id, group_id=group_id, last_read_at=timezone.now()) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+
+
+def advance_read_cursor(group_id, user, chat=None):
+    """
+    Move the user's cursor to `chat` (or to now) and recount what is still
+    unread after it; normally nothing, so this is one small index range scan.
+
+    The cursor row stays locked from before the recount until the write, so a
+    concurrent bump_unread_counts() either lands before the lock (and its
+    message is in the recount) or waits and adds on top of the new count.
+    """
+    read_at = chat.created_at if chat is not None else timezone.now()
+    with transaction.atomic():
+        cursor, _ = GroupReadCursor.objects.select_for_update().get_or_create(user=user, group_id=group_id)
+        cursor.last_read_at = read_at
+        cursor.unread_count = Chat.objects.filter(group_id=group_id, created_at__gt=read_at).exclude(sender=user).count()
+        cursor.save(update_fields=['last_read_at', 'unread_count', 'updated_at'])
+    return cursor
@@ -1,7 +1,12 @@
+import uuid
 from django.shortcuts import render
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView 
-from apps.chat.models import Group
-from apps.chat.serializers import GroupSerializer
+from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
+from apps.chat.models import Group, Chat, GroupReadCursor
+from apps.chat.serializers import GroupListCreateSerializer as GroupSerializer, ChatSerializer, GroupReadCursorSerializer
+from apps.chat.membership import get_group_access, can_access
+from apps.chat.utils import decode_cursor, get_scrollback_page, advance_read_cursor
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
@@ -22,4 +27,76 @@ class GroupRetrieveUpdateDestroyView(RetrieveUpdateDestroyAPIView):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = [RoleRequiredPermission]
-    allowed_roles = ['Teacher']
\ No newline at end of file
+    allowed_roles = ['Teacher']
+
+class GroupChatHistoryView(APIView):
+    """
+    Scrollback for a chat group, newest page first.
+    Pass the returned `next` value as ?before= to fetch the page before it.
+    """
+    permission_classes = [IsAuthenticated]
+    page_size = 50
+    max_page_size = 100
+
+    def get(self, request, group_id):
+        access = get_group_access(group_id)
+        if access is None:
+            raise NotFound()
+        if not can_access(access, request.user.id):
+            return Response({'detail': 'You are not a member of this group.'}, status=status.HTTP_403_FORBIDDEN)
+
+        before = request.query_params.get('before')
+        if before:
+            try:
+                before = decode_cursor(before)
+            except ValueError:
+                return Response({'before': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            page_size = min(int(request.query_params.get('page_size', self.page_size)), self.max_page_size)
+        except ValueError:
+            page_size = self.page_size
+
+        chats, next_cursor = get_scrollback_page(group_id, max(page_size, 1), before or None)
+        return Response({
+            'next': next_cursor,
+            'results': ChatSerializer(chats, many=True).data,
+        })
+
+
+
+class GroupUnreadCountsView(APIView):
+    """Unread badge counts for every group the user belongs to, in one query."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        cursors = GroupReadCursor.objects.filter(user=request.user).only('group_id', 'unread_count', 'last_read_at')
+        return Response(GroupReadCursorSerializer(cursors, many=True).data)
+
+
+class GroupMarkReadView(APIView):
+    """
+    Advance the user's read cursor. Body may carry `message` (a chat id) to
+    mark everything up to that message as read; otherwise everything is read.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, group_id):
+        access = get_group_access(group_id)
+        if access is None:
+            raise NotFound()
+        if not can_access(access, request.user.id):
+            return Response({'detail': 'You are not a member of this group.'}, status=status.HTTP_403_FORBIDDEN)
+
+        chat = None
+        message_id = request.data.get('message')
+        if message_id:
+            try:
+                chat = Chat.objects.filter(group_id=group_id, id=uuid.UUID(str(message_id))).only('created_at').first()
+            except ValueError:
+                chat = None
+            if chat is None:
+                return Response({'message': 'Message not found in this group.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        cursor = advance_read_cursor(group_id, request.user, chat)
+        return Response(GroupReadCursorSerializer(cursor).data)
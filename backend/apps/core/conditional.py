@@ -0,0 +1,86 @@
+"""
+Conditional GET for read-mostly endpoints: ETag / If-None-Match answered
+before the view queries or serializes anything.
+
+A view lists the querysets its payload is built from in get_validators().
+Each one is reduced to "<latest updated_at>:<row count>" with one aggregate
+query. The ETag hashes those together with the user and the full path, so
+query parameters (?fields=, ?page=, search terms) get their own tags. A save
+moves updated_at, and an insert or delete moves the count.
+
+Class.updated_at is also bumped when a class gains or loses members, or when
+one of its subjects, teachers or students is edited (see core.signals and
+touch_classes()). Class validators therefore cover the nested payloads too.
+
+Responses are marked `Cache-Control: private, no-cache`: the browser keeps
+the body and revalidates every time, so the SPA gets fresh data or a 304.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def queryset_validator(queryset, field='updated_at'):
+    """'<latest `field`>:<row count>' for `queryset`."""
+    values = queryset.order_by().aggregate(latest=Max(field), count=Count('pk'))
+    latest = values['latest'].isoformat() if values['latest'] else ''
+    return f"{latest}:{values['count']}"
+
+
+def make_etag(request, validators):
+    user = getattr(request.user, 'pk', None)
+    key = '|'.join([str(user), request.get_full_path(), *validators])
+    return '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    # Weak comparison, as for GET in RFC 9110
+    tags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(header)]
+    return '*' in tags or etag in tags
+
+
+class NotModified(Exception):
+    pass
+
+
+class ConditionalGetMixin:
+    """
+    APIView mixin: a GET whose If-None-Match matches the ETag built from
+    get_validators() is answered 304 Not Modified once authentication and
+    permissions have passed, before the handler runs.
+    """
+    etag = None
+
+    def get_validators(self, request, *args, **kwargs):
+        """Validator strings for this request, or None to skip conditional handling."""
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            return
+        validators = self.get_validators(request, *args, **kwargs)
+        if validators is not None:
+            self.etag = make_etag(request, validators)
+            if etag_matches(request, self.etag):
+                raise NotModified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = self.etag
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,166 @@
+"""
+Soft delete for classes and users, with the cascade run in the background.
+
+soft_delete() stamps deleted_at (and clears is_active on a user) and records
+a DeletionJob, all in one short transaction. The default managers
+(Class.objects, User.objects) skip soft-deleted rows, so the object is gone
+from lists, lookups, member payloads and logins as soon as that commits.
+Rows that only reach it through a join, such as a teacher's assignments for
+a deleted class or its chat groups, stay visible until the purge removes
+them.
+
+The purge then walks the object's plan below, bottom up: each step deletes
+(or, for SET_NULL relations, nulls) at most DELETION_BATCH_SIZE rows per
+transaction until none match, saving the running total in job.progress after
+every batch. The object itself goes last, and Django's collector picks up
+whatever small relations the plan leaves out. Every step only removes what
+is left, so a failed or interrupted job can simply be run again.
+
+With DELETION_USE_CELERY the job is queued to the purge_deletion task once
+the soft delete commits. Otherwise it is handed to a daemon thread in the
+same process, so the request that deleted the object returns with the job
+still pending either way. Jobs left pending (no broker at the time), failed
+or stalled (say the process exited mid-purge) are picked up by
+`manage.py run_deletion_jobs` and the periodic resume_deletion_jobs task.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.activity_log.models import ActivityLog
+from apps.chat.models import Chat, Group, GroupReadCursor
+from apps.core.models import Assignment, AssignmentSubmission, Class, DeletionJob
+from apps.core.signals import touch_classes
+
+
+logger = logging.getLogger(__name__)
+
+
+# model -> [(progress key, model, lookups to the object's pk (ORed), field to null instead of deleting)]
+PLANS = {
+    Class: [
+        ('chat messages', Chat, ('group__group_class',), None),
+        ('chat read cursors', GroupReadCursor, ('group__group_class',), None),
+        ('chat group members', Group.members.through, ('group__group_class',), None),
+        ('chat groups', Group, ('group_class',), None),
+        ('assignment submissions', AssignmentSubmission, ('assignment__class_assigned',), None),
+        ('assignments', Assignment, ('class_assigned',), None),
+        ('subjects', Class.subjects.through, ('class',), None),
+        ('teachers', Class.teachers.through, ('class',), None),
+        ('students', Class.students.through, ('class',), None),
+    ],
+    User: [
+        # Groups the user created go with them, other members' messages included
+        ('chat messages', Chat, ('sender', 'group__group_creator'), None),
+        ('chat read cursors', GroupReadCursor, ('user', 'group__group_creator'), None),
+        ('chat group members', Group.members.through, ('user', 'group__group_creator'), None),
+        ('chat groups', Group, ('group_creator',), None),
+        ('assignment submissions', AssignmentSubmission, ('student', 'assignment__teacher'), None),
+        ('assignments', Assignment, ('teacher',), None),
+        ('classes as teacher', Class.teachers.through, ('user',), None),
+        ('classes as student', Class.students.through, ('user',), None),
+        ('activity logs', ActivityLog, ('user',), 'user'),
+        # Activity rollups keep the user's id (see ActivityRollup.user)
+    ],
+}
+
+
+def soft_delete(instance, requested_by=None):
+    """Hide a class or user now and queue the purge of it and its dependents. Returns the DeletionJob."""
+    model = type(instance)
+    if model not in PLANS:
+        raise TypeError(f"{model.__name__} has no deletion plan")
+    with transaction.atomic():
+        instance.deleted_at = timezone.now()
+        update_fields = ['deleted_at']
+        if model is User:
+            instance.is_active = False
+            update_fields.append('is_active')
+        instance.save(update_fields=update_fields)
+        if model is User:
+            # The user drops out of their classes' member payloads
+            touch_classes(pk__in=Class.objects.filter(Q(teachers=instance) | Q(students=instance)).values('pk'))
+        job = DeletionJob.objects.create(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id=instance.pk,
+            object_repr=str(instance)[:200],
+            requested_by=requested_by,
+        )
+        transaction.on_commit(lambda: enqueue(job.pk), robust=True)
+    return job
+
+
+def enqueue(job_id):
+    if getattr(settings, 'DELETION_USE_CELERY', False):
+        from apps.core.tasks import purge_deletion
+        purge_deletion.delay(str(job_id))
+    else:
+        threading.Thread(target=_purge_in_background, args=(job_id,), name=f'deletion-{job_id}', daemon=True).start()
+
+
+def _purge_in_background(job_id):
+    try:
+        run_job(job_id)
+    except Exception:
+        pass  # run_job has logged it and marked the job failed
+    finally:
+        # The thread opened its own connection; don't leak it
+        connections.close_all()
+
+
+def run_job(job_id, batch_size=None):
+    """Run (or resume) a deletion job to the end. Returns the job."""
+    batch_size = batch_size or getattr(settings, 'DELETION_BATCH_SIZE', 1000)
+    job = DeletionJob.objects.select_related('content_type').get(pk=job_id)
+    if job.status == 'done':
+        return job
+    model = job.content_type.model_class()
+    job.status, job.error = 'running', ''
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=['status', 'error', 'started_at', 'updated_at'])
+    try:
+        for key, step_model, lookups, null_field in PLANS[model]:
+            condition = Q(*(Q(**{lookup: job.object_id}) for lookup in lookups), _connector=Q.OR)
+            _run_step(job, key, step_model._base_manager.filter(condition), null_field, batch_size)
+        with transaction.atomic():
+            model._base_manager.filter(pk=job.object_id).delete()
+            job.status, job.finished_at = 'done', timezone.now()
+            job.save(update_fields=['status', 'finished_at', 'updated_at'])
+    except Exception as exc:
+        logger.exception("Deletion job %s failed", job.pk)
+        job.status, job.error = 'failed', repr(exc)
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        raise
+    return job
+
+
+def _run_step(job, key, queryset, null_field, batch_size):
+    model = queryset.model
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return
+            rows = model._base_manager.filter(pk__in=pks)
+            if null_field:
+                count = rows.update(**{null_field: None})
+            else:
+                count = rows.delete()[1].get(model._meta.label, 0)
+            job.progress[key] = job.progress.get(key, 0) + count
+            job.save(update_fields=['progress', 'updated_at'])
+
+
+def resumable_jobs(now=None):
+    """Pending jobs, and running ones with no progress for DELETION_STALE_AFTER seconds."""
+    now = now or timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, 'DELETION_STALE_AFTER', 600))
+    return DeletionJob.objects.filter(
+        Q(status='pending', created_at__lt=stale) | Q(status='running', updated_at__lt=stale)
+    ).order_by('created_at')
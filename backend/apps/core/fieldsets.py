@@ -0,0 +1,155 @@
+"""
+Sparse fieldsets for nested payloads: ?fields= and ?expand=.
+
+    ?fields=id,name,students.full_name   only these fields; a dotted path selects
+                                        fields of a relation and expands it
+    ?expand=students,subjects           render these relations as nested objects
+
+With neither parameter a serializer renders exactly as it always has. Once
+either is given, a nested relation is rendered in full only when it is
+expanded. An unexpanded relation named in ?fields (or any relation, when
+?fields is absent) is rendered as a list of ids. An unexpanded relation that
+?fields leaves out is dropped, and so is its query.
+
+SparseFieldsMixin applies this to a ModelSerializer, and project_queryset()
+narrows the ORM query to match: only() on the columns left, and a trimmed
+Prefetch for each relation that is still rendered.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+
+def _tree(value):
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(part, {})
+    return tree
+
+
+class Fieldset:
+    def __init__(self, fields=None, expand=None, default=False):
+        # fields: {name: subtree} for the names to keep at this level, or None for all
+        self.fields = fields
+        self.expand = expand or {}
+        self.default = default
+
+    @classmethod
+    def parse(cls, fields='', expand=''):
+        if not fields and not expand:
+            return cls(default=True)
+        return cls(_tree(fields) if fields else None, _tree(expand))
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None:
+            return cls(default=True)
+        return cls.parse(request.query_params.get('fields', ''), request.query_params.get('expand', ''))
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return name in self.expand or bool(self.fields and self.fields.get(name))
+
+    def child(self, name):
+        fields = self.fields.get(name) if self.fields else None
+        return Fieldset(fields or None, self.expand.get(name))
+
+
+def apply_fieldset(serializer, fieldset):
+    """Drop, collapse to ids, or recurse into each field of `serializer` per `fieldset`."""
+    if fieldset.default:
+        return
+    for name, field in list(serializer.fields.items()):
+        if not fieldset.includes(name):
+            serializer.fields.pop(name)
+            continue
+        nested = field.child if isinstance(field, ListSerializer) else field
+        if not isinstance(nested, BaseSerializer):
+            continue
+        if fieldset.expands(name):
+            apply_fieldset(nested, fieldset.child(name))
+        else:
+            source = {} if field.source == name else {'source': field.source}
+            serializer.fields[name] = PrimaryKeyRelatedField(
+                many=isinstance(field, ListSerializer), read_only=True, **source
+            )
+
+
+def project_queryset(queryset, serializer):
+    """
+    Narrow `queryset` to what `serializer` (after apply_fieldset) reads:
+    only() its columns, and prefetch each relation it renders with a queryset
+    projected the same way. Existing select_related / prefetch_related calls
+    are replaced. Fields that don't map onto a model field turn off only()
+    for that level.
+    """
+    if isinstance(serializer, ListSerializer):
+        serializer = serializer.child
+    model = queryset.model
+    columns = {model._meta.pk.name}
+    prefetches = []
+    restrict = True
+
+    for field in serializer.fields.values():
+        if field.source == '*':
+            restrict = False
+            continue
+        name = field.source_attrs[0]
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            restrict = False
+            continue
+        if not model_field.is_relation:
+            columns.add(name)
+            continue
+
+        nested = field.child if isinstance(field, ListSerializer) else field
+        related = model_field.related_model._default_manager.all()
+        if isinstance(nested, BaseSerializer):
+            inner = project_queryset(related, nested)
+        elif isinstance(field, (ManyRelatedField, PrimaryKeyRelatedField)) and len(field.source_attrs) == 1:
+            inner = related.only('pk')
+        else:
+            inner = None
+
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetches.append(Prefetch(name, queryset=inner) if inner is not None else name)
+        else:
+            columns.add(name)
+            if isinstance(nested, BaseSerializer):
+                prefetches.append(Prefetch(name, queryset=inner))
+
+    # Relations are prefetched with their own projection; a join would drag in every column
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if restrict:
+        queryset = queryset.only(*columns)
+    return queryset.prefetch_related(*prefetches)
+
+
+class SparseFieldsMixin:
+    """
+    ModelSerializer mixin honouring ?fields= / ?expand= from the request in
+    the serializer context (or an explicit `fieldset=` argument).
+
+    Views narrow their queryset with SerializerClass.project(queryset, request)
+    so the query reads only what will be rendered.
+    """
+
+    def __init__(self, *args, fieldset=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fieldset is None:
+            fieldset = Fieldset.from_request(self.context.get('request'))
+        apply_fieldset(self, fieldset)
+
+    @classmethod
+    def project(cls, queryset, request):
+        fieldset = Fieldset.from_request(request)
+        if fieldset.default:
+            return queryset
+        return project_queryset(queryset, cls(fieldset=fieldset))
@@ -0,0 +1,78 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.core.models import Class, Subject
+
+
+# The columns the admin class list page actually renders
+LIST_PAGE_FIELDS = (
+    'id,name,academic_year,schedule,subjects.id,subjects.name,'
+    'teachers.id,teachers.username,teachers.full_name,students.id,students.username,students.full_name'
+)
+
+VARIANTS = {
+    'full': {},
+    'list page': {'fields': LIST_PAGE_FIELDS},
+    'ids only': {'fields': 'id,name,students'},
+}
+
+
+class Command(BaseCommand):
+    help = "Compare /api/admin/classes/ payload size and latency with and without ?fields= projection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=10)
+        parser.add_argument('--students', type=int, default=40, help='Students per class.')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per variant.')
+
+    def handle(self, *args, **options):
+        # Everything created here is rolled back at the end
+        with transaction.atomic():
+            admin = self.seed(options['classes'], options['students'])
+            client = APIClient(SERVER_NAME='localhost')
+            client.force_authenticate(user=admin)
+            for name, params in VARIANTS.items():
+                self.run(client, name, dict(params, page_size=options['classes']), options['requests'])
+            transaction.set_rollback(True)
+
+    def seed(self, classes, students):
+        prefix = f"bench-{uuid.uuid4().hex[:6]}"
+        password = make_password('bench-password')
+        admin = User.objects.create(username=f"{prefix}-admin", password=password, role='Admin', is_staff=True)
+        for c in range(classes):
+            users = User.objects.bulk_create([
+                User(
+                    username=f"{prefix}-{c}-{i}", email=f"{prefix}-{c}-{i}@example.com", password=password,
+                    role='Teacher' if i < 2 else 'Student', full_name=f"Person {c}.{i}",
+                    phone_number='555-0100', address='1 School Road', bio='Lorem ipsum dolor sit amet. ' * 8,
+                )
+                for i in range(students + 2)
+            ])
+            class_obj = Class.objects.create(name=f"{prefix} class {c}", academic_year="2025-2026", schedule="Mon/Wed 10:00")
+            class_obj.subjects.add(*[
+                Subject.objects.create(name=f"Subject {c}.{s}", code=f"{prefix[-6:]}{c}{s}") for s in range(3)
+            ])
+            class_obj.teachers.add(*users[:2])
+            class_obj.students.add(*users[2:])
+        return admin
+
+    def run(self, client, name, params, requests):
+        client.get('/api/admin/classes/', params)
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get('/api/admin/classes/', params)
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f"{name:<10} {len(response.content) / 1024:8.1f} KB  {len(queries):2d} queries  "
+            f"mean {statistics.mean(timings):7.2f} ms  p50 {statistics.median(timings):7.2f} ms"
+        )
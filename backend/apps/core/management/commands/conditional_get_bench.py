@@ -0,0 +1,57 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from apps.core.management.commands.class_payload_bench import Command as ClassPayloadBench
+from apps.core.models import Class
+
+
+class Command(BaseCommand):
+    help = "Compare a full GET with an ETag revalidation (304) on the read-mostly class and subject endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=10)
+        parser.add_argument('--students', type=int, default=40, help='Students per class.')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per endpoint and mode.')
+
+    def handle(self, *args, **options):
+        # Everything created here is rolled back at the end
+        with transaction.atomic():
+            admin = ClassPayloadBench().seed(options['classes'], options['students'])
+            class_obj = Class.objects.filter(name__startswith=admin.username.rsplit('-', 1)[0]).first()
+            teacher, student = class_obj.teachers.first(), class_obj.students.first()
+            endpoints = [
+                ('admin classes', admin, f"/api/admin/classes/?page_size={options['classes']}"),
+                ('admin subjects', admin, '/api/admin/subjects/'),
+                ('teacher classes', teacher, '/api/teacher/classes/'),
+                ('teacher classes+subj', teacher, '/api/teacher/assignments/classes-subjects/'),
+                ('student classes', student, '/api/student/class/'),
+                ('student dashboard', student, '/api/student/dashboard/'),
+            ]
+            self.stdout.write(
+                f"{'endpoint':<22} {'200 KB':>8} {'200 ms':>8} {'200 cpu':>8} {'304 ms':>8} {'304 cpu':>8}"
+            )
+            for name, user, url in endpoints:
+                client = APIClient(SERVER_NAME='localhost')
+                client.force_authenticate(user=user)
+                full = client.get(url)
+                full_ms, full_cpu = self.timed(client, url, {}, options['requests'], 200)
+                cached_ms, cached_cpu = self.timed(client, url, {'HTTP_IF_NONE_MATCH': full['ETag']}, options['requests'], 304)
+                self.stdout.write(
+                    f"{name:<22} {len(full.content) / 1024:8.1f} {full_ms:8.2f} {full_cpu:8.2f} {cached_ms:8.2f} {cached_cpu:8.2f}"
+                )
+            transaction.set_rollback(True)
+
+    def timed(self, client, url, headers, requests, expected):
+        """Median wall and CPU milliseconds per request."""
+        wall, cpu = [], []
+        for _ in range(requests):
+            started, started_cpu = time.perf_counter(), time.process_time()
+            response = client.get(url, **headers)
+            wall.append((time.perf_counter() - started) * 1000)
+            cpu.append((time.process_time() - started_cpu) * 1000)
+            assert response.status_code == expected, (url, response.status_code)
+        return statistics.median(wall), statistics.median(cpu)
@@ -0,0 +1,67 @@
+import math
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.chat.models import Chat, Group
+from apps.core.deletion import run_job, soft_delete
+from apps.core.models import Class
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare deleting a class with a long chat history in one cascade (the old DELETE) "
+        "with a soft delete plus the batched purge."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=100000, help='Chat messages in the class.')
+        parser.add_argument('--students', type=int, default=40)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        # Everything created here is rolled back at the end
+        with transaction.atomic():
+            admin = User.objects.create(username=f"bench-{uuid.uuid4().hex[:6]}-admin", role='Admin', is_staff=True)
+
+            class_obj = self.seed(options['messages'], options['students'])
+            started = time.perf_counter()
+            class_obj.delete()
+            cascade = time.perf_counter() - started
+            self.stdout.write(f"cascade delete        {cascade * 1000:9.1f} ms in one transaction")
+
+            class_obj = self.seed(options['messages'], options['students'])
+            started = time.perf_counter()
+            job = soft_delete(class_obj, requested_by=admin)
+            hidden = time.perf_counter() - started
+            started = time.perf_counter()
+            job = run_job(job.pk, batch_size=options['batch_size'])
+            purge = time.perf_counter() - started
+            batches = sum(math.ceil(count / options['batch_size']) for count in job.progress.values())
+            self.stdout.write(f"soft delete (request) {hidden * 1000:9.1f} ms")
+            self.stdout.write(
+                f"purge                 {purge * 1000:9.1f} ms in {batches} batches, "
+                f"{purge * 1000 / max(batches, 1):.1f} ms per batch"
+            )
+            transaction.set_rollback(True)
+
+    def seed(self, messages, students):
+        prefix = f"bench-{uuid.uuid4().hex[:6]}"
+        users = User.objects.bulk_create([
+            User(username=f"{prefix}-{i}", role='Teacher' if i == 0 else 'Student') for i in range(students + 1)
+        ])
+        class_obj = Class.objects.create(name=f"{prefix} class", academic_year="2025-2026", schedule="Mon")
+        class_obj.teachers.add(users[0])
+        class_obj.students.add(*users[1:])
+        group = Group.objects.create(name=f"{prefix} group", group_class=class_obj, group_creator=users[0])
+        group.members.add(*users[1:])
+        now = timezone.now()
+        Chat.objects.bulk_create([
+            Chat(group=group, sender=users[i % len(users)], message=f"message {i}", created_at=now)
+            for i in range(messages)
+        ], batch_size=5000)
+        return class_obj
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import USER_SEARCH
+from apps.core.models import SUBJECT_SEARCH
+
+
+class Command(BaseCommand):
+    help = "Re-create and refill the SQLite full-text search tables and their triggers (needed after VACUUM)."
+
+    def handle(self, *args, **options):
+        for index in (USER_SEARCH, SUBJECT_SEARCH):
+            index.rebuild()
+            self.stdout.write(f"Rebuilt {index.table}")
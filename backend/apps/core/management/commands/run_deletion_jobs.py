@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.deletion import resumable_jobs, run_job
+from apps.core.models import DeletionJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Run deletion jobs in this process: pending and stalled ones by default, "
+        "failed ones with --failed, or the given job ids."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', help='Run these jobs whatever their status.')
+        parser.add_argument('--failed', action='store_true', help='Also retry failed jobs.')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction. Defaults to DELETION_BATCH_SIZE.')
+
+    def handle(self, *args, **options):
+        if options['job_ids']:
+            job_ids = options['job_ids']
+        else:
+            job_ids = list(resumable_jobs().values_list('pk', flat=True))
+            if options['failed']:
+                job_ids += list(DeletionJob.objects.filter(status='failed').order_by('created_at').values_list('pk', flat=True))
+        for job_id in job_ids:
+            try:
+                job = run_job(job_id, batch_size=options['batch_size'])
+            except Exception as exc:
+                self.stderr.write(f"{job_id}: failed: {exc!r}")
+                continue
+            self.stdout.write(f"{job.pk}: {job.content_type.model} {job.object_repr} {job.status} {job.progress}")
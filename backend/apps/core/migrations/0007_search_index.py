@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:20
+
+import apps.core.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.core.search import SearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_assignment_assignment_submissions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubjectSearchEntry',
+            fields=[
+                ('subject', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='core.subject')),
+                ('document', apps.core.search.FullTextField(db_column='core_subject_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'core_subject_search',
+                'managed': False,
+            },
+        ),
+        SearchIndex(
+            table='core_subject_search', source='core_subject', key='subject_id',
+            fields=('name', 'code'), weights=(2, 3), relation='search_entry',
+        ).migration(),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+from apps.core.search import SearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        # Adding the column rebuilt core_subject on SQLite, dropping its search triggers
+        SearchIndex(
+            table='core_subject_search', source='core_subject', key='subject_id',
+            fields=('name', 'code'), weights=(2, 3), relation='search_entry',
+        ).rebuild_migration(),
+    ]
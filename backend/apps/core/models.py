@@ -1,5 +1,7 @@
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from apps.accounts.models import User
+from apps.core.search import FullTextField, SearchIndex
 import uuid
 
 
@@ -8,6 +10,7 @@ class Subject(models.Model):
     name = models.CharField(max_length=100)
     code = models.CharField(max_length=10, unique=True)
     timestamp = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-timestamp']
@@ -16,6 +19,50 @@ class Subject(models.Model):
         return self.name
 
 
+# FTS5 table over subject names and codes; see apps.core.search
+SUBJECT_SEARCH = SearchIndex(
+    table='core_subject_search', source='core_subject', key='subject_id',
+    fields=('name', 'code'), weights=(2, 3), relation='search_entry',
+)
+
+
+class SubjectSearchEntry(models.Model):
+    subject = models.OneToOneField(
+        Subject, primary_key=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='search_entry'
+    )
+    document = FullTextField(db_column='core_subject_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'core_subject_search'
+
+
+# Columns the nested user serializers read from class teachers / students
+NESTED_USER_FIELDS = ('id', 'username', 'full_name', 'email', 'phone_number', 'address', 'bio', 'role')
+
+
+class ClassQuerySet(models.QuerySet):
+    def with_members(self):
+        """
+        Prefetch subjects, teachers and students with only the columns the
+        nested class serializers use: three queries for any number of classes
+        instead of three per class.
+        """
+        return self.prefetch_related(
+            models.Prefetch('subjects', queryset=Subject.objects.only('id', 'name', 'code')),
+            models.Prefetch('teachers', queryset=User.objects.only(*NESTED_USER_FIELDS)),
+            models.Prefetch('students', queryset=User.objects.only(*NESTED_USER_FIELDS)),
+        )
+
+
+class ClassManager(models.Manager.from_queryset(ClassQuerySet)):
+    """Classes that have not been soft-deleted (see apps.core.deletion)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Class(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
     name = models.CharField(max_length=100)
@@ -25,9 +72,24 @@ class Class(models.Model):
     academic_year = models.CharField(max_length=9)  # e.g., "2024-2025"
     schedule = models.CharField(max_length=100)  # e.g., "Mon/Wed 10:00-11:00"
     timestamp = models.DateTimeField(auto_now_add=True)
+    # Also bumped when members change or a nested subject / user is edited (see core.signals)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set when an admin deletes the class; a DeletionJob removes the row later
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ClassManager()
+    # Soft-deleted classes too
+    all_objects = ClassQuerySet.as_manager()
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Keyset pages of the admin class list, newest first (see admin_panel.pagination)
+            models.Index(fields=['timestamp', 'id'], name='class_ts_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
 
 
 class Assignment(models.Model):
@@ -59,4 +121,41 @@ class AssignmentSubmission(models.Model):
     submitted_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['-submitted_at']
\ No newline at end of file
+        ordering = ['-submitted_at']
+
+
+class DeletionJob(models.Model):
+    """
+    The purge of one soft-deleted class or user: its dependent rows are
+    deleted in batches, then the object itself (see apps.core.deletion).
+    `progress` maps each step to the rows removed so far.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.UUIDField()
+    object_repr = models.CharField(max_length=200)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='deletion_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    progress = models.JSONField(default=dict)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Moves with every batch, so a stalled running job can be told apart
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='deletion_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} {self.object_repr} ({self.status})"
@@ -0,0 +1,181 @@
+"""
+Indexed search for the admin lists, instead of an icontains scan per field.
+
+SQLite
+    Every searchable table has an FTS5 shadow table, e.g. accounts_user_search,
+    created by a migration and kept in step by AFTER INSERT / UPDATE / DELETE
+    triggers on the source table. Because the triggers run in the database,
+    bulk_create() and queryset.update() are covered too. Each row carries the
+    source primary key in an UNINDEXED column and uses the source row's rowid.
+    An unmanaged model (UserSearchEntry, SubjectSearchEntry) maps the table,
+    so search() stays an ordinary join that can be filtered, counted and
+    paginated.
+
+    Every word of the search term is matched as a prefix of some word in the
+    indexed columns ("jo do" finds "John Doe" and "jo.doe@example.com").
+    Results are ranked by bm25 with per-column weights.
+
+    Ranking and joining back every match costs more than a plain scan once a
+    term matches most of the table ("example.com", "03"). Past
+    SEARCH_MAX_RANKED_MATCHES matches, counted on the index first, search()
+    falls back to the unranked icontains filter.
+
+    VACUUM can renumber the rowids of tables without an INTEGER PRIMARY KEY,
+    and a migration that makes SQLite rebuild a source table (most AlterField
+    and non-nullable AddField operations) also drops its triggers. Such a
+    migration should end with index.rebuild_migration(); after a VACUUM, run
+    `manage.py rebuild_search_index`.
+
+PostgreSQL
+    The migration adds pg_trgm GIN indexes on UPPER(column), which is what
+    icontains compiles to. search() filters with icontains on each word and
+    ranks by trigram word similarity.
+
+Other databases get the same icontains filter, unindexed and unranked.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection, migrations, models
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+
+class FullTextField(models.TextField):
+    """The hidden FTS5 column named after its table, which MATCH is run against."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class SearchIndex:
+    """
+    A search table over `fields` of `source` (a db table name).
+
+    `key` is the column holding the source primary key and `relation` the
+    reverse accessor from the source model to its unmanaged entry model.
+    `weights` are the bm25 weights of `fields`, in order.
+    """
+
+    def __init__(self, table, source, key, fields, weights, relation):
+        self.table = table
+        self.source = source
+        self.key = key
+        self.fields = tuple(fields)
+        self.weights = tuple(weights)
+        self.relation = relation
+
+    # Schema
+
+    def sqlite_create(self):
+        columns = ', '.join(self.fields)
+        changed = ' OR '.join(f'old.{field} IS NOT new.{field}' for field in self.fields)
+        assignments = ', '.join(f'{field} = new.{field}' for field in self.fields)
+        new_values = ', '.join(f'new.{field}' for field in self.fields)
+        weights = ', '.join(str(float(weight)) for weight in (0, *self.weights))
+        return [
+            f"CREATE VIRTUAL TABLE {self.table} USING fts5("
+            f"{self.key} UNINDEXED, {columns}, prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+            f"INSERT INTO {self.table}({self.table}, rank) VALUES ('rank', 'bm25({weights})')",
+            f"CREATE TRIGGER {self.table}_ai AFTER INSERT ON {self.source} BEGIN "
+            f"INSERT INTO {self.table}(rowid, {self.key}, {columns}) VALUES (new.rowid, new.id, {new_values}); END",
+            f"CREATE TRIGGER {self.table}_au AFTER UPDATE ON {self.source} WHEN {changed} BEGIN "
+            f"UPDATE {self.table} SET {assignments} WHERE rowid = old.rowid; END",
+            f"CREATE TRIGGER {self.table}_ad AFTER DELETE ON {self.source} BEGIN "
+            f"DELETE FROM {self.table} WHERE rowid = old.rowid; END",
+            *self.sqlite_rebuild(),
+        ]
+
+    def sqlite_rebuild(self):
+        columns = ', '.join(self.fields)
+        return [
+            f"DELETE FROM {self.table}",
+            f"INSERT INTO {self.table}(rowid, {self.key}, {columns}) SELECT rowid, id, {columns} FROM {self.source}",
+            f"INSERT INTO {self.table}({self.table}) VALUES ('optimize')",
+        ]
+
+    def sqlite_drop(self):
+        return [
+            *(f"DROP TRIGGER IF EXISTS {self.table}_{suffix}" for suffix in ('ai', 'au', 'ad')),
+            f"DROP TABLE IF EXISTS {self.table}",
+        ]
+
+    def postgresql_create(self):
+        return ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+            f'CREATE INDEX IF NOT EXISTS {self.source}_{field}_trgm '
+            f'ON {self.source} USING gin (UPPER("{field}"::text) gin_trgm_ops)'
+            for field in self.fields
+        ]
+
+    def postgresql_drop(self):
+        return [f'DROP INDEX IF EXISTS {self.source}_{field}_trgm' for field in self.fields]
+
+    def migration(self):
+        """RunPython operation creating (and on reverse dropping) the index for the current database."""
+        def run(statements):
+            def apply(apps, schema_editor):
+                vendor = schema_editor.connection.vendor
+                for statement in statements.get(vendor, list)():
+                    schema_editor.execute(statement, params=None)
+            return apply
+
+        return migrations.RunPython(
+            run({'sqlite': self.sqlite_create, 'postgresql': self.postgresql_create}),
+            run({'sqlite': self.sqlite_drop, 'postgresql': self.postgresql_drop}),
+        )
+
+    def rebuild_migration(self):
+        """RunPython operation re-creating the SQLite table and triggers after the source table was rebuilt."""
+        def apply(apps, schema_editor):
+            if schema_editor.connection.vendor == 'sqlite':
+                for statement in self.sqlite_drop() + self.sqlite_create():
+                    schema_editor.execute(statement, params=None)
+
+        return migrations.RunPython(apply, migrations.RunPython.noop)
+
+    def rebuild(self, using=connection):
+        """Re-create the SQLite table and triggers and refill it from the source table."""
+        if using.vendor == 'sqlite':
+            with using.cursor() as cursor:
+                for statement in self.sqlite_drop() + self.sqlite_create():
+                    cursor.execute(statement)
+
+    # Queries
+
+    def count(self, query):
+        """Rows matching an FTS5 query, read from the index alone."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {self.table} WHERE {self.table} MATCH %s', [query])
+            return cursor.fetchone()[0]
+
+    def search(self, queryset, term):
+        """`queryset` narrowed to rows matching every word of `term`, best match first."""
+        words = re.findall(r'\w+', term.lower())
+        if not words:
+            return queryset
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+
+        if connection.vendor == 'sqlite':
+            query = ' '.join(f'"{word}"*' for word in words)
+            if self.count(query) <= getattr(settings, 'SEARCH_MAX_RANKED_MATCHES', 10000):
+                return queryset.filter(**{f'{self.relation}__document__match': query}).order_by(
+                    f'{self.relation}__rank', *ordering
+                )
+
+        condition = Q()
+        for word in words:
+            condition &= Q(*(Q(**{f'{field}__icontains': word}) for field in self.fields), _connector=Q.OR)
+        queryset = queryset.filter(condition)
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramWordSimilarity
+            term = ' '.join(words)
+            similarity = Greatest(*(TrigramWordSimilarity(term, field) for field in self.fields))
+            queryset = queryset.annotate(search_similarity=similarity).order_by('-search_similarity', *ordering)
+        return queryset
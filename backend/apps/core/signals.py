@@ -0,0 +1,55 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.core.models import NESTED_USER_FIELDS, Class, Subject
+
+
+def touch_classes(**lookups):
+    """
+    Bump updated_at on the classes matching `lookups`, so their ETags change
+    (see apps.core.conditional). Bulk writes that skip signals call this too.
+    """
+    Class.objects.filter(**lookups).update(updated_at=timezone.now())
+
+
+MEMBER_RELATIONS = {
+    Class.subjects.through: 'subjects',
+    Class.teachers.through: 'teachers',
+    Class.students.through: 'students',
+}
+
+
+# Members added / removed / cleared, from either side of the relation
+@receiver(m2m_changed, sender=Class.subjects.through)
+@receiver(m2m_changed, sender=Class.teachers.through)
+@receiver(m2m_changed, sender=Class.students.through)
+def touch_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        touch_classes(pk=instance.pk)
+    elif action == 'pre_clear':
+        # pk_set is empty for a clear; the rows are still there before it
+        touch_classes(**{MEMBER_RELATIONS[sender]: instance})
+    elif pk_set:
+        touch_classes(pk__in=pk_set)
+
+
+@receiver(post_save, sender=Subject)
+@receiver(pre_delete, sender=Subject)
+def touch_on_subject_change(sender, instance, created=False, **kwargs):
+    if not created:
+        touch_classes(subjects=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(pre_delete, sender=User)
+def touch_on_member_change(sender, instance, created=False, update_fields=None, **kwargs):
+    # New users are in no class yet; a login only writes last_login
+    if created or (update_fields is not None and not set(update_fields) & set(NESTED_USER_FIELDS)):
+        return
+    classes = Class.objects.filter(Q(teachers=instance) | Q(students=instance))
+    touch_classes(pk__in=classes.values('pk'))
@@ -0,0 +1,16 @@
+from celery import shared_task
+
+
+@shared_task
+def purge_deletion(job_id):
+    """Delete a soft-deleted class or user and its dependents (see apps.core.deletion)."""
+    from .deletion import run_job
+    run_job(job_id)
+
+
+@shared_task
+def resume_deletion_jobs():
+    """Periodic pass over deletion jobs that were never queued or stalled."""
+    from .deletion import resumable_jobs
+    for job_id in resumable_jobs().values_list('pk', flat=True):
+        purge_deletion.delay(str(job_id))
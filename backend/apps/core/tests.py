@@ -1,3 +1,229 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.core.models import Assignment, Class, Subject
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.teacher = User.objects.create_user(username='teacher', password='password', role='Teacher', full_name='T One')
+        self.subject = Subject.objects.create(name="Math", code="MATH101")
+        self.class_obj = Class.objects.create(name="Class A", academic_year="2024", schedule="Mon")
+        self.class_obj.subjects.add(self.subject)
+        self.class_obj.teachers.add(self.teacher)
+        self.students = [
+            User.objects.create_user(username=f'student{i}', password='password', role='Student', full_name=f'S {i}')
+            for i in range(3)
+        ]
+        self.class_obj.students.add(*self.students)
+        self.url = reverse('admin_panel:classes')
+        self.client.force_authenticate(user=self.admin)
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries]
+
+    def test_without_parameters_the_payload_is_unchanged(self):
+        response, _ = self.get(self.url)
+        [item] = response.data['results']
+        self.assertEqual(set(item), {'id', 'name', 'subjects', 'teachers', 'students', 'academic_year', 'schedule'})
+        self.assertIn('email', item['students'][0])
+
+    def test_fields_project_nested_columns(self):
+        response, queries = self.get(self.url, {'fields': 'id,name,students.full_name'})
+        [item] = response.data['results']
+        self.assertEqual(set(item), {'id', 'name', 'students'})
+        self.assertEqual(sorted(student['full_name'] for student in item['students']), ['S 0', 'S 1', 'S 2'])
+        self.assertEqual(set(item['students'][0]), {'full_name'})
+
+        # ETag validator, page, students: teachers and subjects are never loaded
+        self.assertEqual(len(queries), 3)
+        page_query, students_query = queries[1], queries[2]
+        self.assertNotIn('"academic_year"', page_query)
+        self.assertIn('"full_name"', students_query)
+        self.assertNotIn('"bio"', students_query)
+
+    def test_unexpanded_relations_render_as_ids(self):
+        response, queries = self.get(self.url, {'expand': 'subjects'})
+        [item] = response.data['results']
+        self.assertEqual(item['subjects'][0]['name'], 'Math')
+        self.assertEqual(item['teachers'], [self.teacher.id])
+        self.assertEqual(sorted(item['students']), sorted(student.id for student in self.students))
+        self.assertEqual(len(queries), 5)
+        self.assertNotIn('"bio"', queries[3] + queries[4])
+
+    def test_detail_and_other_roles_share_the_projection(self):
+        response, _ = self.get(reverse('admin_panel:class', args=[self.class_obj.pk]), {'fields': 'name,teachers.username'})
+        self.assertEqual(response.data, {'name': 'Class A', 'teachers': [{'username': 'teacher'}]})
+
+        self.client.force_authenticate(user=self.students[0])
+        response, queries = self.get(reverse('student:dashboard'), {'fields': 'name,subjects.code'})
+        self.assertEqual(response.data, [{'name': 'Class A', 'subjects': [{'code': 'MATH101'}]}])
+        self.assertEqual(len(queries), 3)
+
+    def test_assignment_payloads(self):
+        Assignment.objects.create(
+            title="Homework", description="Read", teacher=self.teacher, class_assigned=self.class_obj,
+            subject=self.subject, due_date=timezone.now() + datetime.timedelta(days=1),
+        )
+        self.client.force_authenticate(user=self.teacher)
+        response, queries = self.get(reverse('teacher:assignments'), {'fields': 'title,teacher,class_assigned.name'})
+        self.assertEqual(response.data, [{'title': 'Homework', 'teacher': self.teacher.id, 'class_assigned': {'name': 'Class A'}}])
+        # assignments, then their classes; no join to users or subjects
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('JOIN', queries[0])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True, email='root@school.org')
+        self.client.force_authenticate(user=self.admin)
+        self.john = User.objects.create_user(
+            username='jdoe', email='john.doe@example.com', password='password', full_name='John Doe', phone_number='03001234567'
+        )
+        self.johnny = User.objects.create_user(username='johnny', email='j@example.com', password='password', full_name='Johnny Cash')
+        self.url = reverse('admin_panel:users')
+
+    def search(self, term, url=None, param='search'):
+        response = self.client.get(url or self.url, {param: term})
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        return [item.get('username') or item.get('code') for item in results]
+
+    def test_prefix_match_across_columns_is_ranked(self):
+        # A username hit outranks a name / email hit
+        self.assertEqual(self.search('john'), ['johnny', 'jdoe'])
+        self.assertEqual(self.search('jo do'), ['jdoe'])
+        self.assertEqual(self.search('0300'), ['jdoe'])
+        self.assertEqual(self.search('school.org'), ['admin'])
+        self.assertEqual(self.search('ohn'), [])
+
+    def test_index_follows_saves_bulk_writes_and_deletes(self):
+        self.john.full_name = 'Jonathan Smith'
+        self.john.save()
+        User.objects.bulk_create([User(username='smithers', email='s@example.com', password='!')])
+        User.objects.filter(username='johnny').update(full_name='Waylon Smith')
+        self.assertEqual(sorted(self.search('smith')), ['jdoe', 'johnny', 'smithers'])
+
+        self.johnny.delete()
+        self.assertEqual(sorted(self.search('smith')), ['jdoe', 'smithers'])
+
+    def test_search_uses_the_full_text_index(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search('john')
+        self.assertTrue(any('MATCH' in query['sql'] for query in queries))
+        self.assertFalse(any('LIKE' in query['sql'] for query in queries))
+
+    @override_settings(SEARCH_MAX_RANKED_MATCHES=1)
+    def test_broad_terms_fall_back_to_a_scan(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(sorted(self.search('example')), ['jdoe', 'johnny'])
+        self.assertTrue(any('LIKE' in query['sql'] for query in queries))
+
+    def test_subject_search(self):
+        Subject.objects.create(name="Mathematics", code="MATH101")
+        Subject.objects.create(name="Applied Math", code="AM200")
+        Subject.objects.create(name="Physics", code="PHY101")
+        url = reverse('admin_panel:subjects')
+        self.assertEqual(self.search('math', url, 's'), ['MATH101', 'AM200'])
+        self.assertEqual(self.search('phy', url, 's'), ['PHY101'])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='password', role='Admin', is_staff=True)
+        self.teacher = User.objects.create_user(username='teacher', password='password', role='Teacher', full_name='T One')
+        self.student = User.objects.create_user(username='student', password='password', role='Student')
+        self.subject = Subject.objects.create(name="Math", code="MATH101")
+        self.class_obj = Class.objects.create(name="Class A", academic_year="2024", schedule="Mon")
+        self.class_obj.subjects.add(self.subject)
+        self.class_obj.teachers.add(self.teacher)
+        self.class_obj.students.add(self.student)
+        self.client.force_authenticate(user=self.admin)
+
+    def revalidate(self, url, user=None):
+        """(status of a revalidation with the current ETag, queries it ran)."""
+        if user:
+            self.client.force_authenticate(user=user)
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        return second.status_code, len(queries)
+
+    def test_unchanged_endpoints_answer_304_with_one_query(self):
+        for url, user in [
+            (reverse('admin_panel:subjects'), None),
+            (reverse('admin_panel:classes'), None),
+            (reverse('admin_panel:class', args=[self.class_obj.pk]), None),
+            (reverse('teacher:classes'), self.teacher),
+            (reverse('teacher:my_classes_subjects'), self.teacher),
+            (reverse('student:student_classes'), self.student),
+            (reverse('student:dashboard'), self.student),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.revalidate(url, user), (304, 1))
+
+    def test_etag_changes_with_nested_data_and_membership(self):
+        url = reverse('student:dashboard')
+        self.client.force_authenticate(user=self.student)
+        etag = self.client.get(url)['ETag']
+
+        changes = [
+            lambda: Subject.objects.filter(pk=self.subject.pk).get().save(),
+            lambda: setattr(self.teacher, 'full_name', 'T Two') or self.teacher.save(),
+            lambda: self.class_obj.teachers.remove(self.teacher),
+            lambda: self.teacher.classes_as_teacher.add(self.class_obj),
+            lambda: self.student.classes_as_student.clear(),
+        ]
+        for change in changes:
+            change()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+
+        # A login writes only last_login and leaves the ETag alone
+        self.class_obj.students.add(self.student)
+        etag = self.client.get(url)['ETag']
+        self.teacher.last_login = self.teacher.date_joined
+        self.teacher.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_bulk_enrollment_changes_the_etag(self):
+        url = reverse('admin_panel:classes')
+        etag = self.client.get(url)['ETag']
+        other = User.objects.create_user(username='other', password='password', role='Student')
+        response = self.client.post(reverse('admin_panel:classes_enrollment'), {'changes': [
+            {'class': str(self.class_obj.id), 'add': {'students': [str(other.id)]}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_user_and_query(self):
+        url = reverse('admin_panel:classes')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'fields': 'id'})['ETag'], etag)
+        other = User.objects.create_user(username='admin2', password='password', role='Admin', is_staff=True)
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # Permissions are checked before the ETag
+        self.client.force_authenticate(user=self.student)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 403)
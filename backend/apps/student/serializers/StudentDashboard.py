@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from apps.core.fieldsets import SparseFieldsMixin
+
 from apps.core.models import Class, Subject
 from apps.accounts.models import User
 
@@ -17,7 +19,7 @@ class SubjectNestedSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'code']   
 
 
-class StudentDashboardSerializer(serializers.ModelSerializer):
+class StudentDashboardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     subjects = SubjectNestedSerializer(many=True)
     students = UserNestedSerializer(many=True)
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from apps.core.fieldsets import SparseFieldsMixin
+
 from apps.core.models import Assignment, Class, Subject, User
 
 
@@ -19,7 +21,7 @@ class NestedSubjectSerializer(serializers.ModelSerializer):
         model = Subject
         fields = ['id', 'name', 'code']
         
-class AssignmentListSerializer(serializers.ModelSerializer):
+class AssignmentListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     teacher = NestedUserSerializer(read_only=True)
     class_assigned = NestedClassSerializer(read_only=True)
     subject = NestedSubjectSerializer(read_only=True)
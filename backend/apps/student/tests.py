@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -81,3 +81,34 @@ class GradesViewTests(TestCase):
         # Check that none of the returned IDs match the other user's submission
         submission_ids = [item['id'] for item in response.data]
         self.assertNotIn(str(self.other_submission.id), submission_ids)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class StudentClassQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.student = User.objects.create_user(username='student', password='password', role='Student')
+        self.client.force_authenticate(user=self.student)
+
+    def add_classes(self, start, count):
+        for n in range(start, start + count):
+            class_obj = Class.objects.create(name=f"Class {n}", academic_year="2024", schedule="Mon")
+            class_obj.subjects.add(Subject.objects.create(name=f"Subject {n}", code=f"SUB{n}"))
+            class_obj.teachers.add(User.objects.create_user(username=f'teacher{n}', password='password', role='Teacher'))
+            class_obj.students.add(self.student, User.objects.create_user(username=f'peer{n}', password='password', role='Student'))
+
+    def assertConstantQueries(self, url):
+        self.add_classes(0, 2)
+        with self.assertNumQueries(5):  # ETag validator, classes, subjects, teachers, students
+            self.client.get(url)
+        self.add_classes(2, 5)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(len(response.data[0]['students']), 2)
+
+    def test_dashboard_query_count(self):
+        self.assertConstantQueries(reverse('student:dashboard'))
+
+    def test_class_list_query_count(self):
+        self.assertConstantQueries(reverse('student:student_classes'))
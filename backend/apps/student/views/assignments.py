@@ -18,7 +18,7 @@ class AssignmentListView(generics.ListAPIView):
 
     def get_queryset(self):
         classes = Class.objects.filter(students=self.request.user)
-        return self.queryset.filter(class_assigned__in=classes)
+        return AssignmentListSerializer.project(self.queryset.filter(class_assigned__in=classes), self.request)
     
 
 class AssignmentDetailView(generics.RetrieveAPIView):
@@ -29,4 +29,7 @@ class AssignmentDetailView(generics.RetrieveAPIView):
     permission_classes = [RoleRequiredPermission]
     allowed_roles = ['Student']
     serializer_class = AssignmentListSerializer
-    queryset = Assignment.objects.all()
\ No newline at end of file
+    queryset = Assignment.objects.all()
+
+    def get_queryset(self):
+        return AssignmentListSerializer.project(self.queryset.all(), self.request)
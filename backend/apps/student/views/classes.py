@@ -1,17 +1,21 @@
 from rest_framework import generics
 
+from apps.core.conditional import ConditionalGetMixin, queryset_validator
 from apps.core.models import Class
 from apps.student.serializers.classes import ClassListSerializer
 from apps.core.permissions import RoleRequiredPermission
 
 
 
-class ClassDetail(generics.ListAPIView):
+class ClassDetail(ConditionalGetMixin, generics.ListAPIView):
     permission_classes = [RoleRequiredPermission]
     allowed_roles = ['Student']
     serializer_class = ClassListSerializer
 
+    def get_validators(self, request, *args, **kwargs):
+        return [queryset_validator(Class.objects.filter(students=request.user))]
+
     def get_queryset(self):
-        return Class.objects.filter(students=self.request.user)
+        return ClassListSerializer.project(Class.objects.filter(students=self.request.user).with_members(), self.request)
         
 
@@ -4,23 +4,27 @@ from rest_framework import status
 
 from apps.core.permissions import RoleRequiredPermission
 from apps.student.serializers.StudentDashboard import StudentDashboardSerializer
+from apps.core.conditional import ConditionalGetMixin, queryset_validator
 from apps.core.models import Class
 
 
-class StudentDashboard(APIView):
+class StudentDashboard(ConditionalGetMixin, APIView):
     permission_classes = [RoleRequiredPermission]
     allowed_roles = ['Student']
     
     # Note: APIView doesn't automatically use this, but it's good for documentation
     serializer_class = StudentDashboardSerializer
 
+    def get_validators(self, request, *args, **kwargs):
+        return [queryset_validator(Class.objects.filter(students=request.user))]
+
     def get(self, request):
         # 1. Fix: Use the correct field name 'students' (plural)
         user = request.user
-        student_classes = Class.objects.filter(students=user)
+        student_classes = StudentDashboardSerializer.project(Class.objects.filter(students=user).with_members(), request)
         
         # 2. Fix: Add 'many=True' because filter returns a list, not one item
-        serializer = StudentDashboardSerializer(student_classes, many=True)
+        serializer = StudentDashboardSerializer(student_classes, many=True, context={'request': request})
         
         # 3. Fix: Return '.data', not the serializer object itself
         return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from apps.core.fieldsets import SparseFieldsMixin
 from apps.core.models import Assignment, User, Class, Subject
 
 # ---------------------------------
@@ -93,7 +95,7 @@ class ClassNestedSerializer(serializers.ModelSerializer):
 
 
 # LIST SERIALIZER FOR ASSIGNMENTS - ASSIGNMENT VIEW
-class AssignmentListSerializer(serializers.ModelSerializer):
+class AssignmentListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     teacher = UserNestedSerializer()
     class_assigned = ClassNestedSerializer()
     subject = SubjectNestedSerializer()
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from apps.core.fieldsets import SparseFieldsMixin
+
 from apps.core.models import Class, Subject
 from apps.accounts.models import User
 
@@ -21,7 +23,7 @@ class SubjectNestedSerializer(serializers.ModelSerializer):
 
 
 
-class TeacherDashboardSerializer(serializers.ModelSerializer):
+class TeacherDashboardSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     
     subjects = SubjectNestedSerializer(many=True)
     students = UserNestedSerializer(many=True)
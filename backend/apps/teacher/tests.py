@@ -1,3 +1,54 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.core.models import Assignment, Class, Subject
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TeacherClassQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = User.objects.create_user(username='teacher', password='password', role='Teacher')
+        self.client.force_authenticate(user=self.teacher)
+
+    def add_classes(self, start, count):
+        for n in range(start, start + count):
+            subject = Subject.objects.create(name=f"Subject {n}", code=f"SUB{n}")
+            class_obj = Class.objects.create(name=f"Class {n}", academic_year="2024", schedule="Mon")
+            class_obj.subjects.add(subject)
+            class_obj.teachers.add(self.teacher)
+            class_obj.students.add(*[
+                User.objects.create_user(username=f'student{n}.{i}', password='password', role='Student') for i in range(2)
+            ])
+            Assignment.objects.create(
+                title=f"Homework {n}", description="Read", teacher=self.teacher, class_assigned=class_obj,
+                subject=subject, due_date=timezone.now() + datetime.timedelta(days=1),
+            )
+
+    def test_classes_query_count(self):
+        url = reverse('teacher:classes')
+        self.add_classes(0, 2)
+        with self.assertNumQueries(5):  # ETag validator, classes, subjects, teachers, students
+            self.client.get(url)
+        self.add_classes(2, 5)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(response.data[0]['teachers'][0]['username'], 'teacher')
+
+    def test_assignments_query_count(self):
+        url = reverse('teacher:assignments')
+        self.add_classes(0, 2)
+        # assignments joined to teacher / subject / class, class students, submitter ids
+        with self.assertNumQueries(3):
+            self.client.get(url)
+        self.add_classes(2, 5)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(len(response.data[0]['class_assigned']['students']), 2)
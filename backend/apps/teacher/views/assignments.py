@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -8,7 +9,9 @@ from apps.teacher.serializers.Assignment import (
     ClassListSerializer,
     SubjectNestedSerializer,
 )
-from apps.core.models import Assignment, Class, Subject
+from apps.accounts.models import User
+from apps.core.conditional import ConditionalGetMixin, queryset_validator
+from apps.core.models import NESTED_USER_FIELDS, Assignment, Class, Subject
 from apps.core.permissions import RoleRequiredPermission
 
 
@@ -21,8 +24,17 @@ class AssignmentView(APIView):
 
     def get(self, request):
         try:
-            assignment_objects = Assignment.objects.filter(teacher=request.user)
-            serializer = AssignmentListSerializer(assignment_objects, many=True)
+            assignment_objects = AssignmentListSerializer.project(
+                Assignment.objects.filter(teacher=request.user)
+                .select_related('teacher', 'subject', 'class_assigned')
+                .prefetch_related(
+                    Prefetch('class_assigned__students', queryset=User.objects.only(*NESTED_USER_FIELDS)),
+                    # Serialized as a list of submitter ids
+                    Prefetch('assignment_submissions', queryset=User.objects.only('id')),
+                ),
+                request,
+            )
+            serializer = AssignmentListSerializer(assignment_objects, many=True, context={'request': request})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Assignment.DoesNotExist:
             return Response({"error": "Assignments not found."}, status=status.HTTP_404_NOT_FOUND)
@@ -44,8 +56,9 @@ class AssignmentDetailView(APIView):
 
     def get(self, request, assignment_id):
         try:
-            assignment_object = Assignment.objects.get(id=assignment_id, teacher=request.user)
-            serializer = AssignmentListSerializer(assignment_object)
+            assignments = AssignmentListSerializer.project(Assignment.objects.filter(teacher=request.user), request)
+            assignment_object = assignments.get(id=assignment_id)
+            serializer = AssignmentListSerializer(assignment_object, context={'request': request})
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Assignment.DoesNotExist:
             return Response({"error": "Assignment not found."}, status=status.HTTP_404_NOT_FOUND)
@@ -72,10 +85,14 @@ class AssignmentDetailView(APIView):
 # ---------------------------------
 
 # GET TEACHER'S CLASSES VIEW - ASSIGNMENT VIEW
-class ClassesSubjectsView(APIView):
+class ClassesSubjectsView(ConditionalGetMixin, APIView):
     permission_classes = [RoleRequiredPermission]
     allowed_roles = ["Teacher"]
 
+    def get_validators(self, request, *args, **kwargs):
+        # Subject edits touch their classes, so the classes cover both lists
+        return [queryset_validator(Class.objects.filter(teachers=request.user))]
+
     def get(self, request):
         try:
             class_object = Class.objects.filter(teachers=request.user)
@@ -18,7 +18,7 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 
 from apps.chat.models import Group
-from apps.chat.serializers import GroupSerializer
+from apps.chat.serializers import GroupListCreateSerializer as GroupSerializer
 from apps.core.permissions import RoleRequiredPermission
 
 
@@ -4,16 +4,20 @@ from rest_framework import status
 
 from apps.teacher.serializers.TeacherDashboard import TeacherDashboardSerializer
 from apps.core.permissions import RoleRequiredPermission
+from apps.core.conditional import ConditionalGetMixin, queryset_validator
 from apps.core.models import Class
 
 
 
-class TeacherClasses(APIView):
+class TeacherClasses(ConditionalGetMixin, APIView):
     permission_classes = [RoleRequiredPermission]
     allowed_roles = ['Teacher']
 
+    def get_validators(self, request, *args, **kwargs):
+        return [queryset_validator(Class.objects.filter(teachers=request.user))]
+
     def get(self, request):
         user = request.user
-        teacherClass = Class.objects.filter(teachers=user)
-        serialized = TeacherDashboardSerializer(teacherClass, many=True)
+        teacherClass = TeacherDashboardSerializer.project(Class.objects.filter(teachers=user).with_members(), request)
+        serialized = TeacherDashboardSerializer(teacherClass, many=True, context={'request': request})
         return Response(serialized.data, status=status.HTTP_200_OK)
\ No newline at end of file
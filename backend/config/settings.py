@@ -101,6 +101,29 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Chat: number of messages replayed to a socket on (re)connect
+CHAT_HISTORY_LIMIT = 50
+
+# Chat: write-behind persistence (broadcast first, bulk insert in batches)
+CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "False") == "True"
+CHAT_WRITE_BEHIND_BATCH_SIZE = 100
+CHAT_WRITE_BEHIND_INTERVAL = 0.5  # seconds
+
+# Chat: websocket handshake user cache (per process). Set WS_USER_CACHE_SHARED_CACHE
+# to a CACHES alias shared by all workers so deactivations and deletes reach every
+# worker at once; without it, the TTL is how long another worker may still accept them.
+WS_USER_CACHE_SIZE = 10000
+WS_USER_CACHE_TTL = 60  # seconds, never longer than the token's own expiry
+WS_USER_CACHE_SHARED_CACHE = None
+
+# Chat: group membership cache used to authorize sockets without queries.
+# Set CHAT_MEMBERSHIP_SHARED_CACHE to a CACHES alias shared by all workers (e.g.
+# redis) so membership changes reach every worker at once. Without it, the TTL
+# is how long another worker may still accept a removed member.
+CHAT_MEMBERSHIP_CACHE_SIZE = 5000
+CHAT_MEMBERSHIP_CACHE_TTL = 600  # seconds
+CHAT_MEMBERSHIP_SHARED_CACHE = None
+
 
 # Database
 DATABASES = {
@@ -184,6 +207,58 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    "activity-log-rollup": {
+        "task": "apps.activity_log.tasks.rollup_activity_logs",
+        "schedule": 3600.0,  # hourly
+    },
+    "deletion-jobs-resume": {
+        "task": "apps.core.tasks.resume_deletion_jobs",
+        "schedule": 600.0,
+    },
+}
+
+# Activity log: how log_activity() writes (see apps/activity_log/backends.py)
+ACTIVITY_LOG_BACKEND = os.getenv("ACTIVITY_LOG_BACKEND", "apps.activity_log.backends.DatabaseBackend")
+ACTIVITY_LOG_BATCH_SIZE = 100
+ACTIVITY_LOG_FLUSH_INTERVAL = 2.0  # seconds
+ACTIVITY_LOG_USE_CELERY = os.getenv("ACTIVITY_LOG_USE_CELERY", "False") == "True"
+
+# Admin dashboard counts are cached until a User/Class/Subject changes; the TTL
+# bounds staleness from other processes unless CACHES points at a shared backend
+ADMIN_DASHBOARD_CACHE_TTL = 60  # seconds
+
+# Bulk user import (see apps/admin_panel/user_import.py). Hashing processes for the
+# import_users command; None means one per CPU. The API hashes in-process.
+ADMIN_USER_IMPORT_WORKERS = None
+ADMIN_USER_IMPORT_BATCH_SIZE = 1000
+
+# Admin user / subject search (see apps/core/search.py): terms matching more rows
+# than this skip ranking and fall back to an icontains scan
+SEARCH_MAX_RANKED_MATCHES = 10000
+
+# Filtered admin lists with an estimated count (see apps/admin_panel/pagination.py)
+# count at most this many rows and report the total as an estimate beyond it
+ADMIN_PAGINATION_COUNT_LIMIT = 1000
+
+# Deleted classes and users are hidden at once and purged by a DeletionJob
+# (see apps/core/deletion.py): on a Celery worker, or a background thread after the request
+DELETION_USE_CELERY = os.getenv("DELETION_USE_CELERY", "False") == "True"
+DELETION_BATCH_SIZE = 1000  # rows per transaction
+DELETION_STALE_AFTER = 600  # seconds a job may sit pending or make no progress before it is resumed
+
+# Segment-file backend (see apps/activity_log/segments.py)
+ACTIVITY_LOG_SEGMENT_DIR = os.getenv("ACTIVITY_LOG_SEGMENT_DIR", str(BASE_DIR / "var" / "activity-log"))
+ACTIVITY_LOG_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+ACTIVITY_LOG_SEGMENT_INDEX_BYTES = 64 * 1024
+ACTIVITY_LOG_SEGMENT_FSYNC = os.getenv("ACTIVITY_LOG_SEGMENT_FSYNC", "interval")  # always | interval | never
+ACTIVITY_LOG_SEGMENT_FSYNC_INTERVAL = 1.0  # seconds
+
+# Activity log rollup and retention (see apps/activity_log/rollup.py)
+ACTIVITY_LOG_RETENTION_DAYS = int(os.getenv("ACTIVITY_LOG_RETENTION_DAYS", "90"))
+ACTIVITY_LOG_ROLLUP_LAG = 900  # seconds
+ACTIVITY_LOG_PURGE_BATCH_SIZE = 1000
+ACTIVITY_LOG_ARCHIVE_DIR = os.getenv("ACTIVITY_LOG_ARCHIVE_DIR") or None
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -36,7 +36,7 @@ const DeleteConfirmation = ({
     try {
       const res = await apiClient.delete(deleteUrl);
 
-      if (res.status === 204 || res.status === 200) {
+      if (res.status === 204 || res.status === 200 || res.status === 202) {
         setIsOpen(false);
         // Small delay to allow modal close animation
         setTimeout(() => {
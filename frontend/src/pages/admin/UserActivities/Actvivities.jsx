@@ -12,32 +12,29 @@ import Badge from '../../../components/common/Badge.jsx';
 import Table from '../../../components/common/Table.jsx';
 import CircleLoader from '../../../components/CircleLoader';
 import ErrorMsg from '../../../components/ErrorMsg';
-import Pagination from '../../../components/Pagination';
 
 export default function Actvivities() {
     const [activities, setActivities] = useState([]);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
-    const [pagination, setPagination] = useState({ count: 0, next: null, previous: null });
-    const [currentPage, setCurrentPage] = useState(1);
-    const [totalPages, setTotalPages] = useState(1);
+    // The API pages by cursor: follow its next/previous links instead of page numbers
+    const [pageUrl, setPageUrl] = useState('/admin/activities/');
+    const [pagination, setPagination] = useState({ next: null, previous: null });
 
     useEffect(() => {
-        getActivities(currentPage);
-    }, [currentPage]);
+        getActivities(pageUrl);
+    }, [pageUrl]);
 
-    const getActivities = async (page) => {
+    const getActivities = async (url) => {
         setLoading(true);
         setError('');
         try {
-            const res = await apiClient.get(`/admin/activities/?page=${page}`);
+            const res = await apiClient.get(url);
             setActivities(res.data.results);
             setPagination({
-                count: res.data.count,
                 next: res.data.next,
                 previous: res.data.previous
             });
-            setTotalPages(Math.ceil(res.data.count / 10));
         } catch (err) {
             setError(err.message || 'Failed to fetch activities');
         } finally {
@@ -45,10 +42,6 @@ export default function Actvivities() {
         }
     };
 
-    const handlePageChange = (pageNumber) => {
-        setCurrentPage(pageNumber);
-    };
-
     if (loading) {
         return (
             <div className="w-full h-screen flex items-center justify-center">
@@ -122,13 +115,20 @@ export default function Actvivities() {
                     />
 
                     {/* Pagination */}
-                    {totalPages > 1 && (
-                        <div className="mt-6 pt-4 border-t border-gray-200">
-                            <Pagination
-                                currentPage={currentPage}
-                                totalPages={totalPages}
-                                onPageChange={handlePageChange}
-                            />
+                    {(pagination.next || pagination.previous) && (
+                        <div className="mt-6 pt-4 border-t border-gray-200 flex justify-end space-x-2">
+                            <button
+                                onClick={() => setPageUrl(pagination.previous)}
+                                disabled={!pagination.previous}
+                                className="px-4 py-2 bg-gray-200 text-gray-700 rounded-md disabled:opacity-50">
+                                Previous
+                            </button>
+                            <button
+                                onClick={() => setPageUrl(pagination.next)}
+                                disabled={!pagination.next}
+                                className="px-4 py-2 bg-indigo-600 text-white rounded-md hover:bg-indigo-700 disabled:opacity-50">
+                                Next
+                            </button>
                         </div>
                     )}
                 </Card>
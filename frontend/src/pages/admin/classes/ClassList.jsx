@@ -34,7 +34,14 @@ export default function ClassList() {
 
   const fetchClasses = async () => {
     try {
-      const res = await Api.get('/admin/classes/');
+      // Only the columns this page renders; nested users otherwise carry email, address, bio...
+      const fields = [
+        'id', 'name', 'academic_year', 'schedule',
+        'subjects.id', 'subjects.name',
+        'teachers.id', 'teachers.username', 'teachers.full_name',
+        'students.id', 'students.username', 'students.full_name',
+      ].join(',');
+      const res = await Api.get('/admin/classes/', { params: { fields } });
       setClasses(res.data.results || []);
     } catch (err) {
       setError('Failed to fetch classes.');
@@ -22,20 +22,25 @@ export default function Users() {
   const [loading, setLoading] = useState(true);
   const [currentPage, setCurrentPage] = useState(1);
   const [totalPages, setTotalPages] = useState(1);
+  const [countIsEstimate, setCountIsEstimate] = useState(false);
+  const [links, setLinks] = useState({ next: null, previous: null });
   const [searchQuery, setSearchQuery] = useState('');
   const [roleFilter, setRoleFilter] = useState('');
 
   const [searchParams] = useSearchParams();
   const role = searchParams.get('role');
 
-  const getUsers = useCallback(async (page = 1, search = '', roleParam = '') => {
+  // `url` is a next / previous link from the last response: it seeks from that page instead of counting rows
+  const getUsers = useCallback(async (page = 1, search = '', roleParam = '', url = null) => {
     try {
       setLoading(true);
       setError(null);
       const roleQuery = roleParam ? `&role=${roleParam}` : '';
-      const res = await Api.get(`admin/users/?page=${page}&search=${search}${roleQuery}`);
+      const res = await Api.get(url || `admin/users/?page=${page}&search=${search}${roleQuery}`);
       setUsers(res.data.results || []);
-      setTotalPages(Math.ceil(res.data.count / 10));
+      setTotalPages(Math.max(page, Math.ceil(res.data.count / 10)));
+      setCountIsEstimate(Boolean(res.data.count_is_estimate));
+      setLinks({ next: res.data.next, previous: res.data.previous });
       setCurrentPage(page);
     } catch (error) {
       console.error(error.message);
@@ -266,23 +271,23 @@ export default function Users() {
               />
 
               {/* Pagination */}
-              {totalPages > 1 && (
+              {(links.next || links.previous) && (
                 <div className="flex justify-between items-center mt-6 pt-4 border-t border-gray-200">
                   <span className="text-sm text-gray-700">
-                    Page {currentPage} of {totalPages}
+                    Page {currentPage} of {countIsEstimate ? `about ${totalPages}` : totalPages}
                   </span>
                   <div className="flex gap-2">
                     <Button
                       variant="secondary"
-                      onClick={() => getUsers(currentPage - 1, searchQuery, roleFilter)}
-                      disabled={currentPage === 1}
+                      onClick={() => getUsers(currentPage - 1, searchQuery, roleFilter, links.previous)}
+                      disabled={!links.previous}
                     >
                       Previous
                     </Button>
                     <Button
                       variant="primary"
-                      onClick={() => getUsers(currentPage + 1, searchQuery, roleFilter)}
-                      disabled={currentPage === totalPages}
+                      onClick={() => getUsers(currentPage + 1, searchQuery, roleFilter, links.next)}
+                      disabled={!links.next}
                     >
                       Next
                     </Button>